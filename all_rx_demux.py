@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tách file tổng hợp enterprise-all-rx.data thành dữ liệu rx của từng luồng
+RxTraceSimple ghi mỗi gói nhận được kèm context dạng
+'/NodeList/N/ApplicationList/M/$ns3::PacketSink/Rx'. File chỉ được đọc một lần;
+cột context được đọc dưới dạng categorical nên mỗi chuỗi context khác nhau chỉ
+được phân tích một lần, sau đó mỗi dòng được ánh xạ qua bảng tra số nguyên.
+Khi mô phỏng chạy với --rxBinWidth, file có header '# binned ...' và mỗi dòng
+là một bin của một context, thêm cột thứ tư là số gói trong bin.
+"""
+
+import re
+import numpy as np
+import pandas as pd
+
+import trace_reader
+
+ALL_RX_FILE = 'enterprise-all-rx.data'
+
+# Thứ tự luồng trong bảng tra (chỉ số = mã luồng)
+FLOWS = ['newreno', 'reno', 'comp1', 'comp2', 'udp1', 'udp2']
+
+# (node, application) của PacketSink -> luồng, theo thứ tự tạo node và cài
+# ứng dụng trong enterprise-network-newreno.cc: clientsA = node 0-4,
+# serversB = node 5-7; các sink được cài lần lượt main(B0), comp1(B1),
+# comp2(B2), reno(B0), udp1(B2), udp2(B1).
+SINK_CONTEXTS = {
+    (5, 0): 'newreno',
+    (6, 0): 'comp1',
+    (7, 0): 'comp2',
+    (5, 1): 'reno',
+    (7, 1): 'udp1',
+    (6, 1): 'udp2',
+}
+
+_CONTEXT_RE = re.compile(r'/NodeList/(\d+)/ApplicationList/(\d+)')
+
+
+def context_flow(context):
+    """Luồng ứng với một chuỗi context, hoặc None nếu không nhận ra"""
+    match = _CONTEXT_RE.search(context)
+    if not match:
+        return None
+    return SINK_CONTEXTS.get((int(match.group(1)), int(match.group(2))))
+
+
+def demux_all_rx(filename):
+    """Đọc enterprise-all-rx.data một lần, trả về dict luồng -> (times, bytes)
+
+    Với file đã gom bin, mỗi giá trị là (thời điểm bắt đầu bin, bytes, số gói).
+    Luồng không có gói nào vẫn có mặt với các mảng rỗng.
+    """
+    binned = trace_reader.bin_width(filename) is not None
+    names = ['time', 'bytes', 'context'] + (['packets'] if binned else [])
+    with trace_reader.open_trace(filename) as f:
+        df = pd.read_csv(f, sep='\t', header=None, names=names, comment='#' if binned else None,
+                         dtype={'context': 'category'})
+    times = df['time'].values
+    nbytes = df['bytes'].values
+    packets = df['packets'].values.astype(np.int64) if binned else None
+    categories = df['context'].cat.categories
+    codes = df['context'].cat.codes.values
+    del df
+
+    # Bảng tra: mã context -> mã luồng (-1 = không thuộc luồng nào)
+    flow_index = {flow: i for i, flow in enumerate(FLOWS)}
+    lookup = np.array([flow_index.get(context_flow(c), -1) for c in categories] + [-1], dtype=np.int64)
+    flow_codes = lookup[codes]  # codes = -1 (NaN) trỏ vào phần tử cuối của lookup
+
+    # Gom các dòng theo luồng bằng một lần sắp xếp ổn định (giữ thứ tự thời gian)
+    order = np.argsort(flow_codes, kind='stable')
+    bounds = np.searchsorted(flow_codes[order], np.arange(len(FLOWS) + 1))
+
+    flows = {}
+    for i, flow in enumerate(FLOWS):
+        idx = order[bounds[i]:bounds[i + 1]]
+        flows[flow] = (times[idx], nbytes[idx]) + ((packets[idx],) if binned else ())
+    return flows
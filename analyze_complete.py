@@ -3,34 +3,163 @@
 """
 Script phân tích đầy đủ và chi tiết TCP NewReno vs TCP Reno
 Bao gồm biểu đồ, thống kê, và báo cáo chi tiết
+matplotlib/seaborn chỉ được import khi vẽ biểu đồ, nên chế độ --stats-only
+chạy được trên máy không có giao diện và khởi động nhanh.
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 import numpy as np
 import pandas as pd
 import os
-import seaborn as sns
+import time
+from contextlib import nullcontext
 from datetime import datetime
-from scipy import stats
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import warnings
+import trace_cache
+import streaming_stats
+import throughput_index
+import time_series
+import timeline
+import trace_frame
+import figure_cache
+import congestion_events
+import decimate
+import fairness
+import flowmon_parser
+import pcap_reader
+import all_rx_demux
+import trace_reader
+import binary_trace
+import stage_profiler
+import live_tail
+import stats_export
+import results_store
 warnings.filterwarnings('ignore')
 
-# Set style cho biểu đồ đẹp hơn
-try:
-    plt.style.use('seaborn-v0_8')
-except OSError:
+# matplotlib.pyplot và seaborn, gán bởi load_plotting() khi cần vẽ
+plt = None
+sns = None
+
+
+def load_plotting():
+    """Import matplotlib/seaborn và đặt style biểu đồ (một lần mỗi tiến trình)"""
+    global plt, sns
+    if plt is not None:
+        return
+    import matplotlib.pyplot as pyplot
+    import seaborn
+    
+    # Set style cho biểu đồ đẹp hơn
     try:
-        plt.style.use('seaborn')
+        pyplot.style.use('seaborn-v0_8')
     except OSError:
-        plt.style.use('default')
-sns.set_palette("husl")
+        try:
+            pyplot.style.use('seaborn')
+        except OSError:
+            pyplot.style.use('default')
+    seaborn.set_palette("husl")
+    plt, sns = pyplot, seaborn
+
 
 class TCPAnalyzer:
-    def __init__(self):
+    # key trong self.data -> (file trace, tên luồng)
+    TRACE_FILES = {
+        # TCP flows
+        'newreno_rx': ('enterprise-main-newreno-rx.data', 'TCP NewReno'),
+        'newreno_cwnd': ('enterprise-main-newreno-cwnd.data', 'TCP NewReno'),
+        'reno_rx': ('enterprise-reno-rx.data', 'TCP Reno'),
+        'reno_cwnd': ('enterprise-reno-cwnd.data', 'TCP Reno'),
+        # Competing flows
+        'comp1_rx': ('enterprise-comp1-newreno-rx.data', 'Competing TCP 1'),
+        'comp1_cwnd': ('enterprise-comp1-newreno-cwnd.data', 'Competing TCP 1'),
+        'comp2_rx': ('enterprise-comp2-newreno-rx.data', 'Competing TCP 2'),
+        'comp2_cwnd': ('enterprise-comp2-newreno-cwnd.data', 'Competing TCP 2'),
+        # UDP flows
+        'udp1_rx': ('enterprise-udp1-rx.data', 'UDP CBR 1'),
+        'udp2_rx': ('enterprise-udp2-rx.data', 'UDP CBR 2'),
+    }
+
+    # File kết quả FlowMonitor (SerializeToXmlFile trong enterprise-network-newreno.cc)
+    FLOWMON_FILE = 'enterprise-flowmon-results.xml'
+    # File pcap phía LAN của router A (mô phỏng chạy với --pcap=true), xem pcap_reader.py
+    PCAP_FILE = pcap_reader.PCAP_FILES['lan']
+
+    # Cửa sổ (giây) cho throughput theo cửa sổ trong thống kê và đường làm mượt trên biểu đồ
+    STATS_WINDOW = 5.0
+    SMOOTHING_WINDOW = 1.0
+    # Sai lệch thời gian tối đa (giây) khi ghép mẫu CWND với mẫu throughput gần nhất
+    ALIGN_TOLERANCE = 0.05
+    
+    # Các cột gốc được lưu trong cache; cột dẫn xuất và tên luồng do trace_frame.TraceFrame cung cấp
+    RX_CACHE_COLUMNS = ['time', 'bytes']
+    CWND_CACHE_COLUMNS = ['time', 'cwnd']
+
+    def __init__(self, use_cache=True, data_dir='.'):
         self.data = {}
         self.stats = {}
+        self.use_cache = use_cache  # Dùng cache .npz cạnh file trace
+        self.data_dir = data_dir  # Thư mục chứa các file trace của một lần chạy
+        self.load_times = {}  # key -> thời gian đọc file (giây)
+        self.profiler = None  # stage_profiler.StageProfiler khi bật đo từng bước
+        self.indexes = {}  # key rx -> throughput_index.ThroughputIndex, xây khi cần
+        self.timeseries = {}  # key -> time_series.TimeSeries (thời gian đã kiểm tra đơn điệu)
+        self.run_id = None  # run_id trong results_store sau save_results()/load_results()
         
+    def trace_path(self, key):
+        """Đường dẫn file trace ứng với key trong TRACE_FILES (.bin nếu mô phỏng ghi nhị phân)"""
+        return trace_reader.find_trace(os.path.join(self.data_dir, self.TRACE_FILES[key][0]))
+    
+    def throughput_index(self, key):
+        """Chỉ mục throughput của luồng rx key (xây một lần từ self.data)"""
+        if key not in self.indexes:
+            df = self.data[key]
+            packets = df['packets'].values if 'packets' in df else None
+            self.indexes[key] = throughput_index.ThroughputIndex.from_samples(
+                df['time'].values, df['bytes'].values, packets)
+        return self.indexes[key]
+    
+    def series(self, key):
+        """self.data[key] dưới dạng time_series.TimeSeries (kiểm tra thứ tự thời gian một lần)"""
+        if key not in self.timeseries:
+            self.timeseries[key] = time_series.TimeSeries(self.data[key])
+            self.data[key] = self.timeseries[key].frame
+        return self.timeseries[key]
+    
+    def restrict_time_range(self, t0=None, t1=None):
+        """Chỉ giữ dữ liệu trong [t0, t1) để phân tích một khoảng con (ví dụ Reno 60-140s)"""
+        for key, df in self.data.items():
+            if not df.empty:
+                series = self.series(key)
+                self.data[key] = trace_frame.slice_rows(series.frame, *series.bounds(t0, t1))
+        self.indexes = {}
+        self.timeseries = {}
+    
+    def smoothed_throughput(self, key, window):
+        """(thời điểm, throughput Mbps) theo cửa sổ window giây trong khoảng hoạt động của luồng"""
+        df = self.data[key]
+        t_start = (df['time'].iloc[0] // window) * window
+        return self.throughput_index(key).window_throughput(window, t_start, df['time'].iloc[-1])
+    
+    def profile_stage(self, name, **info):
+        """Khối đo thời gian/bộ nhớ của một bước (không làm gì nếu chưa bật profiler)"""
+        return self.profiler.stage(name, **info) if self.profiler else nullcontext({})
+    
+    @staticmethod
+    def build_rx_frame(times, nbytes, flow_name, packets=None, bin_width=None):
+        """Tạo trace_frame.TraceFrame rx từ mảng thời gian và bytes
+
+        Chỉ lưu time và bytes (kiểu nguyên thu hẹp); cumulative_bytes,
+        throughput_mbps, instant_throughput và flow được tính khi truy cập.
+        Với trace đã gom bin (packets, bin_width), mỗi dòng là một bin: có thêm
+        cột 'packets' và instant_throughput là throughput trung bình của bin.
+        """
+        return trace_frame.rx_frame(times, nbytes, flow_name, packets, bin_width)
+    
+    @staticmethod
+    def build_cwnd_frame(times, cwnd, flow_name):
+        """Tạo trace_frame.TraceFrame cwnd (cwnd_kb và flow được tính khi truy cập)"""
+        return trace_frame.cwnd_frame(times, cwnd, flow_name)
+    
     def read_rx_data(self, filename, flow_name):
         """Đọc dữ liệu throughput từ file rx data"""
         if not os.path.exists(filename):
@@ -38,11 +167,24 @@ class TCPAnalyzer:
             return pd.DataFrame()
         
         try:
-            df = pd.read_csv(filename, sep='\t', header=None, names=['time', 'bytes'])
-            df['flow'] = flow_name
-            df['cumulative_bytes'] = df['bytes'].cumsum()
-            df['throughput_mbps'] = (df['cumulative_bytes'] * 8) / (df['time'] * 1e6)
-            df['instant_throughput'] = (df['bytes'] * 8) / 1e6  # Mbps tức thời
+            # File nhị phân đã được memmap trực tiếp, file lưu trữ giải mã nhanh, file gom bin
+            # vốn nhỏ: không cần cache
+            bin_width = trace_reader.bin_width(filename)
+            use_cache = (self.use_cache and not binary_trace.is_binary(filename) and
+                         not trace_reader.is_archive(filename) and bin_width is None)
+            cached = trace_cache.load_cache(filename, self.RX_CACHE_COLUMNS) if use_cache else None
+            if cached is not None:
+                return self.build_rx_frame(cached['time'], cached['bytes'], flow_name)
+
+            if bin_width is not None:
+                times, nbytes, packets = trace_reader.read_binned_trace(filename)
+                return self.build_rx_frame(times, nbytes, flow_name, packets, bin_width)
+
+            key = trace_cache.source_key(filename)
+            times, nbytes = trace_reader.read_trace(filename)
+            df = self.build_rx_frame(times, nbytes, flow_name)
+            if use_cache:
+                trace_cache.save_cache(filename, {c: df[c].values for c in self.RX_CACHE_COLUMNS}, key)
             return df
         except Exception as e:
             print(f"❌ Lỗi đọc file {filename}: {e}")
@@ -55,35 +197,128 @@ class TCPAnalyzer:
             return pd.DataFrame()
         
         try:
-            df = pd.read_csv(filename, sep='\t', header=None, names=['time', 'cwnd'])
-            df['flow'] = flow_name
-            df['cwnd_kb'] = df['cwnd'] / 1024
+            # File nhị phân đã được memmap trực tiếp, file lưu trữ giải mã nhanh: không cần cache
+            use_cache = (self.use_cache and not binary_trace.is_binary(filename) and
+                         not trace_reader.is_archive(filename))
+            cached = trace_cache.load_cache(filename, self.CWND_CACHE_COLUMNS) if use_cache else None
+            if cached is not None:
+                return self.build_cwnd_frame(cached['time'], cached['cwnd'], flow_name)
+
+            key = trace_cache.source_key(filename)
+            times, cwnd = trace_reader.read_trace(filename)
+            df = self.build_cwnd_frame(times, cwnd, flow_name)
+            if use_cache:
+                trace_cache.save_cache(filename, {c: df[c].values for c in self.CWND_CACHE_COLUMNS}, key)
             return df
         except Exception as e:
             print(f"❌ Lỗi đọc file {filename}: {e}")
             return pd.DataFrame()
     
-    def load_all_data(self):
-        """Tải tất cả dữ liệu từ các file"""
+    def read_trace(self, key):
+        """Đọc một trace theo key trong TRACE_FILES, trả về (key, DataFrame, số đo)
+
+        Số đo gồm wall_s, cpu_s (của luồng đọc), max_rss_so_far_mb, rss_growth_mb,
+        rows và frame_mb.
+        """
+        filename, flow_name = self.trace_path(key), self.TRACE_FILES[key][1]
+        reader = self.read_rx_data if key.endswith('_rx') else self.read_cwnd_data
+        df, metrics = stage_profiler.measure(reader, filename, flow_name)
+        metrics['rows'] = len(df)
+        metrics['frame_mb'] = df.memory_usage(index=False).sum() / 1e6
+        return key, df, metrics
+    
+    def read_combined_rx_data(self):
+        """Đọc rx của tất cả luồng từ enterprise-all-rx.data bằng một lần quét
+
+        Trả về dict key (ví dụ 'newreno_rx') -> DataFrame giống read_rx_data.
+        """
+        filename = trace_reader.find_trace(os.path.join(self.data_dir, all_rx_demux.ALL_RX_FILE))
+        rx_keys = [key for key in self.TRACE_FILES if key.endswith('_rx')]
+        if not os.path.exists(filename):
+            print(f"⚠️  File {filename} không tồn tại")
+            return {key: pd.DataFrame() for key in rx_keys}
+        
+        bin_width = trace_reader.bin_width(filename)
+        fields = ('time', 'bytes') if bin_width is None else ('time', 'bytes', 'packets')
+        columns = [f'{flow}_{col}' for flow in all_rx_demux.FLOWS for col in fields]
+        try:
+            cached = trace_cache.load_cache(filename, columns) if self.use_cache else None
+            if cached is not None:
+                flows = {flow: tuple(cached[f'{flow}_{col}'] for col in fields)
+                         for flow in all_rx_demux.FLOWS}
+            else:
+                cache_key = trace_cache.source_key(filename)
+                flows = all_rx_demux.demux_all_rx(filename)
+                if self.use_cache:
+                    trace_cache.save_cache(filename, {f'{flow}_{col}': values
+                                                      for flow, arrays in flows.items()
+                                                      for col, values in zip(fields, arrays)},
+                                           cache_key)
+        except Exception as e:
+            print(f"❌ Lỗi đọc file {filename}: {e}")
+            return {key: pd.DataFrame() for key in rx_keys}
+        
+        result = {}
+        for key in rx_keys:
+            times, nbytes, *packets = flows.get(key[:-len('_rx')], ((), ()))
+            if len(times) == 0:
+                result[key] = pd.DataFrame()
+            else:
+                result[key] = self.build_rx_frame(times, nbytes, self.TRACE_FILES[key][1],
+                                                  packets[0] if packets else None, bin_width)
+        return result
+    
+    def load_all_data(self, workers=None, use_processes=False, combined_rx=False):
+        """Tải tất cả dữ liệu từ các file (song song)
+
+        workers: số luồng/tiến trình đọc; mặc định min(số file, số CPU), 1 = đọc tuần tự
+        use_processes: dùng ProcessPoolExecutor thay cho ThreadPoolExecutor
+        combined_rx: lấy rx của mọi luồng từ enterprise-all-rx.data (một lần đọc)
+                     thay vì mở sáu file rx riêng
+        """
         print("📊 Đang tải dữ liệu từ các file...")
         
-        # TCP flows
-        self.data['newreno_rx'] = self.read_rx_data('enterprise-main-newreno-rx.data', 'TCP NewReno')
-        self.data['newreno_cwnd'] = self.read_cwnd_data('enterprise-main-newreno-cwnd.data', 'TCP NewReno')
-        self.data['reno_rx'] = self.read_rx_data('enterprise-reno-rx.data', 'TCP Reno')
-        self.data['reno_cwnd'] = self.read_cwnd_data('enterprise-reno-cwnd.data', 'TCP Reno')
+        self.load_times = {}
+        loaded = {}
+        keys = list(self.TRACE_FILES)
+        start = time.perf_counter()
         
-        # Competing flows
-        self.data['comp1_rx'] = self.read_rx_data('enterprise-comp1-newreno-rx.data', 'Competing TCP 1')
-        self.data['comp1_cwnd'] = self.read_cwnd_data('enterprise-comp1-newreno-cwnd.data', 'Competing TCP 1')
-        self.data['comp2_rx'] = self.read_rx_data('enterprise-comp2-newreno-rx.data', 'Competing TCP 2')
-        self.data['comp2_cwnd'] = self.read_cwnd_data('enterprise-comp2-newreno-cwnd.data', 'Competing TCP 2')
+        if combined_rx:
+            combined, metrics = stage_profiler.measure(self.read_combined_rx_data)
+            loaded.update(combined)
+            metrics['rows'] = sum(len(df) for df in combined.values())
+            self.load_times['all_rx'] = metrics['wall_s']
+            filename = trace_reader.find_trace(os.path.join(self.data_dir, all_rx_demux.ALL_RX_FILE))
+            print(f"   • {filename}: {metrics['rows']:,} dòng trong {metrics['wall_s']:.2f}s")
+            if self.profiler:
+                self.profiler.record(f'read:{filename}', metrics)
+            keys = [key for key in keys if key not in loaded]
         
-        # UDP flows
-        self.data['udp1_rx'] = self.read_rx_data('enterprise-udp1-rx.data', 'UDP CBR 1')
-        self.data['udp2_rx'] = self.read_rx_data('enterprise-udp2-rx.data', 'UDP CBR 2')
+        if workers is None:
+            workers = min(len(keys), os.cpu_count() or 1)
+        
+        if workers <= 1:
+            results = [self.read_trace(key) for key in keys]
+        else:
+            executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            with executor_cls(max_workers=workers) as pool:
+                results = list(pool.map(self.read_trace, keys))
+        total_elapsed = time.perf_counter() - start
         
-        print("✅ Đã tải xong tất cả dữ liệu")
+        for key, df, metrics in results:
+            loaded[key] = df
+            self.load_times[key] = metrics['wall_s']
+            print(f"   • {self.trace_path(key)}: {len(df):,} dòng trong {metrics['wall_s']:.2f}s")
+            if self.profiler:
+                self.profiler.record(f'read:{self.trace_path(key)}', metrics)
+        
+        # Giữ thứ tự key như TRACE_FILES
+        for key in self.TRACE_FILES:
+            self.data[key] = loaded[key]
+        self.indexes = {}
+        self.timeseries = {}
+        
+        print(f"✅ Đã tải xong tất cả dữ liệu ({total_elapsed:.2f}s, {workers} worker)")
     
     def calculate_statistics(self):
         """Tính toán thống kê chi tiết"""
@@ -93,19 +328,18 @@ class TCPAnalyzer:
             if df.empty:
                 continue
                 
-            flow_name = df['flow'].iloc[0] if 'flow' in df.columns else key
+            flow_name = df.attrs.get('flow', key)
             
             if 'bytes' in df.columns:  # RX data
                 total_bytes = df['bytes'].sum()
                 duration = df['time'].max() - df['time'].min() if len(df) > 1 else 0
                 avg_throughput = (total_bytes * 8) / (duration * 1e6) if duration > 0 else 0
-                packets = len(df)
+                packets = int(df['packets'].sum()) if 'packets' in df else len(df)
                 
-                # Tính throughput theo cửa sổ trượt 5 giây
-                df_windowed = df.copy()
-                window_size = 5.0
-                df_windowed['time_window'] = (df_windowed['time'] // window_size) * window_size
-                windowed_stats = df_windowed.groupby('time_window')['bytes'].sum()
+                # Throughput theo cửa sổ 5 giây, lấy từ chỉ mục throughput (không quét lại mẫu)
+                window_size = self.STATS_WINDOW
+                starts, window_bytes = self.throughput_index(key).active_windows(window_size)
+                windowed_stats = pd.Series(window_bytes, index=pd.Index(starts, name='time_window'), name='bytes')
                 windowed_throughput = (windowed_stats * 8) / (window_size * 1e6)
                 
                 self.stats[key] = {
@@ -130,9 +364,9 @@ class TCPAnalyzer:
                 std_cwnd = df['cwnd'].std()
                 
                 # Tính biến động CWND
-                df['cwnd_change'] = df['cwnd'].diff()
-                increases = (df['cwnd_change'] > 0).sum()
-                decreases = (df['cwnd_change'] < 0).sum()
+                cwnd_change = df['cwnd'].diff()
+                increases = (cwnd_change > 0).sum()
+                decreases = (cwnd_change < 0).sum()
                 
                 self.stats[key] = {
                     'flow_name': flow_name,
@@ -145,26 +379,204 @@ class TCPAnalyzer:
                     'avg_cwnd_kb': avg_cwnd / 1024,
                     'cwnd_increases': increases,
                     'cwnd_decreases': decreases,
-                    'cwnd_stability': 1 - (std_cwnd / avg_cwnd) if avg_cwnd > 0 else 0
+                    'cwnd_stability': 1 - (std_cwnd / avg_cwnd) if avg_cwnd > 0 else 0,
+                    # Sự kiện tắc nghẽn: fast recovery, RTO, partial ACK, pha slow start/CA
+                    **congestion_events.summarize(df['time'].values, df['cwnd'].values)
                 }
         
+        self.calculate_fairness()
         print("✅ Hoàn thành tính toán thống kê")
     
-    def create_comprehensive_plots(self):
-        """Tạo các biểu đồ phân tích đầy đủ"""
+    def calculate_statistics_streaming(self, chunk_size=streaming_stats.DEFAULT_CHUNK_SIZE):
+        """Tính thống kê trực tiếp từ file theo từng chunk, không cần load_all_data()
+
+        Cho kết quả self.stats giống calculate_statistics() nhưng bộ nhớ đỉnh
+        chỉ phụ thuộc chunk_size thay vì độ dài trace.
+        """
+        print(f"🔢 Đang tính toán thống kê (streaming, chunk {chunk_size:,} dòng)...")
+        
+        for key, (_, flow_name) in self.TRACE_FILES.items():
+            filename = self.trace_path(key)
+            if not os.path.exists(filename) or trace_reader.is_empty(filename):
+                continue
+            
+            try:
+                bin_width = trace_reader.bin_width(filename)
+                if key.endswith('_rx'):
+                    acc = streaming_stats.RxStreamingStats(window_size=self.STATS_WINDOW, bin_width=bin_width)
+                else:
+                    acc = streaming_stats.CwndStreamingStats()
+                
+                if bin_width is not None:
+                    acc.update(*trace_reader.read_binned_trace(filename))
+                else:
+                    for times, values in trace_reader.iter_chunks(filename, chunk_size):
+                        acc.update(times, values)
+                self.stats[key] = acc.result(flow_name)
+                if key.endswith('_rx'):
+                    self.indexes[key] = acc.index
+            except Exception as e:
+                print(f"❌ Lỗi đọc file {filename}: {e}")
+        
+        self.calculate_fairness()
+        print("✅ Hoàn thành tính toán thống kê")
+    
+    def calculate_fairness(self, window=None):
+        """Công bằng Jain, tỉ lệ nút cổ chai từng luồng và TCP/UDP theo cửa sổ -> self.stats['fairness']
+
+        Dùng mẫu trong self.data nếu đã load_all_data(), ngược lại dùng chỉ mục
+        throughput do calculate_statistics_streaming() để lại (bucket rộng STATS_WINDOW).
+        """
+        window = window or self.STATS_WINDOW
+        keys = [key for key in self.TRACE_FILES if key.endswith('_rx') and key in self.stats]
+        if not keys:
+            return
+        
+        frames = [self.data.get(key) for key in keys]
+        if all(df is not None and not df.empty for df in frames):
+            # Một lần bincount trên mẫu của mọi luồng nối liền
+            starts, window_bytes = fairness.window_matrix(
+                np.concatenate([df['time'].values for df in frames]),
+                np.concatenate([df['bytes'].values for df in frames]),
+                np.repeat(np.arange(len(keys)), [len(df) for df in frames]),
+                len(keys), window)
+        else:
+            horizon = max(self.stats[key]['end_time'] for key in keys)
+            n_windows = int(horizon // window) + 1
+            starts = np.arange(n_windows) * window
+            window_bytes = np.vstack([self.indexes[key].window_sums(window, 0.0, n_windows * window)[1]
+                                      for key in keys])
+        
+        result = fairness.analyze(window_bytes, starts, window,
+                                  is_udp=[key.startswith('udp') for key in keys])
+        result['flow_keys'] = keys
+        result['flow_names'] = [self.stats[key]['flow_name'] for key in keys]
+        self.stats['fairness'] = result
+    
+    def load_flowmon_statistics(self):
+        """Thêm thống kê FlowMonitor (mất gói, độ trễ, jitter, histogram) vào self.stats['flowmon']"""
+        filename = trace_reader.find_trace(os.path.join(self.data_dir, self.FLOWMON_FILE))
+        if not os.path.exists(filename):
+            print(f"⚠️  File {filename} không tồn tại")
+            return
+        
+        print("📡 Đang đọc kết quả FlowMonitor...")
+        # 'newreno_rx' -> 'newreno' là key luồng dùng trong flowmon_parser.FLOW_PORTS
+        flow_names = {key[:-len('_rx')]: name for key, (_, name) in self.TRACE_FILES.items()
+                      if key.endswith('_rx')}
+        try:
+            self.stats['flowmon'] = flowmon_parser.flow_statistics(filename, flow_names)
+            print(f"✅ Đã đọc FlowMonitor: {len(self.stats['flowmon'])} luồng")
+        except Exception as e:
+            print(f"❌ Lỗi đọc file {filename}: {e}")
+    
+    def load_pcap_statistics(self):
+        """Thêm RTT, truyền lại và goodput từ file pcap vào self.stats['pcap'] (nếu mô phỏng ghi pcap)"""
+        filename = trace_reader.find_trace(os.path.join(self.data_dir, self.PCAP_FILE))
+        if not os.path.exists(filename):
+            return  # pcap chỉ được ghi khi chạy mô phỏng với --pcap=true
+        
+        print("📶 Đang đọc file pcap...")
+        flow_names = {key[:-len('_rx')]: name for key, (_, name) in self.TRACE_FILES.items()
+                      if key.endswith('_rx')}
+        try:
+            self.stats['pcap'] = pcap_reader.flow_statistics(filename, flow_names, window=self.STATS_WINDOW)
+            print(f"✅ Đã đọc pcap: {len(self.stats['pcap'])} luồng TCP")
+        except Exception as e:
+            print(f"❌ Lỗi đọc file {filename}: {e}")
+    
+    # Các biểu đồ: tên -> (file ảnh không có đuôi, method vẽ, key dữ liệu, key thống kê)
+    FIGURES = {
+        'throughput': ('tcp_throughput_analysis', 'plot_throughput_figure',
+                       ['newreno_rx', 'reno_rx'], []),
+        'cwnd': ('tcp_cwnd_analysis', 'plot_cwnd_figure',
+                 ['newreno_rx', 'reno_rx', 'newreno_cwnd', 'reno_cwnd'], []),
+        'network': ('tcp_network_analysis', 'plot_network_figure',
+                    ['newreno_rx', 'reno_rx', 'comp1_rx', 'comp2_rx', 'udp1_rx', 'udp2_rx'],
+                    ['newreno_rx', 'reno_rx', 'comp1_rx', 'comp2_rx', 'newreno_cwnd', 'reno_cwnd']),
+        'fairness': ('tcp_fairness_analysis', 'plot_fairness_figure', [], ['fairness']),
+    }
+    
+    def create_comprehensive_plots(self, utilization_bin_width=1.0, dpi=300, fmt='png',
+                                   workers=None, use_cache=True,
+                                   max_points=decimate.DEFAULT_MAX_POINTS):
+        """Tạo các biểu đồ phân tích đầy đủ
+
+        utilization_bin_width: độ rộng bin (giây) cho biểu đồ sử dụng băng thông
+        dpi, fmt: độ phân giải và định dạng file ảnh (png, pdf, svg, ...)
+        workers: số tiến trình vẽ song song; mặc định min(số biểu đồ, số CPU), 1 = vẽ tuần tự
+        use_cache: bỏ qua biểu đồ có dữ liệu đầu vào và tham số không đổi so với lần vẽ trước
+        max_points: số điểm tối đa mỗi đường trên một trục (None = vẽ toàn bộ mẫu)
+        Trả về danh sách file ảnh.
+        """
         print("🎨 Đang tạo biểu đồ phân tích đầy đủ...")
+        load_plotting()
         
-        # Figure 1: Throughput Analysis (2x2)
+        manifest = figure_cache.load_manifest() if use_cache else {}
+        jobs = []
+        outputs = []
+        for name, (basename, method, data_keys, stats_keys) in self.FIGURES.items():
+            output = f'{basename}.{fmt}'
+            outputs.append(output)
+            kwargs = {'dpi': dpi, 'max_points': max_points}
+            if name == 'network':
+                kwargs['utilization_bin_width'] = utilization_bin_width
+            
+            digest = figure_cache.content_hash(
+                method, output, kwargs,
+                {key: self.data.get(key) for key in data_keys},
+                {key: self.stats.get(key) for key in stats_keys})
+            if use_cache and figure_cache.is_up_to_date(manifest, output, digest):
+                print(f"⏭️  Không đổi, bỏ qua: {output}")
+                continue
+            
+            # Mỗi job chỉ mang theo phần dữ liệu biểu đồ đó cần
+            job = TCPAnalyzer(use_cache=self.use_cache, data_dir=self.data_dir)
+            job.data = {key: self.data.get(key, pd.DataFrame()) for key in data_keys}
+            job.stats = {key: self.stats[key] for key in stats_keys if key in self.stats}
+            job.indexes = {key: self.indexes[key] for key in data_keys if key in self.indexes}
+            job.timeseries = {key: self.timeseries[key] for key in data_keys if key in self.timeseries}
+            jobs.append((job, method, output, kwargs, digest))
+        
+        if workers is None:
+            workers = min(len(jobs), os.cpu_count() or 1)
+        
+        trace_memory = bool(self.profiler and self.profiler.trace_memory)
+        if workers <= 1:
+            results = [_render_figure(job, method, output, kwargs, trace_memory)
+                       for job, method, output, kwargs, _ in jobs]
+        elif jobs:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_render_figure, job, method, output, kwargs, trace_memory)
+                           for job, method, output, kwargs, _ in jobs]
+                results = [future.result() for future in futures]
+        else:
+            results = []
+        
+        for (job, _, output, _, digest), metrics in zip(jobs, results):
+            print(f"✅ Đã lưu: {output}")
+            manifest[output] = digest
+            if self.profiler:
+                rows = sum(len(df) for df in job.data.values())
+                self.profiler.record(f'figure:{output}', metrics, rows=rows, workers=workers)
+        if use_cache:
+            figure_cache.save_manifest(manifest)
+        
+        return outputs
+    
+    def plot_throughput_figure(self, output, dpi=300, max_points=decimate.DEFAULT_MAX_POINTS):
+        """Figure 1: Throughput Analysis (2x2)"""
+        load_plotting()
         fig1, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
         fig1.suptitle('📈 Phân Tích Throughput Chi Tiết', fontsize=16, fontweight='bold')
         
         # 1.1: Throughput tích lũy theo thời gian
         if not self.data['newreno_rx'].empty:
-            ax1.plot(self.data['newreno_rx']['time'].values, self.data['newreno_rx']['throughput_mbps'].values, 
-                    'g-', label='TCP NewReno', linewidth=2.5, alpha=0.8)
+            decimate.plot(ax1, self.data['newreno_rx']['time'].values, self.data['newreno_rx']['throughput_mbps'].values, 
+                    'g-', label='TCP NewReno', linewidth=2.5, alpha=0.8, max_points=max_points)
         if not self.data['reno_rx'].empty:
-            ax1.plot(self.data['reno_rx']['time'].values, self.data['reno_rx']['throughput_mbps'].values, 
-                    'r-', label='TCP Reno', linewidth=2.5, alpha=0.8)
+            decimate.plot(ax1, self.data['reno_rx']['time'].values, self.data['reno_rx']['throughput_mbps'].values, 
+                    'r-', label='TCP Reno', linewidth=2.5, alpha=0.8, max_points=max_points)
         
         ax1.set_xlabel('Thời gian (giây)', fontsize=11)
         ax1.set_ylabel('Throughput tích lũy (Mbps)', fontsize=11)
@@ -172,20 +584,20 @@ class TCPAnalyzer:
         ax1.legend(fontsize=10)
         ax1.grid(True, alpha=0.3)
         
-        # 1.2: Throughput tức thời (moving average)
-        window = 50  # Cửa sổ trung bình trượt
-        if not self.data['newreno_rx'].empty and len(self.data['newreno_rx']) > window:
-            newreno_smooth = self.data['newreno_rx']['instant_throughput'].rolling(window=window).mean()
-            ax2.plot(self.data['newreno_rx']['time'].values, newreno_smooth.values, 
-                    'g-', label='TCP NewReno (MA)', linewidth=2)
-        if not self.data['reno_rx'].empty and len(self.data['reno_rx']) > window:
-            reno_smooth = self.data['reno_rx']['instant_throughput'].rolling(window=window).mean()
-            ax2.plot(self.data['reno_rx']['time'].values, reno_smooth.values, 
-                    'r-', label='TCP Reno (MA)', linewidth=2)
+        # 1.2: Throughput theo cửa sổ thời gian (từ chỉ mục throughput)
+        window = self.SMOOTHING_WINDOW
+        if not self.data['newreno_rx'].empty:
+            times, throughput = self.smoothed_throughput('newreno_rx', window)
+            decimate.plot(ax2, times, throughput, 
+                    'g-', label=f'TCP NewReno ({window:g}s)', linewidth=2, max_points=max_points)
+        if not self.data['reno_rx'].empty:
+            times, throughput = self.smoothed_throughput('reno_rx', window)
+            decimate.plot(ax2, times, throughput, 
+                    'r-', label=f'TCP Reno ({window:g}s)', linewidth=2, max_points=max_points)
         
         ax2.set_xlabel('Thời gian (giây)', fontsize=11)
-        ax2.set_ylabel('Throughput tức thời (Mbps)', fontsize=11)
-        ax2.set_title('Throughput Tức Thời (Moving Average)', fontweight='bold')
+        ax2.set_ylabel('Throughput (Mbps)', fontsize=11)
+        ax2.set_title(f'Throughput Theo Cửa Sổ {window:g}s', fontweight='bold')
         ax2.legend(fontsize=10)
         ax2.grid(True, alpha=0.3)
         
@@ -224,20 +636,22 @@ class TCPAnalyzer:
         ax4.grid(True, alpha=0.3)
         
         plt.tight_layout()
-        plt.savefig('tcp_throughput_analysis.png', dpi=300, bbox_inches='tight')
-        print("✅ Đã lưu: tcp_throughput_analysis.png")
-        
-        # Figure 2: Congestion Window Analysis (2x2)
+        plt.savefig(output, dpi=dpi, bbox_inches='tight')
+        plt.close(fig1)
+    
+    def plot_cwnd_figure(self, output, dpi=300, max_points=decimate.DEFAULT_MAX_POINTS):
+        """Figure 2: Congestion Window Analysis (2x2)"""
+        load_plotting()
         fig2, ((ax5, ax6), (ax7, ax8)) = plt.subplots(2, 2, figsize=(16, 12))
         fig2.suptitle('🔧 Phân Tích Congestion Window Chi Tiết', fontsize=16, fontweight='bold')
         
         # 2.1: CWND theo thời gian
         if not self.data['newreno_cwnd'].empty:
-            ax5.plot(self.data['newreno_cwnd']['time'].values, self.data['newreno_cwnd']['cwnd_kb'].values, 
-                    'g-', label='TCP NewReno', linewidth=2, alpha=0.8)
+            decimate.plot(ax5, self.data['newreno_cwnd']['time'].values, self.data['newreno_cwnd']['cwnd_kb'].values, 
+                    'g-', label='TCP NewReno', linewidth=2, alpha=0.8, max_points=max_points)
         if not self.data['reno_cwnd'].empty:
-            ax5.plot(self.data['reno_cwnd']['time'].values, self.data['reno_cwnd']['cwnd_kb'].values, 
-                    'r-', label='TCP Reno', linewidth=2, alpha=0.8)
+            decimate.plot(ax5, self.data['reno_cwnd']['time'].values, self.data['reno_cwnd']['cwnd_kb'].values, 
+                    'r-', label='TCP Reno', linewidth=2, alpha=0.8, max_points=max_points)
         
         ax5.set_xlabel('Thời gian (giây)', fontsize=11)
         ax5.set_ylabel('Congestion Window (KB)', fontsize=11)
@@ -248,12 +662,12 @@ class TCPAnalyzer:
         # 2.2: CWND growth rate
         if not self.data['newreno_cwnd'].empty:
             newreno_growth = self.data['newreno_cwnd']['cwnd'].diff() / self.data['newreno_cwnd']['time'].diff()
-            ax6.plot(self.data['newreno_cwnd']['time'].values[1:], newreno_growth.values[1:], 
-                    'g-', label='TCP NewReno', alpha=0.7)
+            decimate.plot(ax6, self.data['newreno_cwnd']['time'].values[1:], newreno_growth.values[1:], 
+                    'g-', label='TCP NewReno', alpha=0.7, max_points=max_points)
         if not self.data['reno_cwnd'].empty:
             reno_growth = self.data['reno_cwnd']['cwnd'].diff() / self.data['reno_cwnd']['time'].diff()
-            ax6.plot(self.data['reno_cwnd']['time'].values[1:], reno_growth.values[1:], 
-                    'r-', label='TCP Reno', alpha=0.7)
+            decimate.plot(ax6, self.data['reno_cwnd']['time'].values[1:], reno_growth.values[1:], 
+                    'r-', label='TCP Reno', alpha=0.7, max_points=max_points)
         
         ax6.set_xlabel('Thời gian (giây)', fontsize=11)
         ax6.set_ylabel('Tốc độ thay đổi CWND (bytes/s)', fontsize=11)
@@ -275,33 +689,17 @@ class TCPAnalyzer:
         ax7.legend(fontsize=10)
         ax7.grid(True, alpha=0.3)
         
-        # 2.4: CWND vs Throughput correlation
-        if not self.data['newreno_rx'].empty and not self.data['newreno_cwnd'].empty:
-            # Interpolate để match time stamps
-            common_times = np.intersect1d(
-                np.round(self.data['newreno_rx']['time'].values, 1),
-                np.round(self.data['newreno_cwnd']['time'].values, 1)
-            )
-            if len(common_times) > 10:
-                rx_interp = np.interp(common_times, self.data['newreno_rx']['time'].values, 
-                                    self.data['newreno_rx']['instant_throughput'].values)
-                cwnd_interp = np.interp(common_times, self.data['newreno_cwnd']['time'].values, 
-                                      self.data['newreno_cwnd']['cwnd_kb'].values)
-                ax8.scatter(cwnd_interp, rx_interp, alpha=0.6, color='green', 
-                          label='TCP NewReno', s=20)
-        
-        if not self.data['reno_rx'].empty and not self.data['reno_cwnd'].empty:
-            common_times = np.intersect1d(
-                np.round(self.data['reno_rx']['time'].values, 1),
-                np.round(self.data['reno_cwnd']['time'].values, 1)
-            )
-            if len(common_times) > 10:
-                rx_interp = np.interp(common_times, self.data['reno_rx']['time'].values, 
-                                    self.data['reno_rx']['instant_throughput'].values)
-                cwnd_interp = np.interp(common_times, self.data['reno_cwnd']['time'].values, 
-                                      self.data['reno_cwnd']['cwnd_kb'].values)
-                ax8.scatter(cwnd_interp, rx_interp, alpha=0.6, color='red', 
-                          label='TCP Reno', s=20)
+        # 2.4: CWND vs Throughput correlation: mỗi mẫu CWND ghép với mẫu throughput gần nhất
+        for rx_key, cwnd_key, color, label in (('newreno_rx', 'newreno_cwnd', 'green', 'TCP NewReno'),
+                                               ('reno_rx', 'reno_cwnd', 'red', 'TCP Reno')):
+            if self.data[rx_key].empty or self.data[cwnd_key].empty:
+                continue
+            times, joined = self.series(cwnd_key).join(
+                self.series(rx_key), ['cwnd_kb'], ['instant_throughput'],
+                direction='nearest', tolerance=self.ALIGN_TOLERANCE)
+            if len(times) > 10:
+                decimate.scatter(ax8, times, joined['cwnd_kb'], joined['instant_throughput'], alpha=0.6,
+                                 color=color, label=label, s=20, max_points=max_points)
         
         ax8.set_xlabel('Congestion Window (KB)', fontsize=11)
         ax8.set_ylabel('Throughput tức thời (Mbps)', fontsize=11)
@@ -310,10 +708,13 @@ class TCPAnalyzer:
         ax8.grid(True, alpha=0.3)
         
         plt.tight_layout()
-        plt.savefig('tcp_cwnd_analysis.png', dpi=300, bbox_inches='tight')
-        print("✅ Đã lưu: tcp_cwnd_analysis.png")
-        
-        # Figure 3: Network Overview & Competing Flows
+        plt.savefig(output, dpi=dpi, bbox_inches='tight')
+        plt.close(fig2)
+    
+    def plot_network_figure(self, output, dpi=300, utilization_bin_width=1.0,
+                            max_points=decimate.DEFAULT_MAX_POINTS):
+        """Figure 3: Network Overview & Competing Flows"""
+        load_plotting()
         fig3, ((ax9, ax10), (ax11, ax12)) = plt.subplots(2, 2, figsize=(16, 12))
         fig3.suptitle('🌐 Phân Tích Toàn Mạng & Luồng Cạnh Tranh', fontsize=16, fontweight='bold')
         
@@ -324,32 +725,23 @@ class TCPAnalyzer:
         
         for i, (key, color, name) in enumerate(zip(data_keys, colors, flow_names)):
             if key in self.data and not self.data[key].empty:
-                if len(self.data[key]) > 50:  # Smooth data if enough points
-                    smooth_throughput = self.data[key]['instant_throughput'].rolling(window=30).mean()
-                    ax9.plot(self.data[key]['time'].values, smooth_throughput.values, 
-                            color=color, label=name, linewidth=2, alpha=0.8)
-                else:
-                    ax9.plot(self.data[key]['time'].values, self.data[key]['instant_throughput'].values, 
-                            color=color, label=name, linewidth=2, alpha=0.8)
+                times, throughput = self.smoothed_throughput(key, self.SMOOTHING_WINDOW)
+                decimate.plot(ax9, times, throughput, 
+                        color=color, label=name, linewidth=2, alpha=0.8, max_points=max_points)
         
         ax9.set_xlabel('Thời gian (giây)', fontsize=11)
-        ax9.set_ylabel('Throughput tức thời (Mbps)', fontsize=11)
+        ax9.set_ylabel(f'Throughput cửa sổ {self.SMOOTHING_WINDOW:g}s (Mbps)', fontsize=11)
         ax9.set_title('Tất Cả Luồng Dữ Liệu', fontweight='bold')
         ax9.legend(fontsize=9)
         ax9.grid(True, alpha=0.3)
         
-        # 3.2: Network utilization over time
-        time_range = np.arange(0, 200, 1)  # 1 second intervals
-        total_utilization = np.zeros_like(time_range, dtype=float)
-        
-        for key in data_keys:
-            if key in self.data and not self.data[key].empty:
-                df = self.data[key]
-                for t in time_range:
-                    mask = (df['time'] >= t) & (df['time'] < t + 1)
-                    if mask.any():
-                        total_utilization[t] += df[mask]['instant_throughput'].mean()
+        # 3.2: Network utilization over time: tổng throughput các luồng theo bin utilization_bin_width
+        active_keys = [key for key in data_keys if key in self.data and not self.data[key].empty]
+        horizon = max((self.data[key]['time'].iloc[-1] for key in active_keys), default=0.0)
+        time_range, _, total_utilization = timeline.utilization_timeline(
+            {key: self.throughput_index(key) for key in active_keys}, utilization_bin_width, horizon)
         
+        time_range, total_utilization = decimate.decimate(time_range, total_utilization, max_points)
         ax10.plot(time_range, total_utilization, 'b-', linewidth=2, label='Tổng utilization')
         ax10.axhline(y=5, color='red', linestyle='--', alpha=0.7, label='WAN limit (5 Mbps)')
         ax10.fill_between(time_range, total_utilization, alpha=0.3)
@@ -425,8 +817,68 @@ class TCPAnalyzer:
             ax12.legend(loc='upper right', bbox_to_anchor=(1.3, 1.0))
         
         plt.tight_layout()
-        plt.savefig('tcp_network_analysis.png', dpi=300, bbox_inches='tight')
-        print("✅ Đã lưu: tcp_network_analysis.png")
+        plt.savefig(output, dpi=dpi, bbox_inches='tight')
+        plt.close(fig3)
+    
+    def plot_fairness_figure(self, output, dpi=300, max_points=decimate.DEFAULT_MAX_POINTS):
+        """Figure 4: Fairness & Bottleneck Share"""
+        load_plotting()
+        fig4, ((ax13, ax14), (ax15, ax16)) = plt.subplots(2, 2, figsize=(16, 12))
+        fig4.suptitle('⚖️ Công Bằng & Chia Sẻ Băng Thông Nút Cổ Chai', fontsize=16, fontweight='bold')
+        
+        result = self.stats.get('fairness')
+        if result is None:
+            plt.close(fig4)
+            return
+        starts, names = result['starts'], result['flow_names']
+        
+        # 4.1: Jain's fairness index theo thời gian
+        contended = result['active_flows'] >= 2
+        jain = np.where(contended, result['jain'], np.nan)
+        ax13.step(starts, jain, where='post', color='purple', linewidth=2, label="Jain's index")
+        ax13.axhline(y=result['mean_jain'], color='gray', linestyle='--', alpha=0.7,
+                     label=f"Trung bình {result['mean_jain']:.3f}")
+        ax13.set_ylim(0, 1.05)
+        ax13.set_xlabel('Thời gian (giây)', fontsize=11)
+        ax13.set_ylabel("Jain's fairness index", fontsize=11)
+        ax13.set_title(f"Chỉ Số Công Bằng Jain (cửa sổ {result['window']:g}s)", fontweight='bold')
+        ax13.legend(fontsize=10)
+        ax13.grid(True, alpha=0.3)
+        
+        # 4.2: Tỉ lệ nút cổ chai của từng luồng (xếp chồng)
+        ax14.stackplot(starts, result['share'] * 100, labels=names, alpha=0.8, step='post')
+        ax14.axhline(y=100, color='red', linestyle='--', alpha=0.7, label='WAN limit (5 Mbps)')
+        ax14.set_xlabel('Thời gian (giây)', fontsize=11)
+        ax14.set_ylabel('Tỉ lệ dung lượng WAN (%)', fontsize=11)
+        ax14.set_title('Chia Sẻ Nút Cổ Chai Theo Luồng', fontweight='bold')
+        ax14.legend(fontsize=9, loc='upper right')
+        ax14.grid(True, alpha=0.3)
+        
+        # 4.3: TCP vs UDP trong tổng lưu lượng
+        ax15.stackplot(starts, np.nan_to_num(result['tcp_share']) * 100,
+                       np.nan_to_num(result['udp_share']) * 100,
+                       labels=['TCP', 'UDP'], colors=['steelblue', 'darkorange'], alpha=0.8, step='post')
+        ax15.set_ylim(0, 100)
+        ax15.set_xlabel('Thời gian (giây)', fontsize=11)
+        ax15.set_ylabel('Tỉ lệ lưu lượng (%)', fontsize=11)
+        ax15.set_title('TCP vs UDP', fontweight='bold')
+        ax15.legend(fontsize=10)
+        ax15.grid(True, alpha=0.3)
+        
+        # 4.4: Tỉ lệ nút cổ chai trung bình khi luồng hoạt động
+        mean_share = result['mean_share'] * 100
+        bars = ax16.bar(names, mean_share, color=sns.color_palette(n_colors=len(names)), alpha=0.8)
+        ax16.set_ylabel('Tỉ lệ WAN trung bình khi hoạt động (%)', fontsize=11)
+        ax16.set_title('Tỉ Lệ Nút Cổ Chai Trung Bình', fontweight='bold')
+        ax16.tick_params(axis='x', rotation=45)
+        ax16.grid(True, alpha=0.3)
+        for bar, val in zip(bars, mean_share):
+            ax16.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.5,
+                     f'{val:.1f}%', ha='center', va='bottom', fontweight='bold')
+        
+        plt.tight_layout()
+        plt.savefig(output, dpi=dpi, bbox_inches='tight')
+        plt.close(fig4)
     
     def generate_detailed_report(self):
         """Tạo báo cáo chi tiết"""
@@ -492,6 +944,44 @@ class TCPAnalyzer:
                 report.append(f"     • Độ lệch chuẩn: {stats['std_cwnd']:.0f} bytes")
                 report.append(f"     • Tăng/Giảm: {stats['cwnd_increases']}/{stats['cwnd_decreases']} lần")
                 report.append(f"     • Độ ổn định: {stats['cwnd_stability']:.3f} (0-1)")
+                report.append(f"  ⚡ Sự kiện tắc nghẽn:")
+                report.append(f"     • Mất gói: {stats['loss_events']} lần (fast recovery {stats['fast_recovery_events']}, "
+                              f"RTO {stats['rto_events']}), partial ACK: {stats['partial_ack_deflations']} lần")
+                report.append(f"     • Thời gian phục hồi: TB {stats['mean_recovery_time']:.2f}s, "
+                              f"tối đa {stats['max_recovery_time']:.2f}s ({stats['unrecovered_events']} lần chưa phục hồi)")
+                report.append(f"     • Khoảng cách giữa các lần mất gói: TB {stats['mean_time_between_losses']:.2f}s, "
+                              f"ngắn nhất {stats['min_time_between_losses']:.2f}s")
+                report.append(f"     • Slow start / Congestion avoidance: {stats['slow_start_time']:.1f}s / "
+                              f"{stats['congestion_avoidance_time']:.1f}s")
+        
+        # FlowMonitor: mất gói & độ trễ
+        if self.stats.get('flowmon'):
+            report.append("\n📡 FLOWMONITOR: MẤT GÓI & ĐỘ TRỄ")
+            report.append("-" * 40)
+            for fm in self.stats['flowmon'].values():
+                report.append(f"• {fm['flow_name']}: mất {fm['lost_packets']:,}/{fm['tx_packets']:,} gói ({fm['loss_rate']:.2f}%), "
+                              f"delay TB {fm['avg_delay'] * 1000:.2f} ms, jitter TB {fm['avg_jitter'] * 1000:.3f} ms")
+        
+        # pcap: RTT, truyền lại & goodput
+        if self.stats.get('pcap'):
+            report.append("\n📶 PCAP: RTT, TRUYỀN LẠI & GOODPUT")
+            report.append("-" * 40)
+            for pc in self.stats['pcap'].values():
+                report.append(f"• {pc['flow_name']}: RTT TB {pc['avg_rtt'] * 1000:.1f} ms "
+                              f"(min {pc['min_rtt'] * 1000:.1f}, p95 {pc['p95_rtt'] * 1000:.1f} ms), "
+                              f"truyền lại {pc['retransmissions']:,}/{pc['packets']:,} đoạn ({pc['retransmission_rate']:.2f}%), "
+                              f"goodput {pc['avg_goodput']:.2f} / throughput {pc['avg_throughput']:.2f} Mbps")
+        
+        # Fairness
+        if self.stats.get('fairness'):
+            fair = self.stats['fairness']
+            report.append(f"\n⚖️ CÔNG BẰNG & CHIA SẺ NÚT CỔ CHAI (cửa sổ {fair['window']:g}s)")
+            report.append("-" * 40)
+            report.append(f"• Chỉ số Jain: TB {fair['mean_jain']:.3f}, thấp nhất {fair['min_jain']:.3f} "
+                          f"(các cửa sổ có >= 2 luồng)")
+            report.append(f"• TCP vs UDP: {fair['tcp_total_share'] * 100:.1f}% / {fair['udp_total_share'] * 100:.1f}% tổng lưu lượng")
+            for name, share in zip(fair['flow_names'], fair['mean_share']):
+                report.append(f"• {name}: TB {share * 100:.1f}% dung lượng WAN khi hoạt động")
         
         # Network Analysis
         report.append("\n🌐 PHÂN TÍCH MẠNG TỔNG THỂ")
@@ -547,24 +1037,172 @@ class TCPAnalyzer:
             print(line)
         print("="*60)
     
-    def run_full_analysis(self):
-        """Chạy phân tích đầy đủ"""
+    def follow(self, interval=5.0, idle_timeout=30.0):
+        """Theo dõi các file trace trong lúc mô phỏng đang chạy, in tóm tắt mỗi interval giây
+
+        Chỉ đọc phần mới ghi thêm của mỗi file; dừng khi không có dữ liệu mới
+        trong idle_timeout giây (None = theo dõi tới khi Ctrl+C). Thống kê cuối
+        được ghi vào self.stats. Trả về True nếu mô phỏng có vẻ đã kết thúc.
+        """
+        live = live_tail.LiveAnalyzer(self.TRACE_FILES, self.data_dir)
+        finished = live.follow(interval, idle_timeout)
+        self.stats.update(live.stats())
+        return finished
+    
+    def save_stats(self, json_file=None, csv_file=None):
+        """Ghi self.stats ra JSON (đầy đủ) và/hoặc CSV (các giá trị vô hướng)"""
+        if json_file:
+            stats_export.write_json(self.stats, json_file)
+        if csv_file:
+            stats_export.write_csv(self.stats, csv_file)
+    
+    def save_results(self, path=results_store.DEFAULT_DB, label=None, params=None):
+        """Lưu self.stats và tham số lần chạy vào kho kết quả SQLite, trả về run_id"""
+        params = {'stats_window': self.STATS_WINDOW,
+                  'bottleneck_mbps': fairness.BOTTLENECK_MBPS, **(params or {})}
+        self.run_id = results_store.save_run(self.stats, params, os.path.abspath(self.data_dir),
+                                             label, path)
+        print(f"✅ Đã lưu lần chạy #{self.run_id} vào kho kết quả: {path}")
+        return self.run_id
+    
+    def load_results(self, run_id=None, path=results_store.DEFAULT_DB):
+        """Nạp self.stats của một lần chạy đã lưu (None = lần mới nhất) thay vì đọc lại trace"""
+        if not os.path.exists(path):
+            print(f"⚠️  File {path} không tồn tại")
+            return False
+        self.run_id, self.stats = results_store.load_stats(run_id, path)
+        if self.run_id is None:
+            print(f"⚠️  Kho kết quả {path} chưa có lần chạy nào")
+            return False
+        print(f"✅ Đã nạp lần chạy #{self.run_id} từ kho kết quả: {path}")
+        return True
+    
+    def run_full_analysis(self, profile_output=None, cprofile_output=None, trace_memory=False,
+                          time_range=None, stats_only=False, streaming=False, store=None, label=None):
+        """Chạy phân tích đầy đủ
+
+        profile_output: ghi thời gian wall/CPU, RSS đỉnh và số dòng của từng bước
+                        (mỗi file trace, mỗi biểu đồ) ra file JSON này
+        cprofile_output: ghi kết quả cProfile của toàn bộ lần chạy ra file .prof
+        trace_memory: đo thêm đỉnh cấp phát bằng tracemalloc (chậm hơn)
+        time_range: (t0, t1) - chỉ phân tích dữ liệu trong khoảng thời gian này
+        stats_only: chỉ tính thống kê, không vẽ biểu đồ và không ghi báo cáo
+        streaming: tính thống kê trực tiếp từ file theo chunk (không giữ trace trong bộ nhớ)
+        store: file SQLite của results_store để lưu thống kê lần chạy (None = không lưu)
+        label: nhãn của lần chạy trong kho kết quả
+        """
+        if streaming and not (stats_only and time_range is None):
+            raise ValueError("streaming chỉ dùng được với stats_only và không có time_range")
+        
         print("🚀 Bắt đầu phân tích đầy đủ TCP NewReno vs TCP Reno")
         print("="*60)
         
-        self.load_all_data()
-        self.calculate_statistics()
-        self.create_comprehensive_plots()
-        self.generate_detailed_report()
+        if profile_output:
+            self.profiler = stage_profiler.StageProfiler(trace_memory=trace_memory)
+        
+        with stage_profiler.cprofile_to(cprofile_output):
+            if streaming:
+                with self.profile_stage('calculate_statistics_streaming'):
+                    self.calculate_statistics_streaming()
+            else:
+                with self.profile_stage('load_all_data') as record:
+                    self.load_all_data()
+                    if time_range:
+                        self.restrict_time_range(*time_range)
+                    record['rows'] = sum(len(df) for df in self.data.values())
+                with self.profile_stage('calculate_statistics', rows=record.get('rows', 0)):
+                    self.calculate_statistics()
+            with self.profile_stage('load_flowmon_statistics'):
+                self.load_flowmon_statistics()
+            with self.profile_stage('load_pcap_statistics'):
+                self.load_pcap_statistics()
+            if store:
+                with self.profile_stage('save_results'):
+                    self.save_results(store, label, {'time_range': time_range, 'streaming': streaming})
+            if not stats_only:
+                with self.profile_stage('create_comprehensive_plots'):
+                    self.create_comprehensive_plots()
+                with self.profile_stage('generate_detailed_report'):
+                    self.generate_detailed_report()
+        
+        if self.profiler:
+            self.profiler.summary()
+            self.profiler.save(profile_output)
+        
+        if stats_only:
+            print("\n🎉 HOÀN THÀNH TÍNH THỐNG KÊ (không vẽ biểu đồ)")
+            print("="*60)
+            return
         
         print("\n🎉 HOÀN THÀNH PHÂN TÍCH ĐẦY ĐỦ!")
         print("📁 Các file được tạo:")
         print("   • tcp_throughput_analysis.png - Phân tích throughput")
         print("   • tcp_cwnd_analysis.png - Phân tích congestion window")
         print("   • tcp_network_analysis.png - Phân tích mạng tổng thể")
+        print("   • tcp_fairness_analysis.png - Công bằng & chia sẻ nút cổ chai")
         print("   • tcp_analysis_report.txt - Báo cáo chi tiết")
+        if self.run_id is not None:
+            print(f"   • {store} - Kho kết quả (lần chạy #{self.run_id})")
         print("="*60)
 
+def _render_figure(analyzer, method, output, kwargs, trace_memory=False):
+    """Vẽ một biểu đồ (chạy trong tiến trình worker hoặc tuần tự), trả về số đo của bước vẽ"""
+    load_plotting()
+    plt.switch_backend('Agg')
+    _, metrics = stage_profiler.measure(getattr(analyzer, method), output,
+                                        trace_memory=trace_memory, **kwargs)
+    return metrics
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Phân tích đầy đủ TCP NewReno vs TCP Reno')
+    parser.add_argument('--profile', default=None, metavar='FILE.json',
+                        help='Ghi thời gian và bộ nhớ của từng bước ra file JSON')
+    parser.add_argument('--cprofile', default=None, metavar='FILE.prof',
+                        help='Ghi kết quả cProfile (xem bằng python -m pstats)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Đo đỉnh cấp phát bằng tracemalloc (chậm hơn)')
+    parser.add_argument('--follow', type=float, default=None, metavar='N',
+                        help='Theo dõi trace khi mô phỏng đang chạy, in tóm tắt mỗi N giây; '
+                             'phân tích đầy đủ khi mô phỏng kết thúc')
+    parser.add_argument('--idle-timeout', type=float, default=30.0,
+                        help='Coi mô phỏng đã kết thúc sau số giây không có dữ liệu mới (mặc định 30)')
+    parser.add_argument('--time-range', type=float, nargs=2, default=None, metavar=('T0', 'T1'),
+                        help='Chỉ phân tích dữ liệu trong [T0, T1) giây, ví dụ 60 140 (khoảng chạy của Reno)')
+    parser.add_argument('--data-dir', default='.',
+                        help='Thư mục chứa các file trace của lần chạy (mặc định: thư mục hiện tại)')
+    parser.add_argument('--stats-only', action='store_true',
+                        help='Chỉ tính thống kê: không import matplotlib, không vẽ biểu đồ, không ghi báo cáo')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Tính thống kê theo chunk từ file (cần --stats-only, không dùng với --time-range)')
+    parser.add_argument('--stats-json', default=None, metavar='FILE.json',
+                        help='Ghi toàn bộ thống kê ra file JSON')
+    parser.add_argument('--stats-csv', default=None, metavar='FILE.csv',
+                        help='Ghi các thống kê vô hướng ra file CSV (key,metric,value)')
+    parser.add_argument('--store', nargs='?', const='', default=None, metavar='FILE.db',
+                        help='Lưu lần chạy vào kho kết quả SQLite (mặc định không lưu; '
+                             f'--store không kèm đường dẫn: {results_store.DEFAULT_DB} trong --data-dir)')
+    parser.add_argument('--label', default=None, help='Nhãn của lần chạy trong kho kết quả')
+    parser.add_argument('--from-store', type=int, nargs='?', const=0, default=None, metavar='RUN_ID',
+                        help='Tạo lại báo cáo từ kho kết quả, không đọc trace (mặc định: lần chạy mới nhất)')
+    args = parser.parse_args(argv)
+    if args.streaming and (not args.stats_only or args.time_range):
+        parser.error('--streaming cần --stats-only và không dùng được với --time-range')
+    
+    store = args.store or os.path.join(args.data_dir, results_store.DEFAULT_DB)
+    
+    analyzer = TCPAnalyzer(data_dir=args.data_dir)
+    if args.from_store is not None:
+        if analyzer.load_results(args.from_store or None, store):
+            analyzer.generate_detailed_report()
+            analyzer.save_stats(args.stats_json, args.stats_csv)
+        return
+    if args.follow is None or analyzer.follow(args.follow, args.idle_timeout):
+        analyzer.run_full_analysis(args.profile, args.cprofile, args.trace_memory, args.time_range,
+                                   stats_only=args.stats_only, streaming=args.streaming,
+                                   store=None if args.store is None else store, label=args.label)
+        analyzer.save_stats(args.stats_json, args.stats_csv)
+
+
 if __name__ == "__main__":
-    analyzer = TCPAnalyzer()
-    analyzer.run_full_analysis() 
\ No newline at end of file
+    main()
@@ -6,43 +6,36 @@ Không cần matplotlib - chỉ phân tích văn bản
 """
 
 import os
+import trace_reader
 
 def read_rx_data(filename):
     """Đọc dữ liệu throughput từ file rx data"""
+    filename = trace_reader.find_trace(filename)
     if not os.path.exists(filename):
         print(f"Cảnh báo: File {filename} không tồn tại")
         return []
     
     try:
-        data = []
-        with open(filename, 'r') as f:
-            for line in f:
-                parts = line.strip().split('\t')
-                if len(parts) >= 2:
-                    time = float(parts[0])
-                    bytes_val = int(parts[1])
-                    data.append((time, bytes_val))
-        return data
+        if trace_reader.bin_width(filename) is not None:
+            # Trace đã gom bin: mỗi dòng (thời điểm bắt đầu bin, bytes, số gói)
+            times, bytes_vals, packets = trace_reader.read_binned_trace(filename)
+            return list(zip(times.tolist(), bytes_vals.tolist(), packets.tolist()))
+        times, bytes_vals = trace_reader.read_trace(filename)
+        return list(zip(times.tolist(), bytes_vals.tolist()))
     except Exception as e:
         print(f"Lỗi đọc file {filename}: {e}")
         return []
 
 def read_cwnd_data(filename):
     """Đọc dữ liệu congestion window từ file cwnd data"""
+    filename = trace_reader.find_trace(filename)
     if not os.path.exists(filename):
         print(f"Cảnh báo: File {filename} không tồn tại")
         return []
     
     try:
-        data = []
-        with open(filename, 'r') as f:
-            for line in f:
-                parts = line.strip().split('\t')
-                if len(parts) >= 2:
-                    time = float(parts[0])
-                    cwnd = int(parts[1])
-                    data.append((time, cwnd))
-        return data
+        times, cwnd_vals = trace_reader.read_trace(filename)
+        return list(zip(times.tolist(), cwnd_vals.tolist()))
     except Exception as e:
         print(f"Lỗi đọc file {filename}: {e}")
         return []
@@ -52,17 +45,18 @@ def calculate_stats(rx_data):
     if not rx_data:
         return 0, 0, 0, 0
     
-    total_bytes = sum(bytes_val for _, bytes_val in rx_data)
-    start_time = min(time for time, _ in rx_data)
-    end_time = max(time for time, _ in rx_data)
+    total_bytes = sum(row[1] for row in rx_data)
+    start_time = min(row[0] for row in rx_data)
+    end_time = max(row[0] for row in rx_data)
     duration = end_time - start_time
+    num_packets = sum(row[2] for row in rx_data) if len(rx_data[0]) > 2 else len(rx_data)
     
     if duration > 0:
         avg_throughput = (total_bytes * 8) / (duration * 1e6)  # Mbps
     else:
         avg_throughput = 0
     
-    return total_bytes, duration, avg_throughput, len(rx_data)
+    return total_bytes, duration, avg_throughput, num_packets
 
 def calculate_cwnd_stats(cwnd_data):
     """Tính thống kê từ dữ liệu congestion window"""
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Phân tích hàng loạt nhiều lần chạy mô phỏng (khác RNG seed)
+Tự tìm các thư mục chứa trace enterprise-*.data (kể cả bản .bin, nén, lưu
+trữ), phân tích song song bằng process pool và tổng hợp NewReno vs Reno
+(throughput, CWND, từng luồng) với trung bình và khoảng tin cậy Student-t vào
+một bảng duy nhất.
+
+Cách dùng:
+    python3 batch_analyze.py runs/ --workers 8 --confidence 0.95
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import trace_reader
+from analyze_complete import TCPAnalyzer
+
+# Các chỉ số được lấy ra từ self.stats của mỗi lần chạy
+RX_METRICS = ['avg_throughput', 'total_mb', 'packets', 'std_throughput']
+CWND_METRICS = ['avg_cwnd_kb', 'max_cwnd_kb', 'cwnd_stability', 'cwnd_decreases', 'loss_events', 'rto_events']
+FAIRNESS_METRICS = ['mean_jain', 'min_jain', 'tcp_total_share', 'udp_total_share']
+
+
+def discover_runs(root):
+    """Tìm các thư mục (đệ quy) chứa ít nhất một file trace của TCPAnalyzer
+
+    Tính cả các biến thể mà find_trace đọc được (.bin, .delta.npz, .gz/.xz/.zst).
+    """
+    trace_names = {filename for filename, _ in TCPAnalyzer.TRACE_FILES.values()}
+    runs = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        if trace_names.intersection(trace_reader.trace_name(name) for name in filenames):
+            runs.append(dirpath)
+    return runs
+
+
+def run_metrics(analyzer_stats):
+    """Rút các chỉ số vô hướng từ self.stats thành một dict phẳng"""
+    row = {}
+    for key, flow_stats in analyzer_stats.items():
+        if key == 'fairness':
+            metrics = FAIRNESS_METRICS
+        else:
+            metrics = RX_METRICS if key.endswith('_rx') else CWND_METRICS
+        for metric in metrics:
+            if metric in flow_stats:
+                row[f'{key}.{metric}'] = float(flow_stats[metric])
+
+    # So sánh NewReno vs Reno trong cùng một lần chạy
+    newreno = row.get('newreno_rx.avg_throughput')
+    reno = row.get('reno_rx.avg_throughput')
+    if newreno is not None and reno:
+        row['newreno_vs_reno.throughput_pct'] = (newreno - reno) / reno * 100
+    newreno_cwnd = row.get('newreno_cwnd.avg_cwnd_kb')
+    reno_cwnd = row.get('reno_cwnd.avg_cwnd_kb')
+    if newreno_cwnd is not None and reno_cwnd:
+        row['newreno_vs_reno.cwnd_pct'] = (newreno_cwnd - reno_cwnd) / reno_cwnd * 100
+
+    row['network.total_throughput'] = sum(
+        v for k, v in row.items() if k.endswith('_rx.avg_throughput'))
+    return row
+
+
+def analyze_run(run_dir):
+    """Phân tích một thư mục (chạy trong tiến trình worker), trả về dict chỉ số"""
+    start = time.perf_counter()
+    analyzer = TCPAnalyzer(data_dir=run_dir)
+    # Ẩn log chi tiết của từng lần chạy, tiến trình chính sẽ in tóm tắt
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.calculate_statistics_streaming()
+    row = run_metrics(analyzer.stats)
+    row['run'] = run_dir
+    row['elapsed'] = time.perf_counter() - start
+    return row
+
+
+def confidence_interval(values, confidence=0.95):
+    """Trung bình, độ lệch chuẩn và khoảng tin cậy Student-t của một mẫu"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    n = len(values)
+    if n == 0:
+        return n, np.nan, np.nan, np.nan, np.nan
+    mean = values.mean()
+    if n == 1:
+        return n, mean, np.nan, np.nan, np.nan
+    std = values.std(ddof=1)
+    half_width = stats.t.ppf((1 + confidence) / 2, n - 1) * std / np.sqrt(n)
+    return n, mean, std, mean - half_width, mean + half_width
+
+
+def aggregate(runs_df, confidence=0.95):
+    """Bảng tổng hợp: mỗi dòng là một chỉ số (luồng, chỉ số, n, mean, std, CI)"""
+    rows = []
+    for column in runs_df.columns:
+        if column in ('run', 'elapsed'):
+            continue
+        flow, metric = column.split('.', 1)
+        n, mean, std, ci_low, ci_high = confidence_interval(runs_df[column].values, confidence)
+        rows.append({'flow': flow, 'metric': metric, 'n': n, 'mean': mean, 'std': std,
+                     'ci_low': ci_low, 'ci_high': ci_high})
+    return pd.DataFrame(rows, columns=['flow', 'metric', 'n', 'mean', 'std', 'ci_low', 'ci_high'])
+
+
+def run_batch(root, workers=None, confidence=0.95, output='batch_summary.csv'):
+    """Phân tích tất cả các lần chạy trong root và ghi bảng tổng hợp"""
+    runs = discover_runs(root)
+    if not runs:
+        print(f"⚠️  Không tìm thấy thư mục trace nào trong {root}")
+        return None, None
+
+    workers = workers or os.cpu_count() or 1
+    print(f"🚀 Phân tích {len(runs)} lần chạy với {workers} tiến trình...")
+    start = time.perf_counter()
+
+    with contextlib.ExitStack() as stack:
+        if workers <= 1:
+            results = map(analyze_run, runs)
+        else:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            results = pool.map(analyze_run, runs)
+        rows = []
+        for row in results:
+            rows.append(row)
+            print(f"   • {row['run']}: {row['elapsed']:.2f}s")
+
+    runs_df = pd.DataFrame(rows)
+    runs_df = runs_df[['run'] + [c for c in runs_df.columns if c != 'run']]
+    summary = aggregate(runs_df, confidence)
+
+    runs_output = os.path.splitext(output)[0] + '_runs.csv'
+    runs_df.to_csv(runs_output, index=False)
+    summary.to_csv(output, index=False)
+
+    print(f"\n📋 TỔNG HỢP {len(runs)} LẦN CHẠY (khoảng tin cậy {confidence:.0%})")
+    print("-" * 80)
+    for _, r in summary.iterrows():
+        print(f"{r['flow']:<16} {r['metric']:<22} {r['mean']:>12.3f} "
+              f"[{r['ci_low']:>10.3f}, {r['ci_high']:>10.3f}]  n={r['n']}")
+    print("-" * 80)
+    print(f"✅ Đã lưu: {output}, {runs_output} ({time.perf_counter() - start:.1f}s)")
+    return runs_df, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Phân tích hàng loạt các lần chạy TCP NewReno vs Reno')
+    parser.add_argument('root', nargs='?', default='.', help='Thư mục gốc chứa các thư mục run')
+    parser.add_argument('--workers', type=int, default=None, help='Số tiến trình (mặc định: số CPU)')
+    parser.add_argument('--confidence', type=float, default=0.95, help='Mức tin cậy (mặc định 0.95)')
+    parser.add_argument('--output', default='batch_summary.csv', help='File CSV tổng hợp')
+    args = parser.parse_args()
+
+    run_batch(args.root, args.workers, args.confidence, args.output)
+
+
+if __name__ == "__main__":
+    main()
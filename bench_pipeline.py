@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark toàn bộ pipeline phân tích trên trace tổng hợp
+Với mỗi kích thước trace: sinh dữ liệu bằng synthetic_traces.py, rồi chạy
+TCPAnalyzer (load, stats, plots, report), analyze_simple.main và
+plot_comparison trong một tiến trình con riêng, đo thời gian từng bước và
+RSS đỉnh. Kết quả được ghi ra file JSON để theo dõi qua các phiên bản.
+
+Cách dùng:
+    python3 bench_pipeline.py --rows 100k 1M --output bench_results.json
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from queue import Empty
+
+import synthetic_traces
+from stage_profiler import format_mb, max_rss_so_far_mb, rss_metrics
+
+# Chu kỳ (giây) kiểm tra tiến trình con còn sống khi chờ kết quả
+QUEUE_POLL_S = 1.0
+
+
+def _timed(stages, name, func, *args, **kwargs):
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    start_rss = max_rss_so_far_mb()
+    result = func(*args, **kwargs)
+    stages.append({
+        'stage': name,
+        'wall_s': time.perf_counter() - start_wall,
+        'cpu_s': time.process_time() - start_cpu,
+        **rss_metrics(start_rss),
+    })
+    return result
+
+
+def _run_pipeline(pipeline, data_dir, queue):
+    """Chạy một pipeline trong tiến trình con (RSS đỉnh không bị lẫn giữa các pipeline)"""
+    os.chdir(data_dir)
+    stages = []
+    try:
+        with contextlib.redirect_stdout(open(os.devnull, 'w')):
+            if pipeline == 'analyze_complete':
+                from analyze_complete import TCPAnalyzer
+                analyzer = TCPAnalyzer(use_cache=False)
+                _timed(stages, 'load', analyzer.load_all_data)
+                _timed(stages, 'stats', analyzer.calculate_statistics)
+                _timed(stages, 'plots', analyzer.create_comprehensive_plots, use_cache=False)
+                _timed(stages, 'report', analyzer.generate_detailed_report)
+            elif pipeline == 'analyze_simple':
+                import analyze_simple
+                _timed(stages, 'main', analyze_simple.main)
+            elif pipeline == 'plot_comparison':
+                import plot_comparison
+                _timed(stages, 'plot_comparison', plot_comparison.plot_comparison)
+        queue.put({'stages': stages})
+    except Exception as e:
+        queue.put({'stages': stages, 'error': repr(e)})
+
+
+def run_pipeline(pipeline, data_dir):
+    """Chạy pipeline trong tiến trình con mới, trả về dict kết quả"""
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_pipeline, args=(pipeline, data_dir, queue))
+    start = time.perf_counter()
+    proc.start()
+    while True:
+        try:
+            result = queue.get(timeout=QUEUE_POLL_S)
+            break
+        except Empty:
+            # Tiến trình con chết trước khi gửi kết quả (segfault, bị OOM kill, lỗi import)
+            if not proc.is_alive() and queue.empty():
+                result = {'stages': [], 'error': f'tiến trình con thoát với mã {proc.exitcode}'}
+                break
+    proc.join()
+    result['pipeline'] = pipeline
+    result['total_wall_s'] = time.perf_counter() - start
+    return result
+
+
+def git_revision():
+    """Commit hiện tại của repo (nếu có) để gắn với kết quả"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pipeline phân tích TCP trên trace tổng hợp')
+    parser.add_argument('--rows', nargs='+', default=['100k'], help='Số dòng rx mỗi luồng TCP, ví dụ 100k 1M')
+    parser.add_argument('--competing', type=int, default=2, help='Số luồng TCP cạnh tranh')
+    parser.add_argument('--pipelines', nargs='+',
+                        default=['analyze_complete', 'analyze_simple', 'plot_comparison'])
+    parser.add_argument('--output', default='bench_results.json', help='File JSON kết quả')
+    parser.add_argument('--dir', default=None, help='Thư mục chứa trace tạm')
+    args = parser.parse_args()
+
+    # Các tiến trình con cần import được các script trong thư mục này
+    here = os.path.dirname(os.path.abspath(__file__))
+    os.environ['PYTHONPATH'] = here + os.pathsep + os.environ.get('PYTHONPATH', '')
+    sys.path.insert(0, here)
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'runs': [],
+    }
+
+    for rows_text in args.rows:
+        rows = synthetic_traces.parse_size(rows_text)
+        with tempfile.TemporaryDirectory(dir=args.dir) as data_dir:
+            start = time.perf_counter()
+            written = synthetic_traces.generate(data_dir, rows=rows, competing=max(2, args.competing))
+            generate_s = time.perf_counter() - start
+            total_rows = sum(written.values())
+            total_bytes = sum(os.path.getsize(f) for f in written)
+            print(f"\n📦 {rows:,} dòng/luồng: {total_rows:,} dòng, {total_bytes / 1e6:.1f} MB "
+                  f"(sinh trong {generate_s:.1f}s)")
+
+            for pipeline in args.pipelines:
+                run = run_pipeline(pipeline, data_dir)
+                run.update({'rows_per_flow': rows, 'total_rows': total_rows, 'total_bytes': total_bytes})
+                results['runs'].append(run)
+                if 'error' in run:
+                    print(f"   ❌ {pipeline}: {run['error']}")
+                for stage in run['stages']:
+                    print(f"   • {pipeline:<18} {stage['stage']:<16} {stage['wall_s']:>8.2f}s wall "
+                          f"{stage['cpu_s']:>8.2f}s cpu {format_mb(stage['max_rss_so_far_mb'])} MB")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Đã lưu: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark các backend của trace_reader trên file trace tổng hợp
+Tạo file 'time\\tbytes' ngẫu nhiên với số dòng cho trước, đo tốc độ đọc
+(dòng/giây) của từng backend và in bảng so sánh.
+
+Cách dùng:
+    python3 bench_trace_reader.py                         # 1M dòng
+    python3 bench_trace_reader.py --sizes 1M 10M 100M --backends pandas numpy
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import trace_reader
+from synthetic_traces import parse_size
+
+
+def write_synthetic_trace(filename, n_lines, seed=0, block=1_000_000):
+    """Ghi file trace n_lines dòng, thời gian tăng dần, kích thước gói 536/1448 bytes"""
+    rng = np.random.default_rng(seed)
+    t = 0.0
+    with open(filename, 'w') as f:
+        for start in range(0, n_lines, block):
+            n = min(block, n_lines - start)
+            times = t + np.cumsum(rng.exponential(1e-4, n))
+            t = times[-1]
+            sizes = rng.choice([536, 1448], n)
+            f.write('\n'.join(f'{tm:.6f}\t{sz}' for tm, sz in zip(times.tolist(), sizes.tolist())))
+            f.write('\n')
+
+
+def bench_backend(filename, backend, repeat=1):
+    """Thời gian đọc tốt nhất sau repeat lần, trả về (giây, số dòng)"""
+    best = None
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        times, _ = trace_reader.read_trace(filename, backend)
+        elapsed = time.perf_counter() - start
+        rows = len(times)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark các backend đọc trace')
+    parser.add_argument('--sizes', nargs='+', default=['1M'], help='Số dòng, ví dụ 1M 10M 100M')
+    parser.add_argument('--backends', nargs='+', default=None,
+                        help=f"Backend cần đo (mặc định: tất cả có sẵn: {', '.join(trace_reader.available_backends())})")
+    parser.add_argument('--repeat', type=int, default=1, help='Số lần đo mỗi backend (lấy lần nhanh nhất)')
+    parser.add_argument('--dir', default=None, help='Thư mục chứa file tạm (mặc định: thư mục tạm hệ thống)')
+    parser.add_argument('--json', default=None, help='Ghi kết quả ra file JSON')
+    args = parser.parse_args()
+
+    backends = args.backends or trace_reader.available_backends()
+    results = []
+
+    print(f"{'Dòng':>12} {'Backend':<8} {'Thời gian (s)':>14} {'Dòng/giây':>14}")
+    print("-" * 52)
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmpdir:
+        for size_text in args.sizes:
+            n_lines = parse_size(size_text)
+            filename = os.path.join(tmpdir, f'bench-{n_lines}-rx.data')
+            write_synthetic_trace(filename, n_lines)
+
+            for backend in backends:
+                elapsed, rows = bench_backend(filename, backend, args.repeat)
+                rate = rows / elapsed if elapsed > 0 else float('inf')
+                results.append({'lines': n_lines, 'backend': backend, 'seconds': elapsed,
+                                'rows_per_second': rate, 'file_bytes': os.path.getsize(filename)})
+                print(f"{n_lines:>12,} {backend:<8} {elapsed:>14.3f} {rate:>14,.0f}")
+            os.remove(filename)
+
+    fastest = {}
+    for r in results:
+        if r['lines'] not in fastest or r['rows_per_second'] > fastest[r['lines']]['rows_per_second']:
+            fastest[r['lines']] = r
+    print("-" * 52)
+    for n_lines, r in fastest.items():
+        print(f"🏆 {n_lines:,} dòng: nhanh nhất là '{r['backend']}' ({r['rows_per_second']:,.0f} dòng/s)")
+    print(f"ℹ️  'auto' hiện chọn backend: {trace_reader.resolve_backend('auto')}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Đã lưu: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
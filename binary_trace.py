@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Định dạng trace nhị phân bản ghi cố định do enterprise-network-newreno.cc ghi ra
+khi chạy với --binaryTraces=true (file .bin cạnh tên file .data tương ứng).
+
+Bố cục file (little-endian):
+  header 16 bytes: magic b'NS3TRACE', uint32 phiên bản (1), uint32 kích thước bản ghi (12)
+  bản ghi 12 bytes: float64 thời điểm (giây), uint32 giá trị (bytes hoặc cwnd)
+
+File được np.memmap trực tiếp: không phân tích chuỗi, không sao chép khi đọc.
+"""
+
+import os
+
+import numpy as np
+
+MAGIC = b'NS3TRACE'
+VERSION = 1
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<u4'), ('record_size', '<u4')])
+RECORD_DTYPE = np.dtype([('time', '<f8'), ('value', '<u4')])  # packed, 12 bytes
+HEADER_SIZE = HEADER_DTYPE.itemsize
+BINARY_SUFFIX = '.bin'
+
+
+def is_binary(filename):
+    """File có phải trace nhị phân (theo đuôi file) không"""
+    return str(filename).endswith(BINARY_SUFFIX)
+
+
+def binary_path(filename):
+    """'enterprise-reno-rx.data' -> 'enterprise-reno-rx.bin'"""
+    root, _ = os.path.splitext(filename)
+    return root + BINARY_SUFFIX
+
+
+def check_header(filename):
+    """Kiểm tra header của file .bin, trả về kích thước file"""
+    size = os.path.getsize(filename)
+    if size < HEADER_SIZE:
+        raise ValueError(f"File {filename} quá ngắn, thiếu header")
+    header = np.fromfile(filename, dtype=HEADER_DTYPE, count=1)[0]
+    if header['magic'] != MAGIC or header['record_size'] != RECORD_DTYPE.itemsize:
+        raise ValueError(f"File {filename} không phải trace nhị phân NS3TRACE hợp lệ")
+    if header['version'] != VERSION:
+        raise ValueError(f"File {filename}: phiên bản {header['version']} chưa được hỗ trợ")
+    return size
+
+
+def open_records(filename):
+    """memmap toàn bộ bản ghi của file (mảng cấu trúc chỉ đọc, chiều dài = số bản ghi đã ghi xong)"""
+    size = check_header(filename)
+
+    # Bỏ qua bản ghi cuối chưa ghi xong (mô phỏng đang chạy hoặc bị ngắt)
+    n_records = (size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    if n_records == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(filename, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(n_records,))
+
+
+def read_binary_trace(filename):
+    """Trả về (times float64, values int64): times là view trên memmap, không sao chép
+
+    values được đổi sang int64 như các backend văn bản: phép trừ trên uint32
+    (df['cwnd'].diff() khi cwnd giảm) sẽ bị tràn vòng.
+    """
+    records = open_records(filename)
+    return records['time'], records['value'].astype(np.int64)
+
+
+def write_binary_trace(filename, times, values):
+    """Ghi (times, values) theo cùng định dạng với simulation (dùng để chuyển đổi/kiểm thử)"""
+    header = np.array([(MAGIC, VERSION, RECORD_DTYPE.itemsize)], dtype=HEADER_DTYPE)
+    records = np.empty(len(times), dtype=RECORD_DTYPE)
+    records['time'] = times
+    records['value'] = values
+    with open(filename, 'wb') as f:
+        header.tofile(f)
+        records.tofile(f)
+
+
+def convert_text_trace(filename):
+    """Chuyển một file trace văn bản .data sang .bin bên cạnh, trả về đường dẫn file mới"""
+    import trace_reader
+    times, values = trace_reader.read_trace(filename)
+    output = binary_path(filename)
+    write_binary_trace(output, times, values)
+    return output
+
+
+if __name__ == "__main__":
+    import sys
+    for name in sys.argv[1:]:
+        print(f"✅ Đã lưu: {convert_text_trace(name)}")
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Phát hiện sự kiện tắc nghẽn trên trace CWND (vector hóa hoàn toàn, O(n))
+Các lần CWND giảm cách nhau ít hơn merge_gap giây được gộp thành một đợt mất
+gói (episode). Mỗi đợt được phân loại:
+  - rto: CWND rơi về ~1 MSS (retransmission timeout)
+  - multiplicative: CWND giảm còn <= md_ratio giá trị trước đợt (fast recovery)
+  - minor: chỉ giảm nhẹ
+Các lần giảm tiếp theo trong cùng một đợt là deflation do partial ACK (đặc
+trưng của NewReno khi mất nhiều gói trong một cửa sổ).
+Mỗi lần CWND tăng được xếp vào slow start nếu CWND còn dưới ssthresh ước lượng
+(một nửa CWND trước đợt mất gói gần nhất), ngược lại là congestion avoidance.
+
+summarize() xử lý cả chuỗi trong bộ nhớ; EventAccumulator cho cùng kết quả khi
+nhận chuỗi theo từng khối (streaming, live tail) và chỉ giữ trạng thái của đợt
+đang mở, nên bộ nhớ không phụ thuộc độ dài trace.
+"""
+
+import numpy as np
+
+MSS = 1448  # ns3::TcpSocket::SegmentSize trong enterprise-network-newreno.cc
+
+
+def detect_events(times, cwnd, mss=MSS, md_ratio=0.8, rto_segments=1.5, merge_gap=0.5):
+    """Phân tích chuỗi CWND (bytes), trả về dict mảng mô tả các đợt mất gói và pha tăng
+
+    Khóa trả về:
+      episode_start, episode_end: thời điểm lần giảm đầu/cuối của mỗi đợt
+      episode_kind: 'rto' / 'multiplicative' / 'minor'
+      pre_cwnd, floor_cwnd: CWND trước đợt và CWND thấp nhất trong đợt
+      decreases: số lần giảm trong mỗi đợt
+      recovery_time: thời gian từ đầu đợt tới khi CWND lấy lại pre_cwnd
+                     (NaN nếu đợt sau xảy ra trước hoặc trace kết thúc)
+      slow_start: mặt nạ các bước tăng (theo vị trí i >= 1) thuộc slow start
+      increase: mặt nạ các bước tăng
+    """
+    times = np.asarray(times, dtype=np.float64)
+    cwnd = np.asarray(cwnd, dtype=np.float64)
+    n = len(cwnd)
+    step = np.diff(cwnd)
+    dec_pos = np.flatnonzero(step < 0) + 1  # Vị trí mẫu ngay sau mỗi lần giảm
+
+    # Gộp các lần giảm gần nhau thành đợt
+    if len(dec_pos):
+        new_episode = np.empty(len(dec_pos), dtype=bool)
+        new_episode[0] = True
+        new_episode[1:] = np.diff(times[dec_pos]) > merge_gap
+    else:
+        new_episode = np.zeros(0, dtype=bool)
+    episode_of_dec = np.cumsum(new_episode) - 1
+    first = np.flatnonzero(new_episode)
+    last = np.append(first[1:], len(dec_pos))[:len(first)] - 1
+    n_episodes = len(first)
+
+    pre_cwnd = cwnd[dec_pos[first] - 1]
+    floor_cwnd = np.full(n_episodes, np.inf)
+    np.minimum.at(floor_cwnd, episode_of_dec, cwnd[dec_pos])
+    decreases = np.bincount(episode_of_dec, minlength=n_episodes)
+
+    kind = np.where(floor_cwnd <= rto_segments * mss, 'rto',
+                    np.where(floor_cwnd <= md_ratio * pre_cwnd, 'multiplicative', 'minor'))
+    loss = kind != 'minor'
+
+    # Thời gian phục hồi: tìm mẫu đầu tiên sau đợt có CWND >= pre_cwnd, trước đợt kế tiếp.
+    # Cộng offset tăng dần theo đoạn (giữa hai đợt) để running max toàn cục đơn điệu,
+    # rồi tìm tất cả bằng một lần searchsorted.
+    segment = np.zeros(n, dtype=np.int64)
+    if n_episodes:
+        segment[dec_pos[first]] = 1
+    segment = np.cumsum(segment)
+    offset = (cwnd.max() + 1.0) if n else 0.0
+    running = np.maximum.accumulate(cwnd + segment * offset)
+    target = pre_cwnd + np.arange(1, n_episodes + 1) * offset
+    found = np.searchsorted(running, target, side='left')
+    segment_end = np.append(dec_pos[first[1:]], n) if n_episodes else np.zeros(0, dtype=np.int64)
+    recovered = found < segment_end
+    recovery_time = np.full(n_episodes, np.nan)
+    recovery_time[recovered] = times[found[recovered]] - times[dec_pos[first][recovered]]
+
+    # ssthresh ước lượng theo đợt mất gói gần nhất (chưa mất gói: vô cùng, slow start ban đầu)
+    loss_marker = np.zeros(n, dtype=np.int64)
+    if loss.any():
+        loss_marker[dec_pos[first[loss]]] = 1
+    loss_id = np.cumsum(loss_marker)  # 0 = trước lần mất gói đầu tiên
+    ssthresh = np.concatenate(([np.inf], np.maximum(pre_cwnd[loss] / 2, 2 * mss)))[loss_id]
+    increase = step > 0
+    slow_start = increase & (cwnd[:-1] < ssthresh[1:])
+
+    return {
+        'episode_start': times[dec_pos[first]],
+        'episode_end': times[dec_pos[last]],
+        'episode_kind': kind,
+        'pre_cwnd': pre_cwnd,
+        'floor_cwnd': floor_cwnd,
+        'decreases': decreases,
+        'recovery_time': recovery_time,
+        'slow_start': slow_start,
+        'increase': increase,
+    }
+
+
+def summarize(times, cwnd, mss=MSS, **kwargs):
+    """Thống kê sự kiện tắc nghẽn của một luồng (dict số, dùng trong stats/báo cáo)"""
+    times = np.asarray(times, dtype=np.float64)
+    events = detect_events(times, cwnd, mss, **kwargs)
+    kind = events['episode_kind']
+    loss = kind != 'minor'
+    loss_times = events['episode_start'][loss]
+    gaps = np.diff(loss_times)
+    recovery = events['recovery_time'][loss]
+    recovery = recovery[~np.isnan(recovery)]
+
+    dt = np.diff(times)
+    slow_start, increase = events['slow_start'], events['increase']
+    congestion_avoidance = increase & ~slow_start
+    return {
+        'loss_events': int(loss.sum()),
+        'fast_recovery_events': int((kind == 'multiplicative').sum()),
+        'rto_events': int((kind == 'rto').sum()),
+        'minor_decreases': int((kind == 'minor').sum()),
+        # Số lần giảm thêm trong các đợt mất gói (deflation do partial ACK)
+        'partial_ack_deflations': int((events['decreases'][loss] - 1).sum()),
+        'mean_recovery_time': float(recovery.mean()) if len(recovery) else 0.0,
+        'max_recovery_time': float(recovery.max()) if len(recovery) else 0.0,
+        'unrecovered_events': int(loss.sum() - len(recovery)),
+        'mean_time_between_losses': float(gaps.mean()) if len(gaps) else 0.0,
+        'min_time_between_losses': float(gaps.min()) if len(gaps) else 0.0,
+        'slow_start_updates': int(slow_start.sum()),
+        'congestion_avoidance_updates': int(congestion_avoidance.sum()),
+        # Thời gian (giây) của các bước tăng thuộc mỗi pha
+        'slow_start_time': float(dt[slow_start].sum()),
+        'congestion_avoidance_time': float(dt[congestion_avoidance].sum()),
+    }
+
+
+class EventAccumulator:
+    """Phiên bản tăng dần của summarize(): update(times, cwnd) theo từng khối, result() bất kỳ lúc nào
+
+    Trạng thái mang qua biên khối: mẫu cuối, đợt mất gói đang mở (thời điểm bắt
+    đầu, pre/floor CWND, số lần giảm, mốc phục hồi) và ssthresh ước lượng. Loại
+    của đợt đang mở chỉ biết khi đợt kết thúc, nên các bước tăng trong đợt được
+    cộng dồn theo cả hai giả thiết (mất gói / giảm nhẹ) rồi chọn khi đóng đợt.
+    """
+
+    def __init__(self, mss=MSS, md_ratio=0.8, rto_segments=1.5, merge_gap=0.5):
+        self.mss, self.md_ratio, self.rto_segments, self.merge_gap = mss, md_ratio, rto_segments, merge_gap
+        self.last_time = self.last_cwnd = None
+        self.last_decrease = None  # Thời điểm lần giảm gần nhất
+        self.ssthresh = np.inf  # ssthresh theo đợt mất gói gần nhất đã đóng
+        self.episode = None  # Đợt đang mở
+        # Các bước tăng đã phân loại: [số bước slow start, thời gian SS, số bước CA, thời gian CA]
+        self.phases = np.zeros(4)
+        self.counts = {'rto': 0, 'multiplicative': 0, 'minor': 0}
+        self.deflations = 0
+        self.recovery = []  # Thời gian phục hồi các đợt mất gói (mỗi đợt một số)
+        self.unrecovered = 0
+        self.last_loss_start = None
+        self.gaps = []  # Khoảng cách giữa các đợt mất gói liên tiếp
+
+    def _phases(self, cwnd_prev, step, dt, ssthresh):
+        increase = step > 0
+        slow_start = increase & (cwnd_prev < ssthresh)
+        avoidance = increase & ~slow_start
+        return np.array([slow_start.sum(), dt[slow_start].sum(), avoidance.sum(), dt[avoidance].sum()])
+
+    def _region(self, times, cwnd, lo, hi):
+        """Các bước tại vị trí [lo, hi) của khối (đã nối mẫu cuối của khối trước ở vị trí 0)"""
+        cwnd_prev, step = cwnd[lo - 1:hi - 1], cwnd[lo:hi] - cwnd[lo - 1:hi - 1]
+        dt = times[lo:hi] - times[lo - 1:hi - 1]
+        episode = self.episode
+        if episode is None:
+            self.phases += self._phases(cwnd_prev, step, dt, self.ssthresh)
+            return
+        decreasing = step < 0
+        if decreasing.any():
+            episode['floor'] = min(episode['floor'], float(cwnd[lo:hi][decreasing].min()))
+            episode['decreases'] += int(decreasing.sum())
+        if episode['recovered'] is None:
+            found = np.flatnonzero(cwnd[lo:hi] >= episode['pre'])
+            if len(found):
+                episode['recovered'] = float(times[lo + found[0]]) - episode['start']
+        episode['if_loss'] += self._phases(cwnd_prev, step, dt, max(episode['pre'] / 2, 2 * self.mss))
+        episode['if_minor'] += self._phases(cwnd_prev, step, dt, self.ssthresh)
+
+    def _close(self, episode, commit=True):
+        """Đóng một đợt: trả về (loại, trạng thái cập nhật); commit=False chỉ tính, không ghi lại"""
+        if episode['floor'] <= self.rto_segments * self.mss:
+            kind = 'rto'
+        elif episode['floor'] <= self.md_ratio * episode['pre']:
+            kind = 'multiplicative'
+        else:
+            kind = 'minor'
+        if commit:
+            self.counts[kind] += 1
+            if kind == 'minor':
+                self.phases += episode['if_minor']
+            else:
+                self.phases += episode['if_loss']
+                self.ssthresh = max(episode['pre'] / 2, 2 * self.mss)
+                self.deflations += episode['decreases'] - 1
+                if episode['recovered'] is None:
+                    self.unrecovered += 1
+                else:
+                    self.recovery.append(episode['recovered'])
+                if self.last_loss_start is not None:
+                    self.gaps.append(episode['start'] - self.last_loss_start)
+                self.last_loss_start = episode['start']
+        return kind
+
+    def update(self, times, cwnd):
+        if len(cwnd) == 0:
+            return
+        times = np.asarray(times, dtype=np.float64)
+        cwnd = np.asarray(cwnd, dtype=np.float64)
+        if self.last_cwnd is not None:
+            times = np.concatenate(([self.last_time], times))
+            cwnd = np.concatenate(([self.last_cwnd], cwnd))
+        self.last_time, self.last_cwnd = float(times[-1]), float(cwnd[-1])
+        if len(cwnd) < 2:
+            return
+
+        # Các lần giảm bắt đầu đợt mới (cách lần giảm trước hơn merge_gap)
+        dec_pos = np.flatnonzero(np.diff(cwnd) < 0) + 1
+        dec_times = times[dec_pos]
+        previous = np.concatenate(([self.last_decrease if self.last_decrease is not None else -np.inf],
+                                   dec_times[:-1]))
+        starts = dec_pos[dec_times - previous > self.merge_gap]
+        if len(dec_pos):
+            self.last_decrease = float(dec_times[-1])
+
+        bounds = np.concatenate(([1], starts, [len(cwnd)]))
+        for i in range(len(bounds) - 1):
+            lo, hi = int(bounds[i]), int(bounds[i + 1])
+            if i > 0:
+                if self.episode is not None:
+                    self._close(self.episode)
+                self.episode = {'start': float(times[lo]), 'pre': float(cwnd[lo - 1]), 'floor': np.inf,
+                                'decreases': 0, 'recovered': None,
+                                'if_loss': np.zeros(4), 'if_minor': np.zeros(4)}
+            if hi > lo:
+                self._region(times, cwnd, lo, hi)
+
+    def result(self):
+        """Thống kê như summarize() trên toàn bộ dữ liệu đã nhận (đợt đang mở tính như đã kết thúc)"""
+        counts = dict(self.counts)
+        phases = self.phases.copy()
+        deflations, unrecovered = self.deflations, self.unrecovered
+        recovery, gaps = list(self.recovery), list(self.gaps)
+        episode = self.episode
+        if episode is not None:
+            kind = self._close(episode, commit=False)
+            counts[kind] += 1
+            if kind == 'minor':
+                phases += episode['if_minor']
+            else:
+                phases += episode['if_loss']
+                deflations += episode['decreases'] - 1
+                if episode['recovered'] is None:
+                    unrecovered += 1
+                else:
+                    recovery.append(episode['recovered'])
+                if self.last_loss_start is not None:
+                    gaps.append(episode['start'] - self.last_loss_start)
+        loss_events = counts['rto'] + counts['multiplicative']
+        return {
+            'loss_events': loss_events,
+            'fast_recovery_events': counts['multiplicative'],
+            'rto_events': counts['rto'],
+            'minor_decreases': counts['minor'],
+            'partial_ack_deflations': int(deflations),
+            'mean_recovery_time': float(np.mean(recovery)) if recovery else 0.0,
+            'max_recovery_time': float(np.max(recovery)) if recovery else 0.0,
+            'unrecovered_events': int(unrecovered),
+            'mean_time_between_losses': float(np.mean(gaps)) if gaps else 0.0,
+            'min_time_between_losses': float(np.min(gaps)) if gaps else 0.0,
+            'slow_start_updates': int(phases[0]),
+            'congestion_avoidance_updates': int(phases[2]),
+            'slow_start_time': float(phases[1]),
+            'congestion_avoidance_time': float(phases[3]),
+        }
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Giảm số điểm (decimation) cho chuỗi thời gian trước khi vẽ
+Mỗi trục chỉ nhận tối đa một số điểm cố định, nên thời gian vẽ không tăng
+theo kích thước trace. Phương pháp mặc định giữ điểm min/max trong từng cột
+pixel, nên các đỉnh và các lần CWND giảm đột ngột (răng cưa) vẫn hiện rõ.
+"""
+
+import numpy as np
+
+DEFAULT_MAX_POINTS = 4000
+
+
+def minmax_indices(x, y, max_points=DEFAULT_MAX_POINTS):
+    """Chỉ số các điểm giữ lại: min và max của y trong mỗi bucket theo trục x
+
+    x phải tăng dần (thời gian). Điểm đầu và cuối luôn được giữ.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+
+    finite = np.flatnonzero(np.isfinite(y))
+    if len(finite) == 0:
+        return np.array([0, n - 1])
+    xf, yf = x[finite], y[finite]
+
+    # x tăng dần nên mỗi bucket là một đoạn liên tiếp -> dùng reduceat, O(n)
+    n_buckets = max(1, max_points // 2)
+    edges = np.linspace(xf[0], xf[-1], n_buckets + 1)[1:-1]
+    starts = np.unique(np.r_[0, np.searchsorted(xf, edges, side='left')])
+    starts = starts[starts < len(xf)]
+    lengths = np.diff(np.r_[starts, len(xf)])
+
+    keep = [np.array([0, n - 1])]
+    for reduce in (np.minimum, np.maximum):
+        extreme = np.repeat(reduce.reduceat(yf, starts), lengths)
+        hits = np.flatnonzero(yf == extreme)
+        # Vị trí đầu tiên đạt cực trị trong mỗi bucket
+        keep.append(finite[hits[np.searchsorted(hits, starts)]])
+    return np.unique(np.concatenate(keep))
+
+
+def lttb_indices(x, y, max_points=DEFAULT_MAX_POINTS):
+    """Chỉ số các điểm giữ lại theo Largest-Triangle-Three-Buckets (LTTB)"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        # Điểm trung bình của bucket kế tiếp
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = np.nanmean(y[next_lo:next_hi]) if next_hi > next_lo else y[-1]
+        area = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev]) -
+                      (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(np.nanargmax(area)) if np.isfinite(area).any() else lo
+        keep[i + 1] = prev
+    return keep
+
+
+def decimate(x, y, max_points=DEFAULT_MAX_POINTS, method='minmax'):
+    """Trả về (x, y) đã giảm còn khoảng max_points điểm"""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if max_points is None or len(x) <= max_points:
+        return x, y
+    if method == 'lttb':
+        idx = lttb_indices(x, y, max_points)
+    else:
+        idx = minmax_indices(x, y, max_points)
+    return x[idx], y[idx]
+
+
+def plot(ax, x, y, *args, max_points=DEFAULT_MAX_POINTS, method='minmax', **kwargs):
+    """ax.plot() sau khi giảm điểm"""
+    x, y = decimate(x, y, max_points, method)
+    return ax.plot(x, y, *args, **kwargs)
+
+
+def scatter(ax, t, x, y, max_points=DEFAULT_MAX_POINTS, **kwargs):
+    """ax.scatter(x, y) sau khi giảm điểm theo trục thời gian t (giữ min/max của cả x và y)"""
+    t = np.asarray(t)
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if max_points is not None and len(t) > max_points:
+        idx = np.union1d(minmax_indices(t, x, max_points // 2),
+                         minmax_indices(t, y, max_points // 2))
+        x, y = x[idx], y[idx]
+    return ax.scatter(x, y, **kwargs)
@@ -11,39 +11,209 @@
 
 #include <vector> // Để sử dụng std::vector
 #include <iomanip> // Để sử dụng std::setprecision
+#include <fstream> // Để ghi trace nhị phân
+#include <cstring> // Để sử dụng std::memcpy
+#include <cmath> // Để sử dụng std::floor
+#include <map> // Để gom bin theo context
 
 using namespace ns3;
 
 NS_LOG_COMPONENT_DEFINE("EnterpriseNetworkNewReno");
 
+// --- GOM BIN RX ---
+// Khi chạy với --rxBinWidth=W (giây, > 0), trace rx không ghi mỗi gói một dòng mà
+// cộng dồn bytes và số gói theo từng bin thời gian W, mỗi bin có gói ghi một dòng
+// "thời điểm bắt đầu bin\tbytes\tsố gói" sau dòng header "# binned bin_width=W".
+// Kích thước file khi đó phụ thuộc thời gian mô phỏng, không phụ thuộc số gói.
+static double g_rxBinWidth = 0.0;
+
+struct RxBin
+{
+    int64_t index = -1;   // Chỉ số bin hiện tại (thời điểm / độ rộng bin)
+    uint64_t bytes = 0;
+    uint32_t packets = 0;
+};
+
+static void
+WriteBinnedHeader(std::ostream &os)
+{
+    os << "# binned bin_width=" << g_rxBinWidth << '\n';
+    os << std::setprecision(9);  // Đủ chữ số cho thời điểm bắt đầu bin khi mô phỏng dài
+}
+
+// Chỉ số bin chứa thời điểm time
+static int64_t
+RxBinIndex(double time)
+{
+    return static_cast<int64_t>(std::floor(time / g_rxBinWidth));
+}
+
+// --- FILE TRACE ---
+// Một file trace (time, value): dạng văn bản "time\tvalue" (.data) hoặc nhị phân (.bin)
+// Định dạng nhị phân (little-endian, đọc bằng binary_trace.py):
+//   header 16 bytes: "NS3TRACE", uint32 phiên bản = 1, uint32 kích thước bản ghi = 12
+//   bản ghi 12 bytes: double thời điểm (giây), uint32 giá trị
+// Bản ghi được gom vào buffer trong bộ nhớ và chỉ ghi ra đĩa khi buffer đầy.
+// File rx tạo với binned = true (và g_rxBinWidth > 0) được gom bin, luôn ở dạng văn bản.
+class TraceFile : public SimpleRefCount<TraceFile>
+{
+  public:
+    static const uint32_t RECORD_SIZE = sizeof(double) + sizeof(uint32_t);
+    static const uint32_t BUFFER_RECORDS = 65536;
+    // Xả buffer nhị phân ít nhất mỗi FLUSH_INTERVAL giây mô phỏng, để live_tail.py
+    // thấy dữ liệu mới cả khi luồng ghi chậm (chưa đủ BUFFER_RECORDS bản ghi)
+    static constexpr double FLUSH_INTERVAL = 1.0;
+
+    TraceFile(std::string basePath, bool binary, bool binned = false)
+        : m_binary(binary && !(binned && g_rxBinWidth > 0)),
+          m_binned(binned && g_rxBinWidth > 0)
+    {
+        if (m_binned) {
+            m_file.open(basePath + ".data", std::ios::out | std::ios::trunc);
+            WriteBinnedHeader(m_file);
+        } else if (m_binary) {
+            m_file.open(basePath + ".bin", std::ios::out | std::ios::binary | std::ios::trunc);
+            const char magic[8] = {'N', 'S', '3', 'T', 'R', 'A', 'C', 'E'};
+            uint32_t version = 1;
+            uint32_t recordSize = RECORD_SIZE;
+            m_file.write(magic, sizeof(magic));
+            m_file.write(reinterpret_cast<const char*>(&version), sizeof(version));
+            m_file.write(reinterpret_cast<const char*>(&recordSize), sizeof(recordSize));
+            m_buffer.reserve(BUFFER_RECORDS * RECORD_SIZE);
+        } else {
+            m_file.open(basePath + ".data", std::ios::out | std::ios::trunc);
+        }
+    }
+
+    ~TraceFile()
+    {
+        Flush();
+    }
+
+    void Write(double time, uint32_t value)
+    {
+        if (m_binned) {
+            int64_t index = RxBinIndex(time);
+            if (index != m_bin.index) {
+                WriteBin();  // Gói đầu tiên của bin mới: ghi bin cũ trước
+                m_bin.index = index;
+            }
+            m_bin.bytes += value;
+            m_bin.packets++;
+        } else if (m_binary) {
+            char record[RECORD_SIZE];
+            std::memcpy(record, &time, sizeof(time));
+            std::memcpy(record + sizeof(time), &value, sizeof(value));
+            m_buffer.insert(m_buffer.end(), record, record + RECORD_SIZE);
+            if (m_buffer.size() >= BUFFER_RECORDS * RECORD_SIZE || time - m_lastFlush >= FLUSH_INTERVAL) {
+                Flush();
+                m_lastFlush = time;
+            }
+        } else {
+            // '\n' thay cho std::endl: để ofstream tự gom buffer, không flush mỗi dòng
+            m_file << time << "\t" << value << '\n';
+        }
+    }
+
+    void Flush()
+    {
+        if (m_binned) {
+            WriteBin();
+        }
+        if (!m_buffer.empty()) {
+            m_file.write(m_buffer.data(), m_buffer.size());
+            m_buffer.clear();
+        }
+        m_file.flush();
+    }
+
+  private:
+    void WriteBin()
+    {
+        if (m_bin.packets > 0) {
+            m_file << m_bin.index * g_rxBinWidth << "\t" << m_bin.bytes << "\t" << m_bin.packets << '\n';
+            m_bin.bytes = 0;
+            m_bin.packets = 0;
+        }
+    }
+
+    bool m_binary;
+    bool m_binned;
+    RxBin m_bin;
+    std::ofstream m_file;
+    std::vector<char> m_buffer;
+    double m_lastFlush = 0.0;  // Thời điểm mô phỏng của lần xả buffer nhị phân gần nhất
+};
+
+// Tất cả file trace đã tạo, để flush khi mô phỏng kết thúc
+static std::vector<Ptr<TraceFile>> g_traceFiles;
+
+static Ptr<TraceFile>
+CreateTraceFile(std::string basePath, bool binary, bool binned = false)
+{
+    Ptr<TraceFile> file = Create<TraceFile>(basePath, binary, binned);
+    g_traceFiles.push_back(file);
+    return file;
+}
+
 // --- HÀM TRỢ GIÚP ---
 // Callback để theo dõi Cwnd của luồng TCP NewReno chính
 static void
-CwndChangeTracer(Ptr<OutputStreamWrapper> stream, uint32_t oldCwnd, uint32_t newCwnd)
+CwndChangeTracer(Ptr<TraceFile> stream, uint32_t oldCwnd, uint32_t newCwnd)
 {
-    *stream->GetStream() << Simulator::Now().GetSeconds() << "\t" << newCwnd << std::endl;
+    stream->Write(Simulator::Now().GetSeconds(), newCwnd);
+}
+
+// File tổng hợp và bin đang mở của từng context (khi gom bin)
+static Ptr<OutputStreamWrapper> g_allRxStream = nullptr;
+static std::map<std::string, RxBin> g_allRxBins;
+
+static void
+WriteAllRxBin(const std::string &context, RxBin &bin)
+{
+    if (bin.packets > 0) {
+        *g_allRxStream->GetStream() << bin.index * g_rxBinWidth << "\t" << bin.bytes << "\t"
+                                    << context << "\t" << bin.packets << '\n';
+        bin.bytes = 0;
+        bin.packets = 0;
+    }
 }
 
 // Callback để theo dõi throughput (đơn giản hơn) - file tổng hợp
 static void
 RxTraceSimple(std::string context, Ptr<const Packet> packet, const Address &from)
 {
-    static Ptr<OutputStreamWrapper> rxStream = nullptr;
-    if (!rxStream) {
+    if (!g_allRxStream) {
         AsciiTraceHelper ascii;
-        rxStream = ascii.CreateFileStream("scratch/enterprise-all-rx.data");
+        g_allRxStream = ascii.CreateFileStream("scratch/enterprise-all-rx.data");
+        if (g_rxBinWidth > 0) {
+            WriteBinnedHeader(*g_allRxStream->GetStream());
+        }
     }
     
-    *rxStream->GetStream() << Simulator::Now().GetSeconds() << "\t" 
-                          << packet->GetSize() << "\t" 
-                          << context << std::endl;
+    double now = Simulator::Now().GetSeconds();
+    if (g_rxBinWidth > 0) {
+        RxBin &bin = g_allRxBins[context];
+        int64_t index = RxBinIndex(now);
+        if (index != bin.index) {
+            WriteAllRxBin(context, bin);
+            bin.index = index;
+        }
+        bin.bytes += packet->GetSize();
+        bin.packets++;
+        return;
+    }
+    
+    *g_allRxStream->GetStream() << now << "\t" 
+                               << packet->GetSize() << "\t" 
+                               << context << '\n';
 }
 
 // Callback để theo dõi throughput (ghi vào file riêng từng flow)
 static void
-RxTraceToStream(Ptr<OutputStreamWrapper> stream, Ptr<const Packet> packet, const Address &from)
+RxTraceToStream(Ptr<TraceFile> stream, Ptr<const Packet> packet, const Address &from)
 {
-    *stream->GetStream() << Simulator::Now().GetSeconds() << "\t" << packet->GetSize() << std::endl;
+    stream->Write(Simulator::Now().GetSeconds(), packet->GetSize());
 }
 
 // Hàm giúp tạo kết nối TCP (STATIC BỎ ĐI NẾU CÓ VẤN ĐỀ VỀ LINKING, nhưng để lại cũng không sao)
@@ -52,8 +222,8 @@ SetupTcpConnection(Ptr<Node> sourceNode, Ptr<Node> sinkNode,
                    Ipv4Address sinkIp, uint16_t sinkPort,
                    double startTime, double stopTime,
                    std::string tcpVariant,
-                   Ptr<OutputStreamWrapper> cwndStream = nullptr,
-                   Ptr<OutputStreamWrapper> rxStream = nullptr,
+                   Ptr<TraceFile> cwndStream = nullptr,
+                   Ptr<TraceFile> rxStream = nullptr,
                    uint32_t maxBytes = 0)
 {
     Address dest(InetSocketAddress(sinkIp, sinkPort));
@@ -115,7 +285,7 @@ SetupUdpCbrConnection(Ptr<Node> sourceNode, Ptr<Node> sinkNode,
                       Ipv4Address sinkIp, uint16_t sinkPort,
                       double startTime, double stopTime,
                       std::string dataRate, uint32_t packetSize = 1024,
-                      Ptr<OutputStreamWrapper> rxStream = nullptr)
+                      Ptr<TraceFile> rxStream = nullptr)
 {
     Address dest(InetSocketAddress(sinkIp, sinkPort));
     PacketSinkHelper sinkHelper("ns3::UdpSocketFactory", InetSocketAddress(Ipv4Address::GetAny(), sinkPort));
@@ -174,6 +344,14 @@ main(int argc, char* argv[])
     double udp2StartTime = 100.0;
     double udp2StopTime = 170.0;
     std::string udp2DataRate = "1.5Mbps";
+    bool binaryTraces = false;
+    bool pcap = false;
+
+    CommandLine cmd(__FILE__);
+    cmd.AddValue("binaryTraces", "Ghi trace cwnd/rx dạng nhị phân .bin (float64 time, uint32 value) thay cho .data", binaryTraces);
+    cmd.AddValue("rxBinWidth", "Gom trace rx theo bin thời gian (giây, ví dụ 0.01); 0 = mỗi gói một dòng", g_rxBinWidth);
+    cmd.AddValue("pcap", "Ghi pcap trên router A (phía LAN A và liên kết WAN) cho pcap_reader.py", pcap);
+    cmd.Parse(argc, argv);
 
     // --- Node Creation ---
     NS_LOG_INFO("Creating nodes...");
@@ -243,6 +421,13 @@ main(int argc, char* argv[])
     // WAN link
     NetDeviceContainer wanLinkDevs = p2pWan.Install(routerLanA, routerWanB);
 
+    if (pcap) {
+        // Phía LAN: dữ liệu trước hàng đợi WAN (thấy cả gói bị rớt ở nút cổ chai) và ACK đi ra
+        csma.EnablePcap("scratch/enterprise-lan-routerA.pcap", switchAToRouterADev.Get(1), false, true);
+        // Phía WAN (PPP): dữ liệu sau hàng đợi WAN và ACK đi vào
+        p2pWan.EnablePcap("scratch/enterprise-wan-routerA.pcap", wanLinkDevs.Get(0), false, true);
+    }
+
     // Install devices on LAN B
     NodeContainer routerSwitchB;
     routerSwitchB.Add(routerWanB);
@@ -322,9 +507,8 @@ main(int argc, char* argv[])
     uint16_t baseTcpPort = 9000;
     uint16_t baseUdpPort = 10000;
 
-    AsciiTraceHelper ascii;
-    Ptr<OutputStreamWrapper> mainCwndStream = ascii.CreateFileStream("scratch/enterprise-main-newreno-cwnd.data");
-    Ptr<OutputStreamWrapper> mainRxStream = ascii.CreateFileStream("scratch/enterprise-main-newreno-rx.data");
+    Ptr<TraceFile> mainCwndStream = CreateTraceFile("scratch/enterprise-main-newreno-cwnd", binaryTraces);
+    Ptr<TraceFile> mainRxStream = CreateTraceFile("scratch/enterprise-main-newreno-rx", binaryTraces, true);
 
     // Main TCP flow
     SetupTcpConnection(clientsA.Get(0), serversB.Get(0),
@@ -334,8 +518,8 @@ main(int argc, char* argv[])
     baseTcpPort++;
 
     // Competing TCP flows
-    Ptr<OutputStreamWrapper> comp1CwndStream = ascii.CreateFileStream("scratch/enterprise-comp1-newreno-cwnd.data");
-    Ptr<OutputStreamWrapper> comp1RxStream = ascii.CreateFileStream("scratch/enterprise-comp1-newreno-rx.data");
+    Ptr<TraceFile> comp1CwndStream = CreateTraceFile("scratch/enterprise-comp1-newreno-cwnd", binaryTraces);
+    Ptr<TraceFile> comp1RxStream = CreateTraceFile("scratch/enterprise-comp1-newreno-rx", binaryTraces, true);
     
     SetupTcpConnection(clientsA.Get(1), serversB.Get(1 % nServersB),
                        serverBIpAddrs[1 % nServersB], baseTcpPort,
@@ -344,8 +528,8 @@ main(int argc, char* argv[])
     baseTcpPort++;
 
     if (nClientsA > 2) {
-        Ptr<OutputStreamWrapper> comp2CwndStream = ascii.CreateFileStream("scratch/enterprise-comp2-newreno-cwnd.data");
-        Ptr<OutputStreamWrapper> comp2RxStream = ascii.CreateFileStream("scratch/enterprise-comp2-newreno-rx.data");
+        Ptr<TraceFile> comp2CwndStream = CreateTraceFile("scratch/enterprise-comp2-newreno-cwnd", binaryTraces);
+        Ptr<TraceFile> comp2RxStream = CreateTraceFile("scratch/enterprise-comp2-newreno-rx", binaryTraces, true);
         
         SetupTcpConnection(clientsA.Get(2), serversB.Get(2 % nServersB),
                            serverBIpAddrs[2 % nServersB], baseTcpPort,
@@ -356,8 +540,8 @@ main(int argc, char* argv[])
 
     if (renoTcpStartTime > 0 && nClientsA > 3) {
          NS_LOG_INFO("Setting up TCP Reno flow");
-         Ptr<OutputStreamWrapper> renoCwndStream = ascii.CreateFileStream("scratch/enterprise-reno-cwnd.data");
-         Ptr<OutputStreamWrapper> renoRxStream = ascii.CreateFileStream("scratch/enterprise-reno-rx.data");
+         Ptr<TraceFile> renoCwndStream = CreateTraceFile("scratch/enterprise-reno-cwnd", binaryTraces);
+         Ptr<TraceFile> renoRxStream = CreateTraceFile("scratch/enterprise-reno-rx", binaryTraces, true);
          
          SetupTcpConnection(clientsA.Get(3), serversB.Get(0),
                             serverBIpAddrs[0], baseTcpPort,
@@ -368,7 +552,7 @@ main(int argc, char* argv[])
 
     // UDP flows
     if (nClientsA > 0 && nServersB > 0) {
-        Ptr<OutputStreamWrapper> udp1RxStream = ascii.CreateFileStream("scratch/enterprise-udp1-rx.data");
+        Ptr<TraceFile> udp1RxStream = CreateTraceFile("scratch/enterprise-udp1-rx", binaryTraces, true);
         SetupUdpCbrConnection(clientsA.Get(nClientsA - 1), serversB.Get(nServersB - 1),
                               serverBIpAddrs[nServersB - 1], baseUdpPort,
                               udp1StartTime, udp1StopTime, udp1DataRate, 1024, udp1RxStream);
@@ -376,7 +560,7 @@ main(int argc, char* argv[])
     }
 
     if (nClientsA > 1 && nServersB > 1) {
-        Ptr<OutputStreamWrapper> udp2RxStream = ascii.CreateFileStream("scratch/enterprise-udp2-rx.data");
+        Ptr<TraceFile> udp2RxStream = CreateTraceFile("scratch/enterprise-udp2-rx", binaryTraces, true);
         SetupUdpCbrConnection(clientsA.Get(nClientsA - 2), serversB.Get(nServersB - 2),
                               serverBIpAddrs[nServersB - 2], baseUdpPort,
                               udp2StartTime, udp2StopTime, udp2DataRate, 1024, udp2RxStream);
@@ -402,6 +586,17 @@ main(int argc, char* argv[])
     Simulator::Stop(Seconds(simulationTime + 5.0));
     Simulator::Run();
     
+    // Ghi nốt phần trace còn trong buffer (và các bin rx chưa đóng)
+    for (Ptr<TraceFile> file : g_traceFiles) {
+        file->Flush();
+    }
+    for (auto &entry : g_allRxBins) {
+        WriteAllRxBin(entry.first, entry.second);
+    }
+    if (g_allRxStream) {
+        g_allRxStream->GetStream()->flush();
+    }
+    
     // Print FlowMonitor statistics
     monitor->CheckForLostPackets();
     Ptr<Ipv4FlowClassifier> classifier = DynamicCast<Ipv4FlowClassifier>(flowmon.GetClassifier());
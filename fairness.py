@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Công bằng (fairness) và tỉ lệ chia sẻ băng thông nút cổ chai theo cửa sổ thời gian
+Mọi luồng được đặt lên cùng một lưới thời gian dưới dạng ma trận
+(luồng x cửa sổ); các chỉ số được tính trên cả ma trận bằng numpy, không có
+vòng lặp Python theo luồng, nên dùng được cho hàng trăm luồng:
+  - chỉ số công bằng Jain theo từng cửa sổ: (sum x)^2 / (n * sum x^2) trên các
+    luồng đang hoạt động
+  - tỉ lệ nút cổ chai của từng luồng: throughput / dung lượng WAN
+  - tỉ lệ TCP và UDP trong tổng lưu lượng của mỗi cửa sổ
+"""
+
+import numpy as np
+
+BOTTLENECK_MBPS = 5.0  # WAN trong enterprise-network-newreno.cc
+
+
+def window_matrix(times, nbytes, flow_ids, n_flows, window, horizon=None):
+    """Tổng bytes của mọi luồng trên lưới cửa sổ chung bằng một lần np.bincount
+
+    times, nbytes, flow_ids: mẫu của tất cả luồng nối liền (flow_ids trong [0, n_flows))
+    Trả về (thời điểm bắt đầu cửa sổ, ma trận bytes shape (n_flows, n_windows)).
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if horizon is None:
+        horizon = float(times.max()) if len(times) else 0.0
+    n_windows = int(horizon // window) + 1
+    idx = np.minimum((times // window).astype(np.int64), n_windows - 1)
+    cells = np.asarray(flow_ids, dtype=np.int64) * n_windows + idx
+    matrix = np.bincount(cells, weights=nbytes, minlength=n_flows * n_windows)
+    return np.arange(n_windows) * window, matrix.reshape(n_flows, n_windows)
+
+
+def active_mask(window_bytes):
+    """Luồng được coi là hoạt động từ cửa sổ đầu tiên tới cửa sổ cuối cùng có dữ liệu
+
+    Cửa sổ không nhận được byte nào ở giữa khoảng này vẫn tính (luồng bị "bỏ đói").
+    """
+    has_data = window_bytes > 0
+    n_windows = window_bytes.shape[1]
+    first = np.where(has_data.any(axis=1), has_data.argmax(axis=1), n_windows)
+    last = n_windows - 1 - has_data[:, ::-1].argmax(axis=1)
+    columns = np.arange(n_windows)
+    return (columns >= first[:, None]) & (columns <= last[:, None])
+
+
+def jain_index(throughput, active):
+    """Chỉ số Jain theo cột trên các luồng đang hoạt động (NaN nếu không có luồng nào)"""
+    x = np.where(active, throughput, 0.0)
+    n = active.sum(axis=0)
+    sum_sq = (x * x).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        jain = x.sum(axis=0) ** 2 / (n * sum_sq)
+    # Mọi luồng hoạt động đều bằng 0: chia đều (công bằng tuyệt đối)
+    return np.where((n > 0) & (sum_sq == 0), 1.0, jain)
+
+
+def analyze(window_bytes, starts, window, is_udp, capacity_mbps=BOTTLENECK_MBPS):
+    """Các chỉ số công bằng từ ma trận bytes (luồng x cửa sổ)
+
+    is_udp: mặt nạ bool theo luồng. Trả về dict gồm các chuỗi theo cửa sổ
+    (jain, share, tcp_share, udp_share, active_flows) và các giá trị tổng hợp.
+    """
+    window_bytes = np.asarray(window_bytes, dtype=np.float64)
+    is_udp = np.asarray(is_udp, dtype=bool)
+    throughput = window_bytes * 8 / (window * 1e6)
+    active = active_mask(window_bytes)
+    n_active = active.sum(axis=0)
+
+    jain = jain_index(throughput, active)
+    share = throughput / capacity_mbps  # Tỉ lệ dung lượng nút cổ chai của từng luồng
+
+    total = throughput.sum(axis=0)
+    udp = throughput[is_udp].sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        udp_share = np.where(total > 0, udp / total, np.nan)
+    tcp_share = np.where(total > 0, 1.0 - udp_share, np.nan)
+
+    active_windows = active.sum(axis=1)
+    mean_share = np.divide(np.where(active, share, 0.0).sum(axis=1), active_windows,
+                           out=np.zeros(len(share)), where=active_windows > 0)
+    contended = n_active >= 2  # Chỉ tính công bằng khi có ít nhất hai luồng cạnh tranh
+    grand_total = total.sum()
+
+    return {
+        'window': window,
+        'starts': starts,
+        'jain': jain,
+        'share': share,
+        'tcp_share': tcp_share,
+        'udp_share': udp_share,
+        'active_flows': n_active,
+        'mean_jain': float(jain[contended].mean()) if contended.any() else 1.0,
+        'min_jain': float(jain[contended].min()) if contended.any() else 1.0,
+        'mean_share': mean_share,
+        'tcp_total_share': float(1.0 - udp.sum() / grand_total) if grand_total > 0 else 0.0,
+        'udp_total_share': float(udp.sum() / grand_total) if grand_total > 0 else 0.0,
+        'mean_utilization': float(total[n_active > 0].mean() / capacity_mbps) if (n_active > 0).any() else 0.0,
+    }
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache kết quả vẽ biểu đồ theo nội dung dữ liệu đầu vào
+Mỗi biểu đồ được gắn một mã băm (hash) của các chuỗi dữ liệu nó dùng và các
+tham số vẽ; nếu mã băm không đổi và file ảnh vẫn còn thì bỏ qua bước vẽ lại.
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = '.figure_cache.json'
+
+
+def _update_hash(h, obj):
+    """Cập nhật hash với một đối tượng (DataFrame, Series, mảng, dict, số, chuỗi)"""
+    if isinstance(obj, pd.DataFrame):
+        for col in obj.columns:
+            h.update(str(col).encode())
+            _update_hash(h, obj[col])
+    elif isinstance(obj, pd.Series):
+        _update_hash(h, obj.index.values)
+        _update_hash(h, obj.values)
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            h.update(repr(obj.tolist()).encode())
+        else:
+            h.update(str(obj.dtype).encode())
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        for key in sorted(obj, key=str):
+            h.update(str(key).encode())
+            _update_hash(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            _update_hash(h, item)
+    else:
+        h.update(repr(obj).encode())
+
+
+def content_hash(*objs):
+    """Mã băm SHA-1 của nội dung các đối tượng"""
+    h = hashlib.sha1()
+    for obj in objs:
+        _update_hash(h, obj)
+    return h.hexdigest()
+
+
+def manifest_path(output_dir='.'):
+    return os.path.join(output_dir, MANIFEST_NAME)
+
+
+def load_manifest(output_dir='.'):
+    """Đọc bảng {file ảnh: hash} của lần vẽ trước"""
+    try:
+        with open(manifest_path(output_dir), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, output_dir='.'):
+    """Lưu bảng {file ảnh: hash}"""
+    with open(manifest_path(output_dir), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def is_up_to_date(manifest, output, digest):
+    """Biểu đồ không cần vẽ lại nếu hash khớp và file ảnh còn tồn tại"""
+    return manifest.get(output) == digest and os.path.exists(output)
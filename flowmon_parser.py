@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Đọc file FlowMonitor XML (enterprise-flowmon-results.xml) theo kiểu streaming
+Dùng ElementTree.iterparse và giải phóng từng phần tử sau khi đọc, nên bộ nhớ
+không phụ thuộc kích thước file (kể cả khi bật histogram và probe).
+Kết quả là các mảng numpy gọn cho từng luồng: tx/rx bytes, mất gói, tổng
+delay/jitter và các bin histogram.
+"""
+
+import xml.etree.ElementTree as ET
+import numpy as np
+
+import trace_reader
+
+# (protocol, cổng đích) -> key luồng, theo thứ tự cấp cổng trong enterprise-network-newreno.cc
+FLOW_PORTS = {
+    (6, 9000): 'newreno',
+    (6, 9001): 'comp1',
+    (6, 9002): 'comp2',
+    (6, 9003): 'reno',
+    (17, 10000): 'udp1',
+    (17, 10001): 'udp2',
+}
+
+FLOW_STATS_DTYPE = np.dtype([
+    ('flow_id', np.uint32),
+    ('tx_bytes', np.uint64),
+    ('rx_bytes', np.uint64),
+    ('tx_packets', np.uint64),
+    ('rx_packets', np.uint64),
+    ('lost_packets', np.uint64),
+    ('delay_sum', np.float64),       # giây
+    ('jitter_sum', np.float64),      # giây
+    ('first_tx', np.float64),
+    ('last_rx', np.float64),
+])
+
+HISTOGRAMS = ('delayHistogram', 'jitterHistogram', 'packetSizeHistogram', 'flowInterruptionsHistogram')
+
+_TIME_UNITS = (('ns', 1e-9), ('us', 1e-6), ('ms', 1e-3), ('s', 1.0))
+
+
+def parse_time(value):
+    """Chuyển chuỗi thời gian ns-3 (ví dụ '+1.0342e+09ns') sang giây"""
+    value = value.strip()
+    for suffix, scale in _TIME_UNITS:
+        if value.endswith(suffix):
+            return float(value[:-len(suffix)]) * scale
+    return float(value)
+
+
+def parse_flowmon(filename):
+    """Đọc file FlowMonitor XML
+
+    Trả về (flows, classifier, histograms):
+      flows: mảng cấu trúc FLOW_STATS_DTYPE, mỗi phần tử một flowId
+      classifier: dict flowId -> (src, dst, protocol, src_port, dst_port)
+      histograms: dict flowId -> {tên histogram: mảng (start, width, count)}
+    """
+    rows = []
+    classifier = {}
+    histograms = {}
+    section = None
+    section_elem = None
+    bins = None
+    current_flow = None
+    root = None
+
+    # File .gz/.xz/.zst được giải nén dạng stream
+    with trace_reader.open_trace(filename) as source:
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if root is None:
+                    root = elem
+                elif tag in ('FlowStats', 'Ipv4FlowClassifier', 'FlowProbes') and section is None:
+                    section, section_elem = tag, elem
+                elif section == 'FlowStats' and tag == 'Flow':
+                    current_flow = int(elem.get('flowId'))
+                elif section == 'FlowStats' and tag in HISTOGRAMS:
+                    bins = []
+                continue
+
+            # event == 'end'
+            if tag == section:
+                section, section_elem = None, None
+                root.clear()
+            elif section == 'FlowStats':
+                if tag == 'bin' and bins is not None:
+                    bins.append((float(elem.get('start')), float(elem.get('width')), int(elem.get('count'))))
+                elif tag in HISTOGRAMS:
+                    histograms.setdefault(current_flow, {})[tag] = np.array(
+                        bins, dtype=np.float64).reshape(-1, 3)
+                    bins = None
+                elif tag == 'Flow':
+                    get = elem.get
+                    rows.append((
+                        current_flow,
+                        int(get('txBytes', 0)), int(get('rxBytes', 0)),
+                        int(get('txPackets', 0)), int(get('rxPackets', 0)),
+                        int(get('lostPackets', 0)),
+                        parse_time(get('delaySum', '0ns')), parse_time(get('jitterSum', '0ns')),
+                        parse_time(get('timeFirstTxPacket', '0ns')), parse_time(get('timeLastRxPacket', '0ns')),
+                    ))
+                    current_flow = None
+                    section_elem.clear()  # Giải phóng các Flow đã đọc
+            elif section == 'Ipv4FlowClassifier' and tag == 'Flow':
+                classifier[int(elem.get('flowId'))] = (
+                    elem.get('sourceAddress'), elem.get('destinationAddress'),
+                    int(elem.get('protocol')), int(elem.get('sourcePort')), int(elem.get('destinationPort')))
+                section_elem.clear()
+            elif section == 'FlowProbes' and tag == 'FlowProbe':
+                # Dữ liệu probe từng nút không được dùng, chỉ giải phóng bộ nhớ
+                section_elem.clear()
+
+    return np.array(rows, dtype=FLOW_STATS_DTYPE), classifier, histograms
+
+
+def flow_statistics(filename, flow_names=None):
+    """Thống kê FlowMonitor cho các luồng dữ liệu đã biết
+
+    flow_names: dict key luồng ('newreno', 'reno', ...) -> tên hiển thị
+    Trả về dict key luồng -> dict chỉ số (delay/jitter tính bằng giây).
+    """
+    flows, classifier, histograms = parse_flowmon(filename)
+    flow_names = flow_names or {}
+
+    result = {}
+    for row in flows:
+        flow_id = int(row['flow_id'])
+        if flow_id not in classifier:
+            continue
+        _, _, protocol, _, dst_port = classifier[flow_id]
+        key = FLOW_PORTS.get((protocol, dst_port))
+        if key is None:
+            continue  # Luồng ACK chiều ngược lại hoặc luồng không theo dõi
+
+        tx_packets, rx_packets = int(row['tx_packets']), int(row['rx_packets'])
+        lost_packets = int(row['lost_packets'])
+        result[key] = {
+            'flow_name': flow_names.get(key, key),
+            'flow_id': flow_id,
+            'tx_bytes': int(row['tx_bytes']),
+            'rx_bytes': int(row['rx_bytes']),
+            'tx_packets': tx_packets,
+            'rx_packets': rx_packets,
+            'lost_packets': lost_packets,
+            # Theo lostPackets của FlowMonitor (tx - rx còn tính cả gói đang trên đường khi dừng)
+            'loss_rate': lost_packets / tx_packets * 100 if tx_packets > 0 else 0,
+            'avg_delay': float(row['delay_sum']) / rx_packets if rx_packets > 0 else 0,
+            'avg_jitter': float(row['jitter_sum']) / (rx_packets - 1) if rx_packets > 1 else 0,
+            'delay_histogram': histograms.get(flow_id, {}).get('delayHistogram', np.empty((0, 3))),
+            'jitter_histogram': histograms.get(flow_id, {}).get('jitterHistogram', np.empty((0, 3))),
+        }
+    return result
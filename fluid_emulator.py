@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mô phỏng nhanh (mô hình fluid theo từng vòng RTT) topology của enterprise-network-newreno.cc
+Thay cho một lần chạy ns-3 khi cần thử nhiều tham số: LAN 100 Mbps/2 ms,
+WAN 5 Mbps/30 ms với hàng đợi DropTail 30 gói, lịch BulkSend/OnOff như main().
+
+Mỗi vòng dài một RTT (RTT cơ sở + trễ hàng đợi) và cập nhật mọi luồng cùng lúc
+bằng numpy:
+  - mỗi luồng TCP gửi min(cwnd, SndBufSize) bytes, UDP gửi tốc độ CBR x thời gian vòng
+  - phần vượt quá BDP nằm trong hàng đợi WAN; vượt quá 30 gói thì bị bỏ (tail
+    drop), số gói mất được chia ngẫu nhiên theo tỉ lệ lưu lượng mỗi luồng
+  - slow start nhân đôi cwnd mỗi vòng, congestion avoidance cộng 1 MSS
+  - mất k gói trong một cửa sổ: NewReno giảm một nửa một lần và ở trong fast
+    recovery k vòng (mỗi partial ACK sửa một gói); Reno giảm một nửa cho mỗi
+    gói mất (k = 2) hoặc rơi vào timeout (k >= 3); không đủ 3 duplicate ACK
+    thì cả hai timeout (cwnd = 1 MSS, chờ MinRto = 1 s)
+Kết quả được ghi ra các file enterprise-*.data đúng định dạng TCPAnalyzer đọc.
+
+Cách dùng:
+    python3 fluid_emulator.py out_dir
+    python3 fluid_emulator.py out_dir --wan-rate 10 --queue 60 --all-rx
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from synthetic_traces import (MSS, TCP_SCHEDULE, UDP_PACKET_SIZE, UDP_SCHEDULE,
+                              write_all_rx, write_rx, write_trace)
+
+# Tham số mặc định trong main() của enterprise-network-newreno.cc
+SIMULATION_TIME = 200.0
+LAN_RATE = 100e6          # bit/s
+LAN_DELAY = 0.002         # giây mỗi liên kết CSMA
+LAN_HOPS = 4              # client-switchA, switchA-routerA, routerB-switchB, switchB-server
+WAN_RATE = 5e6
+WAN_DELAY = 0.030
+WAN_QUEUE_PACKETS = 30
+INITIAL_CWND = 10 * MSS   # ns3::TcpSocket::InitialCwnd = 10 segment
+SND_BUF = 131072          # ns3::TcpSocket::SndBufSize/RcvBufSize
+MIN_RTO = 1.0             # ns3::TcpSocketBase::MinRto
+PACKET_OVERHEAD = 52      # IP + TCP (timestamp) header, bytes/gói trên WAN
+DUPACK_THRESHOLD = 3
+
+
+def flow_schedule(simulation_time=SIMULATION_TIME):
+    """Danh sách (tên, biến thể, bắt đầu, kết thúc, tốc độ UDP) như main(); variant 'udp' cho CBR
+
+    Simulator::Stop(simulationTime) cắt mọi ứng dụng còn chạy sau simulation_time.
+    """
+    flows = []
+    for name, variant, start, stop in TCP_SCHEDULE:
+        if name == 'main-newreno':
+            stop = simulation_time - 10.0  # mainTcpStopTime = simulationTime - 10
+        flows.append((name, variant, start, min(stop, simulation_time), 0.0))
+    for name, rate, start, stop in UDP_SCHEDULE:
+        flows.append((name, 'udp', start, min(stop, simulation_time), rate))
+    return flows
+
+
+def base_rtt(wan_delay=WAN_DELAY, lan_delay=LAN_DELAY, lan_rate=LAN_RATE, wan_rate=WAN_RATE):
+    """RTT không có hàng đợi: trễ lan truyền hai chiều + thời gian phát một gói trên mỗi liên kết"""
+    packet_bits = (MSS + PACKET_OVERHEAD) * 8
+    one_way = wan_delay + LAN_HOPS * lan_delay + packet_bits / wan_rate + LAN_HOPS * packet_bits / lan_rate
+    return 2 * one_way
+
+
+def simulate(simulation_time=SIMULATION_TIME, wan_rate=WAN_RATE, wan_delay=WAN_DELAY,
+             queue_packets=WAN_QUEUE_PACKETS, lan_rate=LAN_RATE, lan_delay=LAN_DELAY, seed=0):
+    """Chạy mô hình theo vòng cho mọi luồng cùng lúc
+
+    Trả về (flows, rounds) với flows là lịch luồng và rounds là dict các mảng
+    theo vòng: 'start', 'duration' (n_rounds) và 'delivered', 'cwnd_before',
+    'cwnd_after', 'lost' (n_rounds x n_flows).
+    """
+    rng = np.random.default_rng(seed)
+    flows = flow_schedule(simulation_time)
+    names, variants, starts, stops, rates = zip(*flows)
+    variants = np.array(variants)
+    starts, stops, rates = np.array(starts), np.array(stops), np.array(rates)
+    is_tcp = variants != 'udp'
+    is_reno = variants == 'reno'
+    n_flows = len(flows)
+
+    rate_bytes = wan_rate / 8
+    rtt0 = base_rtt(wan_delay, lan_delay, lan_rate, wan_rate)
+    bdp = rate_bytes * rtt0
+    queue_bytes = queue_packets * (MSS + PACKET_OVERHEAD)
+    packet_size = np.where(is_tcp, MSS, UDP_PACKET_SIZE).astype(np.float64)
+
+    cwnd = np.full(n_flows, float(INITIAL_CWND))
+    ssthresh = np.full(n_flows, np.inf)
+    started = np.zeros(n_flows, dtype=bool)
+    resume = np.zeros(n_flows)      # Hết timeout: không gửi trước thời điểm này
+    recovery = np.zeros(n_flows, dtype=np.int64)  # Số vòng fast recovery còn lại
+
+    history = {key: [] for key in ('start', 'duration', 'delivered', 'cwnd_before', 'cwnd_after', 'lost')}
+    t, queue = 0.0, 0.0
+    end = stops.max()
+    while t < end:
+        duration = rtt0 + queue / rate_bytes
+        active = (starts <= t) & (t < stops)
+        new = active & is_tcp & ~started
+        cwnd[new], ssthresh[new], started[new] = INITIAL_CWND, np.inf, True
+        sending = active & (~is_tcp | (t >= resume))
+
+        offered = np.where(is_tcp, np.minimum(cwnd, SND_BUF), rates / 8 * duration)
+        offered = np.where(sending, offered, 0.0)
+        total = offered.sum()
+
+        # Hàng đợi WAN: phần vượt BDP xếp hàng, vượt quá dung lượng hàng đợi thì bị bỏ
+        backlog = max(0.0, total - bdp)
+        excess = max(0.0, backlog - queue_bytes)
+        queue = backlog - excess
+        lost = np.zeros(n_flows, dtype=np.int64)
+        if excess > 0:
+            lost = rng.multinomial(int(np.ceil(excess / (MSS + PACKET_OVERHEAD))), offered / total)
+            lost = np.minimum(lost, np.floor(offered / packet_size).astype(np.int64))
+        delivered = offered - lost * packet_size
+
+        cwnd_before = cwnd.copy()
+        tcp = sending & is_tcp
+        segments = np.floor(offered / MSS)
+        had_loss = tcp & (lost > 0)
+        timeout = had_loss & ((segments - lost < DUPACK_THRESHOLD) | (is_reno & (lost >= 3)))
+        fast = had_loss & ~timeout
+        flight = np.minimum(cwnd, SND_BUF)
+
+        # Mất gói: ssthresh = flight/2; Reno mất 2 gói giảm một nửa hai lần
+        halved = np.maximum(flight / 2, 2 * MSS)
+        ssthresh = np.where(had_loss, halved, ssthresh)
+        cwnd = np.where(fast & is_reno & (lost == 2), np.maximum(halved / 2, 2 * MSS),
+                        np.where(fast, halved, cwnd))
+        ssthresh = np.where(fast & is_reno & (lost == 2), cwnd, ssthresh)
+        recovery = np.where(fast & ~is_reno, lost - 1, np.where(had_loss, 0, recovery))
+        cwnd = np.where(timeout, float(MSS), cwnd)
+        resume = np.where(timeout, t + duration + MIN_RTO, resume)
+
+        # Không mất gói: slow start / congestion avoidance (trừ khi còn trong fast recovery)
+        grow = tcp & ~had_loss & (recovery == 0)
+        in_recovery = tcp & ~had_loss & (recovery > 0)
+        cwnd = np.where(grow & (cwnd < ssthresh), np.minimum(2 * cwnd, np.maximum(ssthresh, cwnd + MSS)),
+                        np.where(grow, cwnd + MSS, cwnd))
+        recovery = np.where(in_recovery, recovery - 1, recovery)
+
+        history['start'].append(t)
+        history['duration'].append(duration)
+        history['delivered'].append(delivered)
+        history['cwnd_before'].append(np.where(tcp, cwnd_before, np.nan))
+        history['cwnd_after'].append(np.where(tcp, cwnd, np.nan))
+        history['lost'].append(lost)
+        t += duration
+
+    rounds = {key: np.array(values) for key, values in history.items()}
+    return flows, rounds
+
+
+def flow_traces(rounds, column, packet_size, one_way, is_tcp):
+    """Trace rx (times, sizes) và cwnd (times, values) của một luồng từ kết quả theo vòng
+
+    Gói nhận trải đều trong mỗi vòng (lệch one_way giây so với lúc gửi); phần lẻ
+    của một gói được cộng dồn sang vòng sau. Mỗi ACK ghi một dòng cwnd (tăng
+    tuyến tính trong vòng), mỗi lần giảm cwnd ghi thêm một dòng ở cuối vòng.
+    """
+    start, duration = rounds['start'], rounds['duration']
+    delivered = rounds['delivered'][:, column]
+    cumulative = np.floor(np.cumsum(delivered) / packet_size + 1e-9).astype(np.int64)
+    per_round = np.diff(np.concatenate(([0], cumulative)))
+    k = np.repeat(np.arange(len(start)), per_round)
+    first = np.repeat(cumulative - per_round, per_round)
+    position = (np.arange(len(k)) - first + 0.5) / per_round[k]
+    rx_times = start[k] + one_way + position * duration[k]
+    rx_sizes = np.full(len(k), packet_size, dtype=np.int64)
+    if not is_tcp:
+        return (rx_times, rx_sizes), None
+
+    before, after = rounds['cwnd_before'][:, column], rounds['cwnd_after'][:, column]
+    growing = after[k] >= before[k]
+    ack_values = np.where(growing, before[k] + (after[k] - before[k]) * (position + 0.5 / per_round[k]), before[k])
+    drops = np.flatnonzero(after < before)
+    times = np.concatenate((rx_times + one_way, start[drops] + duration[drops]))
+    values = np.concatenate((ack_values, after[drops]))
+    order = np.argsort(times, kind='stable')
+    return (rx_times, rx_sizes), (times[order], values[order].astype(np.int64))
+
+
+def emulate(out_dir, simulation_time=SIMULATION_TIME, wan_rate=WAN_RATE, wan_delay=WAN_DELAY,
+            queue_packets=WAN_QUEUE_PACKETS, seed=0, all_rx=False, bin_width=None):
+    """Chạy mô hình và ghi các file enterprise-*.data vào out_dir, trả về dict tên file -> số dòng"""
+    os.makedirs(out_dir, exist_ok=True)
+    flows, rounds = simulate(simulation_time, wan_rate, wan_delay, queue_packets, seed=seed)
+    one_way = base_rtt(wan_delay, wan_rate=wan_rate) / 2
+
+    written = {}
+    rx_series = {}
+    for column, (name, variant, _, _, _) in enumerate(flows):
+        is_tcp = variant != 'udp'
+        packet_size = MSS if is_tcp else UDP_PACKET_SIZE
+        (rx_times, rx_sizes), cwnd = flow_traces(rounds, column, packet_size, one_way, is_tcp)
+        if cwnd is not None:
+            filename = os.path.join(out_dir, f'enterprise-{name}-cwnd.data')
+            write_trace(filename, *cwnd)
+            written[filename] = len(cwnd[0])
+        filename = os.path.join(out_dir, f'enterprise-{name}-rx.data')
+        written[filename] = write_rx(filename, rx_times, rx_sizes, bin_width)
+        rx_series[name] = (rx_times, rx_sizes)
+
+    if all_rx:
+        filename = os.path.join(out_dir, 'enterprise-all-rx.data')
+        written[filename] = write_all_rx(filename, rx_series, bin_width=bin_width)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mô phỏng fluid nhanh topology enterprise (thay cho ns-3)')
+    parser.add_argument('out_dir', help='Thư mục ghi trace')
+    parser.add_argument('--simulation-time', type=float, default=SIMULATION_TIME, help='Thời gian mô phỏng (giây)')
+    parser.add_argument('--wan-rate', type=float, default=WAN_RATE / 1e6, help='Băng thông WAN (Mbps)')
+    parser.add_argument('--wan-delay', type=float, default=WAN_DELAY * 1e3, help='Trễ WAN một chiều (ms)')
+    parser.add_argument('--queue', type=int, default=WAN_QUEUE_PACKETS, help='Hàng đợi WAN (gói)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--all-rx', action='store_true', help='Ghi thêm enterprise-all-rx.data')
+    parser.add_argument('--bin-width', type=float, default=None,
+                        help='Gom trace rx theo bin (giây) như --rxBinWidth của mô phỏng')
+    args = parser.parse_args()
+
+    written = emulate(args.out_dir, args.simulation_time, args.wan_rate * 1e6, args.wan_delay / 1e3,
+                      args.queue, args.seed, args.all_rx, args.bin_width)
+    for filename, n in written.items():
+        print(f"✅ {filename}: {n:,} dòng")
+
+
+if __name__ == "__main__":
+    main()
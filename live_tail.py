@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Theo dõi (tail) các file trace trong lúc mô phỏng ns-3 vẫn đang chạy
+Mỗi file chỉ được đọc phần bytes mới ghi thêm kể từ lần trước; dòng chưa ghi
+xong (ofstream của ns-3 xả buffer giữa chừng) được giữ lại tới lần đọc sau.
+File được chọn bằng trace_reader.find_trace, nên mô phỏng chạy với
+--binaryTraces=true được theo dõi qua file .bin (bản ghi 12 byte cố định,
+mô phỏng xả buffer ít nhất mỗi giây mô phỏng).
+Thống kê được cập nhật dần bằng các bộ tích lũy của streaming_stats, nên
+không cần giữ lại toàn bộ dữ liệu đã đọc.
+"""
+
+import os
+import time
+
+import numpy as np
+
+import binary_trace
+import streaming_stats
+import trace_reader
+
+# Băng thông nút cổ chai (WAN) trong enterprise-network-newreno.cc
+BOTTLENECK_MBPS = 5.0
+
+
+class TraceTail:
+    """Đọc tăng dần một file 'time\\tvalue' đang được ghi thêm"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.offset = 0
+        self.partial = b''  # Phần dòng cuối chưa có ký tự xuống dòng
+        self.header_read = False
+        self.bin_width = None  # Độ rộng bin nếu là trace rx đã gom bin
+        self.restarted = False  # File bị ghi lại từ đầu kể từ lần đọc trước (LiveAnalyzer xóa cờ)
+
+    def read_new(self):
+        """Trả về (times, values, packets) của các dòng hoàn chỉnh mới xuất hiện
+
+        packets là None nếu mỗi dòng là một gói/một mẫu (trace chưa gom bin).
+        """
+        empty = np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64), None
+        try:
+            size = os.path.getsize(self.filename)
+        except OSError:
+            return empty  # File chưa được tạo
+        if size < self.offset:
+            # File bị ghi lại từ đầu (chạy mô phỏng mới)
+            self.offset, self.partial = 0, b''
+            self.header_read, self.bin_width = False, None
+            self.restarted = True
+        if size == self.offset:
+            return empty
+
+        with open(self.filename, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        self.offset += len(data)
+
+        data = self.partial + data
+        if not self.header_read:
+            if data.startswith(b'#'):
+                if b'\n' not in data:
+                    self.partial = data  # Header chưa ghi xong
+                    return empty
+                header, data = data.split(b'\n', 1)
+                self.bin_width = float(header.split(b'bin_width=')[1])
+            self.header_read = True
+
+        end = data.rfind(b'\n') + 1
+        self.partial = data[end:]
+        if end == 0:
+            return empty
+        if self.bin_width is None:
+            return trace_reader.parse_text(data[:end], self.filename) + (None,)
+        return trace_reader.parse_text(data[:end], self.filename, columns=3)
+
+
+class BinaryTraceTail:
+    """Đọc tăng dần một file .bin (header HEADER_SIZE byte, bản ghi cố định) đang được ghi thêm"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.offset = 0  # 0 = chưa đọc header
+        self.bin_width = None  # Trace nhị phân không bao giờ gom bin
+        self.restarted = False
+
+    def read_new(self):
+        """Trả về (times, values, None) của các bản ghi hoàn chỉnh mới xuất hiện"""
+        empty = np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64), None
+        try:
+            size = os.path.getsize(self.filename)
+        except OSError:
+            return empty
+        if size < self.offset:
+            self.offset = 0
+            self.restarted = True
+        if self.offset == 0:
+            if size < binary_trace.HEADER_SIZE:
+                return empty  # Header chưa ghi xong
+            binary_trace.check_header(self.filename)
+            self.offset = binary_trace.HEADER_SIZE
+        n_records = (size - self.offset) // binary_trace.RECORD_DTYPE.itemsize
+        if n_records == 0:
+            return empty
+        records = np.fromfile(self.filename, dtype=binary_trace.RECORD_DTYPE, count=n_records,
+                              offset=self.offset)
+        self.offset += n_records * binary_trace.RECORD_DTYPE.itemsize
+        return records['time'], records['value'].astype(np.int64), None
+
+
+def open_tail(filename):
+    """Bộ đọc tăng dần phù hợp với file (.bin hoặc văn bản)"""
+    if binary_trace.is_binary(filename):
+        return BinaryTraceTail(filename)
+    if trace_reader.compression(filename) or trace_reader.is_archive(filename):
+        raise ValueError(f"File {filename} là bản nén/lưu trữ của trace đã xong, không theo dõi được")
+    return TraceTail(filename)
+
+
+class LiveAnalyzer:
+    """Thống kê trực tiếp cho các trace trong trace_files (key -> (file, tên luồng))"""
+
+    def __init__(self, trace_files, data_dir='.', window_size=5.0):
+        self.window_size = window_size
+        self.flow_names = {key: flow_name for key, (_, flow_name) in trace_files.items()}
+        self.paths = {key: os.path.join(data_dir, filename) for key, (filename, _) in trace_files.items()}
+        self.tails = {}  # key -> TraceTail/BinaryTraceTail, tạo khi file xuất hiện
+        self.acc = {key: self.new_accumulator(key) for key in trace_files}
+        self.last_cwnd = {}
+        self.last_time = {}  # key -> thời điểm mô phỏng lớn nhất đã thấy trong file
+        self.sim_time = 0.0  # Thời điểm mô phỏng lớn nhất đã thấy
+
+    def new_accumulator(self, key):
+        if key.endswith('_rx'):
+            return streaming_stats.RxStreamingStats(self.window_size)
+        return streaming_stats.CwndStreamingStats()
+
+    def reset(self, key):
+        """Bỏ thống kê của key khi file bị ghi lại (chạy mô phỏng mới)"""
+        self.acc[key] = self.new_accumulator(key)
+        self.last_cwnd.pop(key, None)
+        self.last_time.pop(key, None)
+        self.sim_time = max(self.last_time.values(), default=0.0)
+
+    def poll(self):
+        """Đọc phần mới của mọi file và cập nhật thống kê, trả về số dòng mới"""
+        new_rows = 0
+        for key in self.paths:
+            tail = self.tail(key)
+            if tail is None:
+                continue
+            times, values, packets = tail.read_new()
+            if tail.restarted:
+                tail.restarted = False
+                self.reset(key)
+            if len(times) == 0:
+                continue
+            if key.endswith('_rx'):
+                self.acc[key].bin_width = tail.bin_width
+                self.acc[key].update(times, values, packets)
+            else:
+                self.acc[key].update(times, values)
+                self.last_cwnd[key] = int(values[-1])
+            self.last_time[key] = float(times[-1])
+            self.sim_time = max(self.sim_time, self.last_time[key])
+            new_rows += len(times)
+        return new_rows
+
+    def recent_throughput(self, key):
+        """Throughput (Mbps) của cửa sổ hoàn chỉnh gần nhất trước sim_time"""
+        window = (self.sim_time // self.window_size - 1) * self.window_size
+        return self.acc[key].index.range_throughput(window, window + self.window_size)
+
+    def stats(self):
+        """Thống kê hiện tại, cùng định dạng với TCPAnalyzer.calculate_statistics"""
+        result = {}
+        for key, acc in self.acc.items():
+            count = acc.packets if key.endswith('_rx') else acc.cwnd.count
+            if count:
+                result[key] = acc.result(self.flow_names[key])
+        return result
+
+    def tail(self, key):
+        """Bộ đọc của key theo file find_trace chọn (None nếu chưa có file nào)
+
+        Chọn lại mỗi lần đọc: mô phỏng mới ghi dạng khác (.data <-> .bin) thì
+        thống kê của key được làm lại từ đầu.
+        """
+        filename = trace_reader.find_trace(self.paths[key])
+        tail = self.tails.get(key)
+        if tail is not None and tail.filename == filename:
+            return tail
+        if not os.path.exists(filename):
+            return None
+        if tail is not None:
+            self.reset(key)
+        self.tails[key] = open_tail(filename)
+        return self.tails[key]
+
+    def summary(self):
+        """In bảng tóm tắt ngắn gọn: throughput, CWND và mức sử dụng nút cổ chai"""
+        stats = self.stats()
+        print(f"\n⏱️  t = {self.sim_time:.1f}s (cửa sổ {self.window_size:g}s gần nhất)")
+        total_recent = 0.0
+        for key, s in stats.items():
+            if key.endswith('_rx'):
+                recent = self.recent_throughput(key)
+                total_recent += recent
+                print(f"   • {s['flow_name']:<22} {s['packets']:>10,} gói  "
+                      f"TB {s['avg_throughput']:6.3f} Mbps  gần nhất {recent:6.3f} Mbps")
+            else:
+                print(f"   • {s['flow_name'] + ' CWND':<22} hiện tại {self.last_cwnd[key] / 1024:7.1f} KB  "
+                      f"TB {s['avg_cwnd_kb']:7.1f} KB  giảm {s['cwnd_decreases']:,} lần")
+        utilization = total_recent / BOTTLENECK_MBPS * 100
+        print(f"   📈 Sử dụng nút cổ chai: {total_recent:.3f}/{BOTTLENECK_MBPS:g} Mbps ({utilization:.1f}%)")
+
+    def follow(self, interval=5.0, idle_timeout=30.0, poll_interval=0.5):
+        """Theo dõi tới khi không có dữ liệu mới trong idle_timeout giây (hoặc Ctrl+C)
+
+        interval: chu kỳ in bảng tóm tắt (giây thực)
+        idle_timeout: None = theo dõi mãi mãi
+        Trả về True nếu dừng vì hết dữ liệu, False nếu bị ngắt.
+        """
+        print(f"👀 Đang theo dõi {len(self.paths)} file trace (Ctrl+C để dừng)...")
+        last_data = last_summary = time.monotonic()
+        changed = False  # Có dữ liệu mới kể từ lần in tóm tắt trước
+        try:
+            while True:
+                now = time.monotonic()
+                if self.poll():
+                    last_data, changed = now, True
+                if changed and now - last_summary >= interval:
+                    self.summary()
+                    last_summary, changed = now, False
+                if idle_timeout is not None and now - last_data >= idle_timeout:
+                    if changed:
+                        self.summary()
+                    print(f"✅ Không có dữ liệu mới trong {idle_timeout:g}s, dừng theo dõi")
+                    return True
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            self.summary()
+            print("⚠️  Đã dừng theo dõi")
+            return False
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Đọc file pcap của mô phỏng (chạy với --pcap=true) và phân tích từng luồng TCP
+File được memmap; header Ethernet/PPP + IPv4 + TCP/UDP của mọi gói được đọc
+hàng loạt bằng chỉ mục numpy vào một mảng cấu trúc PACKET_DTYPE (41 byte/gói),
+không tạo đối tượng Python cho từng gói. Bước tuần tự duy nhất là dò vị trí bắt
+đầu từng bản ghi (xem record_offsets): chuỗi bản ghi cùng độ dài được tính bằng
+số học và kiểm tra hàng loạt, chỉ các bản ghi độ dài xen kẽ mới đi từng bước.
+
+Với mỗi luồng TCP (nhận diện theo cổng như flowmon_parser.FLOW_PORTS):
+  - truyền lại: đoạn có số thứ tự bắt đầu đã đi qua điểm bắt trước đó
+  - goodput: chỉ tính bytes lần đầu thấy; throughput: mọi bytes (kể cả truyền lại)
+  - RTT: mỗi ACK báo nhận dữ liệu mới được ghép với đoạn có TSval bằng TSecr của
+    nó (option timestamp RFC 7323, bật trong mô phỏng), nên ACK cộng dồn sau khi
+    lấp lỗ hổng được đo từ lần truyền lại. Không có timestamp: ghép đoạn với ACK
+    đầu tiên có số ack = seq + độ dài, bỏ theo Karn các đoạn đã truyền lại và các
+    mẫu mà trong lúc chờ ACK có đoạn số thứ tự thấp hơn được truyền lại
+
+enterprise-network-newreno.cc ghi hai file trên router A:
+  - enterprise-lan-routerA.pcap (Ethernet, phía LAN A): dữ liệu trước hàng đợi WAN,
+    thấy cả đoạn bị rớt ở nút cổ chai và lần truyền lại của chúng
+  - enterprise-wan-routerA.pcap (PPP, liên kết WAN): dữ liệu sau hàng đợi WAN
+
+Cách dùng:
+    python3 pcap_reader.py                                  # enterprise-lan-routerA.pcap
+    python3 pcap_reader.py run1/enterprise-wan-routerA.pcap --window 5 --rtt-csv rtt.csv
+"""
+
+import argparse
+import mmap
+import os
+import struct
+from array import array
+
+import numpy as np
+import pandas as pd
+
+import flowmon_parser
+import trace_reader
+
+PCAP_FILES = {
+    'lan': 'enterprise-lan-routerA.pcap',
+    'wan': 'enterprise-wan-routerA.pcap',
+}
+
+GLOBAL_HEADER_SIZE = 24
+RECORD_HEADER_SIZE = 16
+
+# magic number -> (thứ tự byte, đơn vị phần lẻ của timestamp)
+MAGIC = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1e-6),
+    b'\xa1\xb2\xc3\xd4': ('>', 1e-6),
+    b'\x4d\x3c\xb2\xa1': ('<', 1e-9),
+    b'\xa1\xb2\x3c\x4d': ('>', 1e-9),
+}
+
+LINKTYPE_ETHERNET = 1
+LINKTYPE_PPP = 9
+LINKTYPE_RAW = (101, 228)  # IP không có header lớp liên kết
+
+ETHERTYPE_IPV4 = 0x0800
+PPP_IPV4 = 0x0021
+
+TCP, UDP = 6, 17
+TCP_ACK = 0x10
+
+# Option TCP: kết thúc danh sách, đệm, timestamp (kind 8, dài 10 byte: TSval, TSecr)
+TCP_OPT_EOL, TCP_OPT_NOP, TCP_OPT_TIMESTAMP = 0, 1, 8
+TCP_OPT_TIMESTAMP_LEN = 10
+
+SEQ_MOD = 1 << 32
+SEQ_HALF = 1 << 31
+
+# Số bản ghi xử lý mỗi lần: giới hạn bộ nhớ của các mảng trung gian khi file nhiều GB
+CHUNK_RECORDS = 1_000_000
+
+# record_offsets: số bản ghi cùng độ dài liên tiếp trước khi đoán cả khối theo bước cố định
+# (gấp đôi tới SPECULATE_AFTER_MAX sau mỗi lần đoán không bõ công), và kích thước khối đoán
+# đầu tiên (gấp đôi sau mỗi lần đoán đúng cả khối, tối đa CHUNK_RECORDS)
+SPECULATE_AFTER = 8
+SPECULATE_AFTER_MAX = 1024
+SPECULATE_BLOCK = 64
+
+PACKET_DTYPE = np.dtype([
+    ('time', np.float64),    # giây
+    ('src', np.uint32),      # địa chỉ IPv4 dạng số
+    ('dst', np.uint32),
+    ('sport', np.uint16),
+    ('dport', np.uint16),
+    ('proto', np.uint8),
+    ('flags', np.uint8),     # cờ TCP (0 với UDP)
+    ('seq', np.uint32),
+    ('ack', np.uint32),
+    ('payload', np.uint16),  # bytes dữ liệu lớp ứng dụng
+    ('has_ts', np.bool_),    # có option timestamp
+    ('tsval', np.uint32),
+    ('tsecr', np.uint32),
+])
+
+
+def _gather(buf, pos):
+    # Vị trí vượt cuối file (bản ghi bị cắt) được kẹp lại, các gói đó bị lọc bởi mặt nạ độ dài
+    return buf[np.minimum(pos, len(buf) - 1)]
+
+
+def _be16(buf, pos):
+    return (_gather(buf, pos).astype(np.uint16) << 8) | _gather(buf, pos + 1)
+
+
+def _be32(buf, pos):
+    return ((_gather(buf, pos).astype(np.uint32) << 24) | (_gather(buf, pos + 1).astype(np.uint32) << 16) |
+            (_gather(buf, pos + 2).astype(np.uint32) << 8) | _gather(buf, pos + 3))
+
+
+def _u32(buf, pos, byteorder):
+    """Trường 32 bit của header pcap theo thứ tự byte của file"""
+    if byteorder == '>':
+        return _be32(buf, pos)
+    return ((_gather(buf, pos + 3).astype(np.uint32) << 24) | (_gather(buf, pos + 2).astype(np.uint32) << 16) |
+            (_gather(buf, pos + 1).astype(np.uint32) << 8) | _gather(buf, pos))
+
+
+def open_capture(filename):
+    """Nội dung file pcap: memmap với file thường, bytes đã giải nén với .gz/.xz/.zst"""
+    if trace_reader.compression(filename):
+        with trace_reader.open_trace(filename) as f:
+            return f.read()
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def read_header(data, filename='<pcap>'):
+    """(thứ tự byte, đơn vị timestamp, linktype) từ header toàn cục của file"""
+    if len(data) < GLOBAL_HEADER_SIZE or bytes(data[:4]) not in MAGIC:
+        raise ValueError(f"File {filename}: không phải file pcap")
+    byteorder, ts_unit = MAGIC[bytes(data[:4])]
+    linktype = struct.unpack_from(byteorder + 'I', data, 20)[0] & 0x0FFFFFFF
+    return byteorder, ts_unit, linktype
+
+
+def record_offsets(data, byteorder):
+    """Vị trí bắt đầu các bản ghi
+
+    Vị trí bản ghi sau phụ thuộc độ dài bản ghi trước nên phải dò tuần tự. Sau
+    SPECULATE_AFTER bản ghi cùng độ dài (caplen = snaplen, loạt đoạn dữ liệu đầy
+    MSS), cả khối tiếp theo được đoán theo bước cố định rồi kiểm tra trường độ
+    dài hàng loạt; khối gấp đôi khi đoán đúng, nên file mọi bản ghi cùng độ dài
+    chỉ cần O(log n) bước. Lần đoán chỉ được vài bản ghi (rẻ hơn đi từng bước)
+    làm tăng ngưỡng, nên độ dài xen kẽ ngẫu nhiên (dữ liệu và ACK trên cùng liên
+    kết) gần như luôn đi từng bản ghi (~0,6 µs/bản ghi), phần chậm nhất còn lại
+    của read_pcap.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8) if len(data) else np.zeros(1, dtype=np.uint8)
+    unpack = struct.Struct(byteorder + 'I').unpack_from
+    parts = []
+    offsets = array('q')
+    append = offsets.append
+    offset, last = GLOBAL_HEADER_SIZE, len(data) - RECORD_HEADER_SIZE
+    run_caplen, run, block = None, 0, SPECULATE_BLOCK
+    threshold = SPECULATE_AFTER
+    while offset <= last:
+        caplen = unpack(data, offset + 8)[0]
+        append(offset)
+        offset += RECORD_HEADER_SIZE + caplen
+        if caplen != run_caplen:
+            run_caplen, run, block = caplen, 1, SPECULATE_BLOCK
+            continue
+        run += 1
+        if run < threshold or offset > last:
+            continue
+        # Đoán khối: các bản ghi tiếp theo cùng độ dài, kiểm tra trường caplen của chúng
+        stride = RECORD_HEADER_SIZE + caplen
+        guess = offset + np.arange(min(block, (last - offset) // stride + 1), dtype=np.int64) * stride
+        same = _u32(buf, guess + 8, byteorder) == caplen
+        n = len(guess) if same.all() else int(np.argmin(same)) + 1  # bản ghi khác độ dài đầu tiên vẫn hợp lệ
+        parts.append(np.frombuffer(offsets, dtype=np.int64))
+        parts.append(guess[:n])
+        offsets = array('q')
+        append = offsets.append
+        # Mỗi lần đoán tốn cỡ vài chục bản ghi đi từng bước
+        threshold = SPECULATE_AFTER if n >= SPECULATE_BLOCK // 2 else min(2 * threshold, SPECULATE_AFTER_MAX)
+        if n == len(guess):
+            offset += n * stride
+            block = min(2 * block, CHUNK_RECORDS)
+        else:
+            # Tiếp tục tuần tự sau bản ghi khác độ dài
+            caplen = unpack(data, int(guess[n - 1]) + 8)[0]
+            offset = int(guess[n - 1]) + RECORD_HEADER_SIZE + caplen
+            run_caplen, run, block = caplen, 1, SPECULATE_BLOCK
+    parts.append(np.frombuffer(offsets, dtype=np.int64))
+    return np.concatenate(parts)
+
+
+def _link_layer(buf, start, linktype):
+    """(mặt nạ gói IPv4, vị trí header IPv4) theo loại lớp liên kết"""
+    if linktype == LINKTYPE_ETHERNET:
+        return _be16(buf, start + 12) == ETHERTYPE_IPV4, start + 14
+    if linktype == LINKTYPE_PPP:
+        # ns-3 chỉ ghi trường protocol 2 byte; một số công cụ ghi thêm address/control 0xff03
+        framed = _be16(buf, start) == 0xFF03
+        start = start + np.where(framed, 2, 0)
+        return _be16(buf, start) == PPP_IPV4, start + 2
+    if linktype in LINKTYPE_RAW:
+        return (_gather(buf, start) >> 4) == 4, start
+    raise ValueError(f"Linktype pcap {linktype} không hỗ trợ (cần Ethernet, PPP hoặc raw IPv4)")
+
+
+def _timestamps(buf, options, limit):
+    """(có option timestamp, TSval, TSecr) của các header TCP có option trong [options, limit)
+
+    Duyệt danh sách option của mọi gói cùng lúc, mỗi vòng một option; tối đa 40 vòng
+    (option dài ít nhất 1 byte), thường 2-3 vòng (NOP, NOP, timestamp).
+    """
+    has_ts = np.zeros(len(options), dtype=np.bool_)
+    tsval = np.zeros(len(options), dtype=np.uint32)
+    tsecr = np.zeros(len(options), dtype=np.uint32)
+    pos = options.copy()
+    active = np.flatnonzero(pos < limit)
+    while len(active):
+        at, end = pos[active], limit[active]
+        kind = _gather(buf, at)
+        length = np.where(kind == TCP_OPT_NOP, 1, _gather(buf, at + 1).astype(np.int64))
+        found = (kind == TCP_OPT_TIMESTAMP) & (length == TCP_OPT_TIMESTAMP_LEN) & (at + length <= end)
+        hit = active[found]
+        has_ts[hit] = True
+        tsval[hit] = _be32(buf, at[found] + 2)
+        tsecr[hit] = _be32(buf, at[found] + 6)
+        pos[active] = at + length
+        # Dừng khi gặp EOL, timestamp, option hỏng (độ dài < 2) hoặc hết header
+        active = active[(kind != TCP_OPT_EOL) & ~found & (length >= 1) &
+                        ((kind == TCP_OPT_NOP) | (length >= 2)) & (at + length < end)]
+    return has_ts, tsval, tsecr
+
+
+def parse_records(buf, offsets, byteorder, ts_unit, linktype):
+    """Header các gói IPv4 TCP/UDP tại các vị trí bản ghi cho trước -> mảng PACKET_DTYPE"""
+    caplen = _u32(buf, offsets + 8, byteorder).astype(np.int64)
+    start = offsets + RECORD_HEADER_SIZE
+    end = start + caplen
+    complete = end <= len(buf)  # bỏ bản ghi cuối bị cắt khi mô phỏng chưa đóng file
+    offsets, start, end = offsets[complete], start[complete], end[complete]
+
+    is_ip, ip = _link_layer(buf, start, linktype)
+    vihl = _gather(buf, ip)
+    ihl = (vihl & 0x0F).astype(np.int64) * 4
+    proto = _gather(buf, ip + 9)
+    is_tcp, is_udp = proto == TCP, proto == UDP
+    l4 = ip + ihl
+    keep = (is_ip & ((vihl >> 4) == 4) & (ihl >= 20) &
+            (end >= l4 + np.where(is_tcp, 20, 8)) & (is_tcp | is_udp))
+    offsets, end, ip, ihl, l4, proto, is_tcp = (offsets[keep], end[keep], ip[keep], ihl[keep],
+                                                l4[keep], proto[keep], is_tcp[keep])
+
+    packets = np.zeros(len(offsets), dtype=PACKET_DTYPE)
+    packets['time'] = (_u32(buf, offsets, byteorder) +
+                       _u32(buf, offsets + 4, byteorder) * ts_unit)
+    packets['src'] = _be32(buf, ip + 12)
+    packets['dst'] = _be32(buf, ip + 16)
+    packets['sport'] = _be16(buf, l4)
+    packets['dport'] = _be16(buf, l4 + 2)
+    packets['proto'] = proto
+
+    # TCP: payload = tổng độ dài IP - header IP - header TCP; UDP: độ dài UDP - 8
+    ip_payload = _be16(buf, ip + 2).astype(np.int64) - ihl
+    tcp_header = (_gather(buf, l4 + 12) >> 4).astype(np.int64) * 4
+    udp_payload = _be16(buf, l4 + 4).astype(np.int64) - 8
+    packets['payload'] = np.clip(np.where(is_tcp, ip_payload - tcp_header, udp_payload), 0, None)
+    packets['flags'] = np.where(is_tcp, _gather(buf, l4 + 13), 0)
+    packets['seq'] = np.where(is_tcp, _be32(buf, l4 + 4), 0)
+    packets['ack'] = np.where(is_tcp, _be32(buf, l4 + 8), 0)
+    options_end = np.where(is_tcp, np.minimum(l4 + tcp_header, end), 0)
+    packets['has_ts'], packets['tsval'], packets['tsecr'] = _timestamps(buf, l4 + 20, options_end)
+    return packets
+
+
+def read_pcap(filename, chunk_records=CHUNK_RECORDS):
+    """Đọc mọi gói IPv4 TCP/UDP của file pcap, trả về mảng PACKET_DTYPE theo thứ tự trong file"""
+    data = open_capture(filename)  # memmap được đóng khi không còn tham chiếu
+    byteorder, ts_unit, linktype = read_header(data, filename)
+    offsets = record_offsets(data, byteorder)
+    buf = np.frombuffer(data, dtype=np.uint8)
+    parts = [parse_records(buf, offsets[i:i + chunk_records], byteorder, ts_unit, linktype)
+             for i in range(0, len(offsets), chunk_records)]
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=PACKET_DTYPE)
+
+
+def unwrap_seq(values, base):
+    """Số thứ tự/ack 32 bit -> int64 tính từ base, xử lý tràn vòng 2^32"""
+    steps = np.diff(values.astype(np.int64), prepend=np.int64(base))
+    steps = (steps + SEQ_HALF) % SEQ_MOD - SEQ_HALF  # mỗi bước nằm trong [-2^31, 2^31)
+    return np.cumsum(steps)
+
+
+def windowed_mbps(times, nbytes, window, n_windows):
+    """Throughput (Mbps) theo cửa sổ [k*window, (k+1)*window)"""
+    index = (times // window).astype(np.int64)
+    return np.bincount(index, weights=nbytes, minlength=n_windows)[:n_windows] * 8 / (window * 1e6)
+
+
+def _rtt_timestamps(data, end, acks, ack):
+    """(chỉ số đoạn dữ liệu, chỉ số ACK) ghép theo TSecr = TSval (RTTM, RFC 7323)
+
+    Chỉ dùng ACK báo nhận dữ liệu mới (dupack lặp lại TSval cũ). Đoạn được chọn là
+    đoạn có cùng TSval và kết thúc đúng số ack; nếu không có (ACK cộng dồn sau khi
+    lấp lỗ hổng, delayed ACK qua hai mốc TSval) thì lấy lần gửi đầu tiên mang TSval đó.
+    """
+    advancing = ack > np.maximum.accumulate(np.concatenate(([np.iinfo(np.int64).min], ack[:-1])))
+    ack_pos = np.flatnonzero(advancing)
+    tsecr, ack = acks['tsecr'][ack_pos], ack[ack_pos]
+
+    keys = pd.MultiIndex.from_arrays([data['tsval'], end])
+    first = np.flatnonzero(~keys.duplicated())
+    exact = keys[first].get_indexer(pd.MultiIndex.from_arrays([tsecr, ack]))
+    tsval = pd.Index(data['tsval'])
+    first_sent = np.flatnonzero(~tsval.duplicated())
+    by_tsval = tsval[first_sent].get_indexer(tsecr)
+    data_pos = np.where(exact >= 0, first[exact], np.where(by_tsval >= 0, first_sent[by_tsval], -1))
+    matched = np.flatnonzero(data_pos >= 0)
+    order = matched[np.argsort(data_pos[matched], kind='stable')]  # theo thứ tự gửi
+    return data_pos[order], ack_pos[order]
+
+
+def _rtt_karn(data, seq, end, acks, ack):
+    """(chỉ số đoạn dữ liệu, chỉ số ACK) ghép theo số ack = seq + độ dài (không có timestamp)
+
+    Karn: bỏ đoạn có số thứ tự xuất hiện nhiều lần, và mẫu mà giữa lúc gửi và lúc
+    nhận ACK có đoạn số thứ tự thấp hơn được truyền lại (ACK cộng dồn khi lỗ hổng
+    được lấp, không đo RTT của đoạn này).
+    """
+    once = np.flatnonzero(~pd.Index(seq).duplicated(keep=False))
+    ack_index = pd.Index(ack)
+    first_ack = np.flatnonzero(~ack_index.duplicated())  # ACK trùng (dupack) giữ lần đầu
+    position = ack_index[first_ack].get_indexer(end[once])
+    data_pos, ack_pos = once[position >= 0], first_ack[position[position >= 0]]
+
+    # Số thứ tự nhỏ nhất của các lần truyền lại trong (lúc gửi, lúc nhận ACK]: minimum.reduceat
+    # trên dãy truyền lại theo thứ tự bắt, phần tử cuối là lính canh cho khoảng rỗng
+    retransmissions = np.flatnonzero(pd.Index(seq).duplicated())
+    retransmitted_seq = np.append(seq[retransmissions], np.iinfo(np.int64).max)
+    last = np.searchsorted(data['time'], acks['time'][ack_pos], side='right')
+    lo = np.searchsorted(retransmissions, data_pos + 1)
+    hi = np.searchsorted(retransmissions, last)
+    lowest = np.minimum.reduceat(retransmitted_seq, np.column_stack([lo, hi]).ravel())[::2]
+    clean = (hi <= lo) | (lowest >= end[data_pos])
+    return data_pos[clean], ack_pos[clean]
+
+
+def rtt_samples(data, acks, base):
+    """Thời điểm gửi và RTT (giây) của các đoạn dữ liệu ghép được với ACK
+
+    data: các đoạn dữ liệu của một luồng (payload > 0), acks: các gói ACK chiều ngược lại.
+    Dùng option timestamp khi mọi gói đều có, ngược lại ghép theo số thứ tự (Karn).
+    """
+    seq = unwrap_seq(data['seq'], base)
+    end = seq + data['payload']
+    ack = unwrap_seq(acks['ack'], base)
+    if len(data) and len(acks) and data['has_ts'].all() and acks['has_ts'].all():
+        data_pos, ack_pos = _rtt_timestamps(data, end, acks, ack)
+    else:
+        data_pos, ack_pos = _rtt_karn(data, seq, end, acks, ack)
+    sent = data['time'][data_pos]
+    rtt = acks['time'][ack_pos] - sent
+    valid = rtt > 0
+    return sent[valid], rtt[valid]
+
+
+def analyze_flow(data, acks, window=1.0, n_windows=None):
+    """Chỉ số của một luồng TCP tại điểm bắt
+
+    data: mọi gói chiều dữ liệu (kể cả SYN/FIN), acks: gói có cờ ACK chiều ngược lại.
+    Trả về dict chỉ số (thời gian tính bằng giây) và các mảng 'rtt_times', 'rtt',
+    'window_starts', 'throughput_series', 'goodput_series'.
+    """
+    base = int(data['seq'][0])
+    data = data[data['payload'] > 0]
+    seq = unwrap_seq(data['seq'], base)
+    retransmitted = pd.Index(seq).duplicated()  # đã thấy đoạn cùng số thứ tự trước đó
+    payload = data['payload'].astype(np.int64)
+    times = data['time']
+
+    if n_windows is None:
+        n_windows = int(times[-1] // window) + 1 if len(times) else 0
+    unique = np.where(retransmitted, 0, payload)
+    rtt_times, rtt = rtt_samples(data, acks, base)
+
+    packets = len(data)
+    duration = times[-1] - times[0] if packets > 1 else 0
+    result = {
+        'packets': packets,
+        'ack_packets': len(acks),
+        'payload_bytes': int(payload.sum()),
+        'unique_bytes': int(unique.sum()),
+        'retransmissions': int(retransmitted.sum()),
+        'retransmitted_bytes': int(payload[retransmitted].sum()),
+        'retransmission_rate': retransmitted.sum() / packets * 100 if packets else 0,
+        'duration': duration,
+        'avg_throughput': payload.sum() * 8 / (duration * 1e6) if duration > 0 else 0,
+        'avg_goodput': unique.sum() * 8 / (duration * 1e6) if duration > 0 else 0,
+        'rtt_samples': len(rtt),
+        'min_rtt': float(rtt.min()) if len(rtt) else 0,
+        'avg_rtt': float(rtt.mean()) if len(rtt) else 0,
+        'median_rtt': float(np.median(rtt)) if len(rtt) else 0,
+        'p95_rtt': float(np.percentile(rtt, 95)) if len(rtt) else 0,
+        'max_rtt': float(rtt.max()) if len(rtt) else 0,
+        'rtt_times': rtt_times,
+        'rtt': rtt,
+        'window_starts': np.arange(n_windows) * window,
+        'throughput_series': windowed_mbps(times, payload, window, n_windows),
+        'goodput_series': windowed_mbps(times, unique, window, n_windows),
+    }
+    return result
+
+
+def flow_packets(packets):
+    """dict key luồng TCP -> (gói chiều dữ liệu, gói ACK chiều ngược lại)"""
+    tcp = packets[packets['proto'] == TCP]
+    flows = {}
+    for (protocol, port), key in flowmon_parser.FLOW_PORTS.items():
+        if protocol != TCP:
+            continue
+        data = tcp[tcp['dport'] == port]
+        if len(data) == 0:
+            continue
+        reverse = tcp[tcp['sport'] == port]
+        flows[key] = data, reverse[(reverse['flags'] & TCP_ACK) != 0]
+    return flows
+
+
+def flow_statistics(filename, flow_names=None, window=1.0, samples=False):
+    """Thống kê pcap cho các luồng TCP đã biết
+
+    flow_names: dict key luồng ('newreno', 'reno', ...) -> tên hiển thị
+    samples=False bỏ các mảng mẫu RTT (có thể dài bằng số gói) khỏi kết quả.
+    Trả về dict key luồng -> dict chỉ số (xem analyze_flow).
+    """
+    packets = read_pcap(filename)
+    flow_names = flow_names or {}
+    n_windows = int(packets['time'].max() // window) + 1 if len(packets) else 0
+    result = {}
+    for key, (data, acks) in flow_packets(packets).items():
+        stats = {'flow_name': flow_names.get(key, key)}
+        stats.update(analyze_flow(data, acks, window, n_windows))
+        if not samples:
+            del stats['rtt_times'], stats['rtt']
+        result[key] = stats
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Phân tích RTT, truyền lại và goodput từ file pcap')
+    parser.add_argument('file', nargs='?', default=PCAP_FILES['lan'],
+                        help=f"File pcap (mặc định {PCAP_FILES['lan']}; .gz/.xz/.zst được giải nén)")
+    parser.add_argument('--window', type=float, default=1.0, help='Cửa sổ goodput/throughput (giây)')
+    parser.add_argument('--series-csv', default=None, metavar='FILE.csv',
+                        help='Ghi goodput/throughput theo cửa sổ của từng luồng ra CSV')
+    parser.add_argument('--rtt-csv', default=None, metavar='FILE.csv', help='Ghi mọi mẫu RTT ra CSV')
+    args = parser.parse_args()
+
+    filename = trace_reader.find_trace(args.file)
+    if not os.path.exists(filename):
+        print(f"⚠️  File {filename} không tồn tại")
+        return
+    try:
+        stats = flow_statistics(filename, window=args.window, samples=args.rtt_csv is not None)
+    except Exception as e:
+        print(f"❌ Lỗi đọc file {filename}: {e}")
+        return
+
+    if not stats:
+        print(f"⚠️  Không có luồng TCP nào trong {filename}")
+        return
+    print(f"📶 {filename}: {len(stats)} luồng TCP")
+    for key, s in stats.items():
+        print(f"• {s['flow_name']}: RTT TB {s['avg_rtt'] * 1000:.1f} ms (min {s['min_rtt'] * 1000:.1f}, "
+              f"p95 {s['p95_rtt'] * 1000:.1f}, {s['rtt_samples']:,} mẫu), "
+              f"truyền lại {s['retransmissions']:,}/{s['packets']:,} đoạn ({s['retransmission_rate']:.2f}%), "
+              f"goodput {s['avg_goodput']:.2f} / throughput {s['avg_throughput']:.2f} Mbps")
+
+    if args.series_csv:
+        frames = [pd.DataFrame({'flow': key, 'window_start': s['window_starts'],
+                                'throughput_mbps': s['throughput_series'],
+                                'goodput_mbps': s['goodput_series']}) for key, s in stats.items()]
+        pd.concat(frames).to_csv(args.series_csv, index=False)
+        print(f"✅ Đã lưu: {args.series_csv}")
+    if args.rtt_csv:
+        frames = [pd.DataFrame({'flow': key, 'time': s['rtt_times'], 'rtt': s['rtt']})
+                  for key, s in stats.items()]
+        pd.concat(frames).to_csv(args.rtt_csv, index=False)
+        print(f"✅ Đã lưu: {args.rtt_csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,23 +7,61 @@ Script vẽ biểu đồ so sánh TCP NewReno vs TCP Reno
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+from datetime import datetime
+import decimate
+import trace_reader
+import results_store
+
+# Trace của NewReno và Reno mà biểu đồ so sánh đọc
+TRACE_FILES = ['enterprise-main-newreno-rx.data', 'enterprise-main-newreno-cwnd.data',
+               'enterprise-reno-rx.data', 'enterprise-reno-cwnd.data']
 
 def read_data(filename):
     """Đọc dữ liệu từ file"""
+    filename = trace_reader.find_trace(filename)
     if not os.path.exists(filename):
-        return [], []
+        return np.array([]), np.array([], dtype=np.int64)
     
-    times, values = [], []
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                parts = line.strip().split('\t')
-                if len(parts) >= 2:
-                    times.append(float(parts[0]))
-                    values.append(int(parts[1]))
-    except:
-        pass
-    return times, values
+        return trace_reader.read_trace(filename)
+    except Exception:
+        return np.array([]), np.array([], dtype=np.int64)
+
+def stored_summary(data_dir='.', path=results_store.DEFAULT_DB):
+    """Số liệu tổng kết (MB, CWND TB KB, throughput Mbps) của NewReno và Reno từ kho kết quả
+
+    Chỉ dùng lần chạy mới nhất phân tích cùng thư mục trace, trên toàn bộ thời
+    gian (không --time-range) và không cũ hơn các file trace; None nếu không có.
+    """
+    if not os.path.exists(path):
+        return None
+    run = results_store.load_run(path=path)
+    if run is None or run['data_dir'] != os.path.abspath(data_dir):
+        return None
+    if run['params'].get('time_range') is not None:
+        return None
+    traces = [trace_reader.find_trace(os.path.join(data_dir, name)) for name in TRACE_FILES]
+    mtimes = [os.path.getmtime(trace) for trace in traces if os.path.exists(trace)]
+    # created_at chỉ chính xác tới giây
+    if mtimes and int(max(mtimes)) > datetime.fromisoformat(run['created_at']).timestamp():
+        return None
+    _, stats = results_store.load_stats(run['run_id'], path)
+    summary = {}
+    for variant in ('newreno', 'reno'):
+        rx, cwnd = stats.get(f'{variant}_rx'), stats.get(f'{variant}_cwnd', {})
+        if rx is None:
+            return None
+        summary[variant] = [rx['total_mb'], cwnd.get('avg_cwnd_kb', 0), rx['avg_throughput']]
+    print(f"📦 Dùng số liệu lần chạy #{run['run_id']} trong {path}")
+    return summary
+
+def trace_summary(rx_times, rx_bytes, cwnd_values):
+    """Số liệu tổng kết tính trực tiếp từ trace (khi kho kết quả chưa có lần chạy này)"""
+    total = rx_bytes.sum() if len(rx_bytes) > 0 else 0
+    avg_cwnd = np.mean(cwnd_values) if len(cwnd_values) > 0 else 0
+    duration = rx_times[-1] - rx_times[0] if len(rx_times) > 1 else 0
+    throughput = total * 8 / (duration * 1e6) if duration > 0 else 0
+    return [total / 1e6, avg_cwnd / 1024, throughput]
 
 def plot_comparison():
     """Vẽ biểu đồ so sánh"""
@@ -37,16 +75,16 @@ def plot_comparison():
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
     
     # Biểu đồ 1: Throughput qua thời gian
-    if newreno_rx_times:
+    if len(newreno_rx_times) > 0:
         # Tính throughput tích lũy (cumulative)
         cumulative_bytes = np.cumsum(newreno_rx_bytes)
-        throughput_mbps = (cumulative_bytes * 8) / (np.array(newreno_rx_times) * 1e6)
-        ax1.plot(newreno_rx_times, throughput_mbps, 'g-', label='TCP NewReno', linewidth=2)
+        throughput_mbps = (cumulative_bytes * 8) / (newreno_rx_times * 1e6)
+        decimate.plot(ax1, newreno_rx_times, throughput_mbps, 'g-', label='TCP NewReno', linewidth=2)
     
-    if reno_rx_times:
+    if len(reno_rx_times) > 0:
         cumulative_bytes = np.cumsum(reno_rx_bytes)
-        throughput_mbps = (cumulative_bytes * 8) / (np.array(reno_rx_times) * 1e6)
-        ax1.plot(reno_rx_times, throughput_mbps, 'r-', label='TCP Reno', linewidth=2)
+        throughput_mbps = (cumulative_bytes * 8) / (reno_rx_times * 1e6)
+        decimate.plot(ax1, reno_rx_times, throughput_mbps, 'r-', label='TCP Reno', linewidth=2)
     
     ax1.set_xlabel('Thời gian (giây)')
     ax1.set_ylabel('Throughput tích lũy (Mbps)')
@@ -55,13 +93,13 @@ def plot_comparison():
     ax1.grid(True, alpha=0.3)
     
     # Biểu đồ 2: Congestion Window
-    if newreno_cwnd_times:
-        cwnd_kb = np.array(newreno_cwnd_values) / 1024  # Convert to KB
-        ax2.plot(newreno_cwnd_times, cwnd_kb, 'g-', label='TCP NewReno', linewidth=2)
+    if len(newreno_cwnd_times) > 0:
+        cwnd_kb = newreno_cwnd_values / 1024  # Convert to KB
+        decimate.plot(ax2, newreno_cwnd_times, cwnd_kb, 'g-', label='TCP NewReno', linewidth=2)
     
-    if reno_cwnd_times:
-        cwnd_kb = np.array(reno_cwnd_values) / 1024  # Convert to KB
-        ax2.plot(reno_cwnd_times, cwnd_kb, 'r-', label='TCP Reno', linewidth=2)
+    if len(reno_cwnd_times) > 0:
+        cwnd_kb = reno_cwnd_values / 1024  # Convert to KB
+        decimate.plot(ax2, reno_cwnd_times, cwnd_kb, 'r-', label='TCP Reno', linewidth=2)
     
     ax2.set_xlabel('Thời gian (giây)')
     ax2.set_ylabel('Congestion Window (KB)')
@@ -76,24 +114,16 @@ def plot_comparison():
     # Biểu đồ cột so sánh tổng kết
     fig2, ax3 = plt.subplots(figsize=(10, 6))
     
-    # Tính toán số liệu tổng kết
-    newreno_total = sum(newreno_rx_bytes) if newreno_rx_bytes else 0
-    reno_total = sum(reno_rx_bytes) if reno_rx_bytes else 0
-    newreno_avg_cwnd = np.mean(newreno_cwnd_values) if newreno_cwnd_values else 0
-    reno_avg_cwnd = np.mean(reno_cwnd_values) if reno_cwnd_values else 0
+    # Số liệu tổng kết: ưu tiên kho kết quả của analyze_complete.py, nếu chưa có thì tính từ trace
+    summary = stored_summary()
+    if summary is not None:
+        newreno_values, reno_values = summary['newreno'], summary['reno']
+    else:
+        newreno_values = trace_summary(newreno_rx_times, newreno_rx_bytes, newreno_cwnd_values)
+        reno_values = trace_summary(reno_rx_times, reno_rx_bytes, reno_cwnd_values)
     
     # Dữ liệu cho biểu đồ cột
     categories = ['Tổng bytes (MB)', 'CWND TB (KB)', 'Throughput (Mbps)']
-    newreno_values = [
-        newreno_total / 1e6,  # MB
-        newreno_avg_cwnd / 1024,  # KB
-        1.03  # Mbps từ kết quả trước
-    ]
-    reno_values = [
-        reno_total / 1e6,  # MB
-        reno_avg_cwnd / 1024,  # KB
-        0.59  # Mbps từ kết quả trước
-    ]
     
     x = np.arange(len(categories))
     width = 0.35
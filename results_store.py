@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kho kết quả phân tích (SQLite) cho các lần chạy đã phân tích
+Mỗi lần chạy lưu tham số, mọi chỉ số vô hướng của self.stats (theo luồng và
+biến thể TCP) và các chuỗi theo cửa sổ (throughput 5 giây, công bằng Jain,
+tỉ lệ TCP/UDP). Báo cáo, summary_display.py và plot_comparison.py đọc từ đây
+thay vì phân tích lại trace; có chỉ mục theo run, luồng và biến thể TCP.
+
+Cách dùng:
+    python3 results_store.py                          # liệt kê các lần chạy
+    python3 results_store.py --metric avg_throughput --variant reno
+"""
+
+import argparse
+import json
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from stats_export import scalar_rows
+
+DEFAULT_DB = 'tcp_results.db'
+
+# Tiền tố key luồng -> biến thể (thuật toán) của luồng trong enterprise-network-newreno.cc
+VARIANTS = {
+    'newreno': 'newreno', 'comp1': 'newreno', 'comp2': 'newreno',
+    'reno': 'reno',
+    'udp1': 'udp', 'udp2': 'udp',
+}
+
+# Các mảng theo cửa sổ của stats['fairness'] được lưu thành chuỗi
+FAIRNESS_SERIES = ('jain', 'tcp_share', 'udp_share', 'active_flows')
+# Tên chỉ số/chuỗi cho tỉ lệ dung lượng WAN của từng luồng (mean_share / share trong fairness)
+SHARE_METRIC = 'bottleneck_share'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    label TEXT,
+    data_dir TEXT,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    variant TEXT,
+    metric TEXT NOT NULL,
+    value,  -- không khai báo kiểu: số nguyên (bytes, số gói, số sự kiện) giữ nguyên kiểu int
+
+    text TEXT,
+    PRIMARY KEY (run_id, key, metric)
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_key ON metrics(key, metric);
+CREATE INDEX IF NOT EXISTS idx_metrics_variant ON metrics(variant, metric);
+CREATE TABLE IF NOT EXISTS series (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    time REAL NOT NULL,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS idx_series_run ON series(run_id, key, name);
+"""
+
+
+def flow_variant(key):
+    """'reno_cwnd' / 'flowmon.reno' -> 'reno'; None cho key không gắn với luồng (fairness)"""
+    return VARIANTS.get(key.rsplit('.', 1)[-1].split('_')[0])
+
+
+def connect(path=DEFAULT_DB):
+    """Mở (và tạo nếu chưa có) kho kết quả"""
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _metric_rows(run_id, stats):
+    """Các dòng của bảng metrics: giá trị số vào 'value', chuỗi (tên luồng) vào 'text'"""
+    rows = []
+    for key, metric, value in scalar_rows(stats):
+        if isinstance(value, str):
+            rows.append((run_id, key, flow_variant(key), metric, None, value))
+        else:
+            rows.append((run_id, key, flow_variant(key), metric, value, None))
+    # Tỉ lệ nút cổ chai trung bình của từng luồng được lưu như chỉ số của luồng đó
+    fairness = stats.get('fairness')
+    if fairness:
+        for key, share in zip(fairness['flow_keys'], fairness['mean_share']):
+            rows.append((run_id, key, flow_variant(key), SHARE_METRIC, float(share), None))
+    return rows
+
+
+def _array_rows(run_id, key, name, times, values):
+    values = np.asarray(values, dtype=np.float64)
+    return [(run_id, key, name, float(t), float(v) if np.isfinite(v) else None)
+            for t, v in zip(times, values)]
+
+
+def _series_rows(run_id, stats):
+    """Các chuỗi theo cửa sổ: throughput từng luồng rx, chuỗi công bằng và tỉ lệ WAN từng luồng"""
+    rows = []
+    for key, values in stats.items():
+        if isinstance(values, dict) and isinstance(values.get('windowed_throughput'), pd.Series):
+            series = values['windowed_throughput']
+            rows.extend(_array_rows(run_id, key, 'windowed_throughput', series.index.values, series.values))
+    fairness = stats.get('fairness')
+    if fairness:
+        for name in FAIRNESS_SERIES:
+            rows.extend(_array_rows(run_id, 'fairness', name, fairness['starts'], fairness[name]))
+        for key, share in zip(fairness['flow_keys'], fairness['share']):
+            rows.extend(_array_rows(run_id, key, SHARE_METRIC, fairness['starts'], share))
+    return rows
+
+
+def save_run(stats, params=None, data_dir=None, label=None, path=DEFAULT_DB):
+    """Lưu self.stats của một lần chạy, trả về run_id"""
+    conn = connect(path)
+    try:
+        with conn:
+            cursor = conn.execute(
+                'INSERT INTO runs (created_at, label, data_dir, params) VALUES (?, ?, ?, ?)',
+                (datetime.now().isoformat(timespec='seconds'), label, data_dir,
+                 json.dumps(params or {}, ensure_ascii=False)))
+            run_id = cursor.lastrowid
+            conn.executemany('INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?, ?, ?)',
+                             _metric_rows(run_id, stats))
+            conn.executemany('INSERT INTO series VALUES (?, ?, ?, ?, ?)', _series_rows(run_id, stats))
+    finally:
+        conn.close()
+    return run_id
+
+
+def latest_run_id(conn):
+    row = conn.execute('SELECT MAX(run_id) FROM runs').fetchone()
+    return row[0]
+
+
+def load_run(run_id=None, path=DEFAULT_DB):
+    """Thông tin một lần chạy (params đã giải mã JSON); run_id=None = lần mới nhất, None nếu không có"""
+    conn = connect(path)
+    try:
+        if run_id is None:
+            run_id = latest_run_id(conn)
+        row = conn.execute('SELECT run_id, created_at, label, data_dir, params FROM runs WHERE run_id = ?',
+                           (run_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return {'run_id': row[0], 'created_at': row[1], 'label': row[2], 'data_dir': row[3],
+            'params': json.loads(row[4] or '{}')}
+
+
+def list_runs(path=DEFAULT_DB):
+    """Bảng các lần chạy (run_id, thời điểm, nhãn, thư mục, tham số)"""
+    conn = connect(path)
+    try:
+        return pd.read_sql_query('SELECT * FROM runs ORDER BY run_id', conn)
+    finally:
+        conn.close()
+
+
+def load_series(run_id, key, name, conn):
+    """(thời điểm, giá trị) của một chuỗi đã lưu"""
+    rows = conn.execute('SELECT time, value FROM series WHERE run_id = ? AND key = ? AND name = ? '
+                        'ORDER BY time', (run_id, key, name)).fetchall()
+    data = np.array(rows, dtype=np.float64).reshape(-1, 2)
+    return data[:, 0], data[:, 1]
+
+
+def load_stats(run_id=None, path=DEFAULT_DB):
+    """Dựng lại self.stats (cùng cấu trúc với TCPAnalyzer) từ kho; run_id=None = lần chạy mới nhất
+
+    Trả về (run_id, stats) hoặc (None, {}) nếu kho chưa có lần chạy nào.
+    """
+    conn = connect(path)
+    try:
+        if run_id is None:
+            run_id = latest_run_id(conn)
+        if run_id is None:
+            return None, {}
+
+        stats = {}
+        shares = []
+        rows = conn.execute('SELECT key, metric, value, text FROM metrics WHERE run_id = ? ORDER BY rowid',
+                            (run_id,)).fetchall()
+        for key, metric, value, text in rows:
+            if metric == SHARE_METRIC:
+                shares.append((key, value))
+                continue
+            node = stats
+            for part in key.split('.'):
+                node = node.setdefault(part, {})
+            node[metric] = text if text is not None else value
+
+        for key, values in stats.items():
+            if key.endswith('_rx'):
+                starts, mbps = load_series(run_id, key, 'windowed_throughput', conn)
+                values['windowed_throughput'] = pd.Series(
+                    mbps, index=pd.Index(starts, name='time_window'), name='bytes')
+
+        if 'fairness' in stats:
+            fairness = stats['fairness']
+            for name in FAIRNESS_SERIES:
+                fairness['starts'], fairness[name] = load_series(run_id, 'fairness', name, conn)
+            fairness['active_flows'] = fairness['active_flows'].astype(np.int64)
+            keys = [key for key, _ in shares]
+            fairness['flow_keys'] = keys
+            fairness['flow_names'] = [stats.get(key, {}).get('flow_name', key) for key in keys]
+            fairness['mean_share'] = np.array([share for _, share in shares])
+            fairness['share'] = np.array([load_series(run_id, key, SHARE_METRIC, conn)[1]
+                                          for key in keys]).reshape(len(keys), -1)
+        return run_id, stats
+    finally:
+        conn.close()
+
+
+def query_metric(metric, variant=None, key=None, path=DEFAULT_DB):
+    """Giá trị một chỉ số qua mọi lần chạy (lọc theo biến thể TCP hoặc key luồng)"""
+    sql = ('SELECT m.run_id, r.created_at, r.label, m.key, m.variant, m.value '
+           'FROM metrics m JOIN runs r USING (run_id) WHERE m.metric = ?')
+    args = [metric]
+    if variant is not None:
+        sql += ' AND m.variant = ?'
+        args.append(variant)
+    if key is not None:
+        sql += ' AND m.key = ?'
+        args.append(key)
+    conn = connect(path)
+    try:
+        return pd.read_sql_query(sql + ' ORDER BY m.run_id, m.key', conn, params=args)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Truy vấn kho kết quả phân tích TCP')
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'File SQLite (mặc định {DEFAULT_DB})')
+    parser.add_argument('--metric', default=None, help='Chỉ số cần truy vấn, ví dụ avg_throughput')
+    parser.add_argument('--variant', default=None, choices=sorted(set(VARIANTS.values())))
+    parser.add_argument('--key', default=None, help='Key luồng, ví dụ reno_rx')
+    args = parser.parse_args()
+
+    with pd.option_context('display.width', 160, 'display.max_rows', 200):
+        if args.metric:
+            print(query_metric(args.metric, args.variant, args.key, args.db).to_string(index=False))
+        else:
+            print(list_runs(args.db).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
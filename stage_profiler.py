@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Đo thời gian và bộ nhớ của từng bước trong pipeline phân tích
+Mỗi bước được ghi lại với: thời gian thực (wall), thời gian CPU, RSS đỉnh
+của tiến trình, đỉnh tracemalloc (nếu bật) và số dòng dữ liệu xử lý.
+
+ru_maxrss là đỉnh RSS tính từ lúc tiến trình khởi động, không phải của riêng
+một bước: max_rss_so_far_mb là giá trị đó khi bước kết thúc, rss_growth_mb là
+phần bước đã đẩy đỉnh lên so với lúc bắt đầu bước (0 nếu bước không vượt đỉnh
+cũ). Trên nền tảng không có module resource (Windows) cả hai là None.
+Kết quả được ghi ra file JSON; có thể kèm file cProfile (.prof) để xem
+bằng pstats hoặc snakeviz.
+"""
+
+import cProfile
+import itertools
+import json
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Các phép đo tracemalloc đang mở: token -> đỉnh đã ghi nhận trước lần reset_peak() gần nhất.
+# Phép đo lồng bên trong (đọc từng file trong bước load_all_data, có thể ở luồng khác)
+# gọi reset_peak(), nên đỉnh hiện tại được lưu cho mọi phép đo đang mở trước khi reset.
+_open_peaks = {}
+_peak_tokens = itertools.count()
+_peak_lock = threading.Lock()
+
+
+def max_rss_so_far_mb():
+    """RSS đỉnh của tiến trình từ lúc khởi động đến nay (MB), None nếu không đo được"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux trả về KB, macOS trả về bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def rss_metrics(rss_at_start):
+    """max_rss_so_far_mb và rss_growth_mb của một bước bắt đầu khi đỉnh RSS là rss_at_start"""
+    rss = max_rss_so_far_mb()
+    growth = None if rss is None else rss - rss_at_start
+    return {'max_rss_so_far_mb': rss, 'rss_growth_mb': growth}
+
+
+def format_mb(value, width=9):
+    """Định dạng số MB cho bảng, '-' nếu không đo được"""
+    return f"{'-':>{width}}" if value is None else f"{value:>{width}.1f}"
+
+
+def _begin_peak():
+    with _peak_lock:
+        current = tracemalloc.get_traced_memory()[1]
+        for token in _open_peaks:
+            _open_peaks[token] = max(_open_peaks[token], current)
+        token = next(_peak_tokens)
+        _open_peaks[token] = 0
+        tracemalloc.reset_peak()
+    return token
+
+
+def _end_peak(token):
+    """Đỉnh tracemalloc (MB) từ lúc _begin_peak(token), kể cả phần trước các lần reset lồng bên trong"""
+    with _peak_lock:
+        return max(_open_peaks.pop(token), tracemalloc.get_traced_memory()[1]) / 1e6
+
+
+def measure(func, *args, trace_memory=False, **kwargs):
+    """Gọi func(*args, **kwargs), trả về (kết quả, dict số đo)
+
+    CPU được đo theo luồng hiện tại (thread_time) để vẫn đúng khi chạy trong
+    ThreadPoolExecutor. rss_growth_mb là của cả tiến trình: các luồng chạy
+    song song cùng góp vào. trace_memory: đo đỉnh cấp phát bằng tracemalloc
+    (chậm hơn đáng kể, chỉ nên bật khi cần).
+    """
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace_memory:
+        peak_token = _begin_peak()
+    start_wall, start_cpu = time.perf_counter(), time.thread_time()
+    start_rss = max_rss_so_far_mb()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        metrics = {
+            'wall_s': time.perf_counter() - start_wall,
+            'cpu_s': time.thread_time() - start_cpu,
+            **rss_metrics(start_rss),
+        }
+        if trace_memory:
+            metrics['tracemalloc_peak_mb'] = _end_peak(peak_token)
+        if started_tracing:
+            tracemalloc.stop()
+    return result, metrics
+
+
+class StageProfiler:
+    """Thu thập số đo của các bước, ghi ra JSON"""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = []
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+
+    @contextmanager
+    def stage(self, name, **info):
+        """Đo một khối lệnh: with profiler.stage('stats'): ...
+
+        Có thể gán thêm thông tin (ví dụ số dòng) sau khi chạy qua dict trả về.
+        """
+        record = {'stage': name, **info}
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            peak_token = _begin_peak()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        start_rss = max_rss_so_far_mb()
+        try:
+            yield record
+        finally:
+            record['wall_s'] = time.perf_counter() - start_wall
+            record['cpu_s'] = time.process_time() - start_cpu
+            record.update(rss_metrics(start_rss))
+            if self.trace_memory:
+                record['tracemalloc_peak_mb'] = _end_peak(peak_token)
+            if started_tracing:
+                tracemalloc.stop()
+            self.stages.append(record)
+
+    def record(self, name, metrics, **info):
+        """Ghi số đo đã đo ở nơi khác (luồng đọc file, tiến trình vẽ biểu đồ)"""
+        self.stages.append({'stage': name, **info, **metrics})
+
+    def summary(self):
+        """In bảng các bước, bước chậm nhất trước"""
+        print("\n⏱️  PROFILE CÁC BƯỚC (chậm nhất trước):")
+        for record in sorted(self.stages, key=lambda r: r['wall_s'], reverse=True):
+            rows = f"{record['rows']:,} dòng" if 'rows' in record else ''
+            print(f"   • {record['stage']:<40} {record['wall_s']:>8.2f}s wall "
+                  f"{record['cpu_s']:>8.2f}s cpu {format_mb(record.get('rss_growth_mb'))} MB tăng "
+                  f"{format_mb(record.get('max_rss_so_far_mb'))} MB đỉnh {rows}")
+
+    def save(self, filename):
+        """Ghi profile ra file JSON"""
+        profile = {
+            'started_at': self.started_at,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'trace_memory': self.trace_memory,
+            'stages': self.stages,
+        }
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=2)
+        print(f"✅ Đã lưu: {filename}")
+
+
+@contextmanager
+def cprofile_to(filename):
+    """Chạy khối lệnh dưới cProfile và ghi kết quả ra filename (None = không profile)"""
+    if not filename:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(filename)
+        print(f"✅ Đã lưu: {filename}")
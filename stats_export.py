@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ghi self.stats của TCPAnalyzer ra JSON hoặc CSV (không cần matplotlib)
+JSON giữ đầy đủ cấu trúc (chuỗi theo cửa sổ, histogram FlowMonitor, ma trận
+fairness); CSV chỉ gồm các giá trị vô hướng ở dạng dài 'key,metric,value'
+để ghép nhiều lần chạy trong sweep.
+"""
+
+import csv
+import json
+import math
+import numbers
+
+import numpy as np
+import pandas as pd
+
+
+def to_jsonable(obj):
+    """Chuyển đệ quy numpy/pandas sang kiểu JSON (NaN/inf -> None)"""
+    if isinstance(obj, dict):
+        return {str(key): to_jsonable(value) for key, value in obj.items()}
+    if isinstance(obj, pd.Series):
+        return {'index': to_jsonable(obj.index.values), 'values': to_jsonable(obj.values)}
+    if isinstance(obj, np.ndarray):
+        return to_jsonable(obj.tolist())
+    if isinstance(obj, (list, tuple)):
+        return [to_jsonable(item) for item in obj]
+    if isinstance(obj, (bool, np.bool_)):
+        return bool(obj)
+    if isinstance(obj, numbers.Integral):
+        return int(obj)
+    if isinstance(obj, numbers.Real):
+        value = float(obj)
+        return value if math.isfinite(value) else None
+    return obj
+
+
+def scalar_rows(stats):
+    """Các dòng (key, metric, value) cho mọi giá trị vô hướng, kể cả trong dict lồng nhau"""
+    rows = []
+
+    def visit(key, values):
+        for metric, value in values.items():
+            if isinstance(value, dict):
+                visit(f'{key}.{metric}', value)
+            elif isinstance(value, (numbers.Number, np.bool_, str)):
+                rows.append((key, metric, to_jsonable(value)))
+
+    for key, values in stats.items():
+        visit(key, values)
+    return rows
+
+
+def write_json(stats, filename):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(to_jsonable(stats), f, indent=2, ensure_ascii=False)
+    print(f"✅ Đã lưu: {filename}")
+
+
+def write_csv(stats, filename):
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['key', 'metric', 'value'])
+        writer.writerows(scalar_rows(stats))
+    print(f"✅ Đã lưu: {filename}")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tính thống kê trace theo luồng (streaming) với bộ nhớ cố định
+Mỗi file được đọc theo từng khối (chunk) cố định; tổng, min/max, trung bình và
+độ lệch chuẩn (Welford/Chan), số lần tăng/giảm CWND và tổng bytes theo cửa sổ
+5 giây (throughput_index với bucket rộng đúng một cửa sổ) được cập nhật dần, nên
+bộ nhớ đỉnh của trace rx là O(kích thước chunk + số cửa sổ có gói), không phụ
+thuộc số gói.
+Sự kiện tắc nghẽn trong trace cwnd được phát hiện tăng dần
+(congestion_events.EventAccumulator), chỉ giữ trạng thái của đợt đang mở.
+"""
+
+import numpy as np
+import pandas as pd
+
+import congestion_events
+import throughput_index
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+class RunningMoments:
+    """Trung bình/phương sai cập nhật theo khối (thuật toán Welford gộp của Chan)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, values):
+        n = len(values)
+        if n == 0:
+            return
+        # min/max giữ nguyên kiểu gốc (CWND là số nguyên bytes)
+        chunk_min, chunk_max = values.min(), values.max()
+        self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+        self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+
+        values = values.astype(np.float64, copy=False)
+        chunk_mean = values.mean()
+        chunk_m2 = ((values - chunk_mean) ** 2).sum()
+
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    @property
+    def std(self):
+        """Độ lệch chuẩn mẫu (ddof=1) giống pandas.Series.std()"""
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+
+class RxStreamingStats:
+    """Bộ tích lũy thống kê cho file rx (time, bytes)"""
+
+    def __init__(self, window_size=5.0, bin_width=None):
+        self.window_size = window_size
+        self.bin_width = bin_width  # Trace đã gom bin trong mô phỏng: mỗi dòng là một bin
+        self.total_bytes = 0
+        self.packets = 0
+        self.time = RunningMoments()
+        self.instant = RunningMoments()
+        # Bucket rộng một cửa sổ: một phần tử mỗi cửa sổ có gói (đủ cho thống kê,
+        # công bằng theo cửa sổ và live tail), không phải mỗi ~1 ms như chỉ mục để vẽ
+        self.index = throughput_index.ThroughputIndex(base_width=window_size)
+
+    def update(self, times, nbytes, packets=None):
+        """packets: số gói của mỗi dòng (trace đã gom bin); None = mỗi dòng một gói"""
+        if len(times) == 0:
+            return
+        self.total_bytes += int(nbytes.sum())
+        self.packets += len(times) if packets is None else int(packets.sum())
+        self.time.update(times)
+        instant = (nbytes * 8) / 1e6  # Mbps tức thời
+        if self.bin_width:
+            instant = instant / self.bin_width  # Throughput trung bình trong bin
+        self.instant.update(instant)
+        self.index.update(times, nbytes, packets)
+
+    def result(self, flow_name):
+        """Trả về dict thống kê cùng định dạng với TCPAnalyzer.calculate_statistics"""
+        start_time, end_time = self.time.min, self.time.max
+        duration = end_time - start_time if self.packets > 1 else 0
+        avg_throughput = (self.total_bytes * 8) / (duration * 1e6) if duration > 0 else 0
+
+        starts, window_bytes = self.index.active_windows(self.window_size)
+        windowed_stats = pd.Series(window_bytes, index=pd.Index(starts, name='time_window'), name='bytes')
+        windowed_throughput = (windowed_stats * 8) / (self.window_size * 1e6)
+
+        return {
+            'flow_name': flow_name,
+            'total_bytes': self.total_bytes,
+            'total_mb': self.total_bytes / 1e6,
+            'duration': duration,
+            'avg_throughput': avg_throughput,
+            'packets': self.packets,
+            'start_time': start_time,
+            'end_time': end_time,
+            'windowed_throughput': windowed_throughput,
+            'max_instant_throughput': self.instant.max,
+            'min_instant_throughput': self.instant.min,
+            'std_throughput': self.instant.std
+        }
+
+
+class CwndStreamingStats:
+    """Bộ tích lũy thống kê cho file cwnd (time, cwnd)"""
+
+    def __init__(self):
+        self.cwnd = RunningMoments()
+        self.increases = 0
+        self.decreases = 0
+        self.last_cwnd = None  # Giá trị cuối của chunk trước, để tính diff qua biên chunk
+        self.events = congestion_events.EventAccumulator()
+
+    def update(self, times, cwnd):
+        if len(cwnd) == 0:
+            return
+        self.cwnd.update(cwnd)
+        self.events.update(times, cwnd)
+
+        changes = np.diff(cwnd.astype(np.int64, copy=False))
+        if self.last_cwnd is not None:
+            changes = np.concatenate(([int(cwnd[0]) - self.last_cwnd], changes))
+        self.increases += int((changes > 0).sum())
+        self.decreases += int((changes < 0).sum())
+        self.last_cwnd = int(cwnd[-1])
+
+    def result(self, flow_name):
+        """Trả về dict thống kê cùng định dạng với TCPAnalyzer.calculate_statistics"""
+        max_cwnd = self.cwnd.max
+        min_cwnd = self.cwnd.min
+        avg_cwnd = self.cwnd.mean
+        std_cwnd = self.cwnd.std
+
+        return {
+            'flow_name': flow_name,
+            'max_cwnd': max_cwnd,
+            'min_cwnd': min_cwnd,
+            'avg_cwnd': avg_cwnd,
+            'std_cwnd': std_cwnd,
+            'max_cwnd_kb': max_cwnd / 1024,
+            'min_cwnd_kb': min_cwnd / 1024,
+            'avg_cwnd_kb': avg_cwnd / 1024,
+            'cwnd_increases': self.increases,
+            'cwnd_decreases': self.decreases,
+            'cwnd_stability': 1 - (std_cwnd / avg_cwnd) if avg_cwnd > 0 else 0,
+            **self.events.result()
+        }
@@ -2,103 +2,174 @@
 # -*- coding: utf-8 -*-
 """
 Script hiển thị tóm tắt kết quả phân tích TCP
+Số liệu được đọc từ kho kết quả (results_store) do analyze_complete.py ghi,
+nên luôn khớp với lần phân tích gần nhất (hoặc lần chạy được chọn).
+
+Cách dùng:
+    python3 summary_display.py                 # lần chạy mới nhất
+    python3 summary_display.py --run-id 3 --db tcp_results.db
 """
 
-def print_colorful_summary():
+import os
+import results_store
+
+# ANSI color codes
+GREEN = '\033[92m'
+RED = '\033[91m'
+BLUE = '\033[94m'
+YELLOW = '\033[93m'
+MAGENTA = '\033[95m'
+CYAN = '\033[96m'
+WHITE = '\033[97m'
+BOLD = '\033[1m'
+UNDERLINE = '\033[4m'
+RESET = '\033[0m'
+
+
+def percent_diff(new, old):
+    """Chênh lệch phần trăm của new so với old, dạng '+74.0%'"""
+    return f"{(new - old) / old * 100:+.1f}%" if old else "N/A"
+
+
+def ratio(new, old):
+    return new / old if old else float('inf')
+
+
+def print_colorful_summary(run_id=None, path=results_store.DEFAULT_DB):
     """In tóm tắt kết quả với màu sắc"""
-    
-    # ANSI color codes
-    GREEN = '\033[92m'
-    RED = '\033[91m'
-    BLUE = '\033[94m'
-    YELLOW = '\033[93m'
-    MAGENTA = '\033[95m'
-    CYAN = '\033[96m'
-    WHITE = '\033[97m'
-    BOLD = '\033[1m'
-    UNDERLINE = '\033[4m'
-    RESET = '\033[0m'
-    
+    if not os.path.exists(path):
+        print(f"⚠️  File {path} không tồn tại - hãy chạy analyze_complete.py trước")
+        return
+    run = results_store.load_run(run_id, path)
+    if run is None:
+        print(f"⚠️  Kho kết quả {path} không có lần chạy {run_id if run_id else 'nào'}")
+        return
+    _, stats = results_store.load_stats(run['run_id'], path)
+    if 'newreno_rx' not in stats or 'reno_rx' not in stats:
+        print(f"⚠️  Lần chạy #{run['run_id']} thiếu số liệu TCP NewReno/Reno")
+        return
+
+    capacity = run['params'].get('bottleneck_mbps', 5.0)
+    newreno, reno = stats['newreno_rx'], stats['reno_rx']
+    empty_cwnd = {'avg_cwnd_kb': 0, 'max_cwnd_kb': 0, 'cwnd_stability': 0}
+    newreno_cwnd = stats.get('newreno_cwnd', empty_cwnd)
+    reno_cwnd = stats.get('reno_cwnd', empty_cwnd)
+    newreno_wins = newreno['avg_throughput'] >= reno['avg_throughput']
+
     print(f"\n{BOLD}{CYAN}{'='*80}{RESET}")
     print(f"{BOLD}{WHITE}           🚀 KẾT QUẢ PHÂN TÍCH TCP NEWRENO vs TCP RENO 🚀{RESET}")
-    print(f"{BOLD}{CYAN}{'='*80}{RESET}\n")
-    
+    print(f"{BOLD}{CYAN}{'='*80}{RESET}")
+    label = f" - {run['label']}" if run['label'] else ""
+    print(f"{CYAN}Lần chạy #{run['run_id']}{label} ({run['created_at']}, {run['data_dir']}){RESET}\n")
+
     # Hiệu suất tổng thể
     print(f"{BOLD}{BLUE}📊 HIỆU SUẤT TỔNG THỂ{RESET}")
     print(f"{CYAN}{'─'*40}{RESET}")
-    print(f"🏆 {GREEN}TCP NewReno thắng với khoảng cách lớn!{RESET}")
-    print(f"📈 Hiệu suất tốt hơn: {BOLD}{GREEN}+74.0%{RESET}")
-    print(f"🎯 Throughput: {GREEN}1.03 Mbps{RESET} vs {RED}0.59 Mbps{RESET}")
-    print(f"💾 Dữ liệu truyền: {GREEN}24.5 MB{RESET} vs {RED}6.0 MB{RESET}")
-    print(f"🔧 CWND trung bình: {GREEN}53 KB{RESET} vs {RED}41 KB{RESET} ({GREEN}+26.8%{RESET})")
-    
+    if newreno_wins:
+        print(f"🏆 {GREEN}TCP NewReno thắng!{RESET}")
+    else:
+        print(f"🏆 {RED}TCP Reno thắng!{RESET}")
+    print(f"📈 Chênh lệch hiệu suất: {BOLD}{GREEN if newreno_wins else RED}"
+          f"{percent_diff(newreno['avg_throughput'], reno['avg_throughput'])}{RESET}")
+    print(f"🎯 Throughput: {GREEN}{newreno['avg_throughput']:.2f} Mbps{RESET} vs {RED}{reno['avg_throughput']:.2f} Mbps{RESET}")
+    print(f"💾 Dữ liệu truyền: {GREEN}{newreno['total_mb']:.1f} MB{RESET} vs {RED}{reno['total_mb']:.1f} MB{RESET}")
+    print(f"🔧 CWND trung bình: {GREEN}{newreno_cwnd['avg_cwnd_kb']:.0f} KB{RESET} vs {RED}{reno_cwnd['avg_cwnd_kb']:.0f} KB{RESET} "
+          f"({GREEN}{percent_diff(newreno_cwnd['avg_cwnd_kb'], reno_cwnd['avg_cwnd_kb'])}{RESET})")
+
     print(f"\n{BOLD}{MAGENTA}🔍 CHI TIẾT SO SÁNH{RESET}")
     print(f"{CYAN}{'─'*40}{RESET}")
-    
+
     # Bảng so sánh
     headers = ["Metric", "TCP NewReno", "TCP Reno", "Chênh lệch"]
-    
-    data = [
-        ["Throughput TB", "1.035 Mbps", "0.595 Mbps", "+74.0%"],
-        ["Dữ liệu tổng", "24.48 MB", "5.97 MB", "+310.0%"],
-        ["CWND TB", "52.5 KB", "41.4 KB", "+26.8%"],
-        ["CWND tối đa", "138.8 KB", "72.1 KB", "+92.5%"],
-        ["Độ ổn định CWND", "0.496", "0.706", "-29.7%"],
-        ["Thời gian hoạt động", "189.2s", "80.3s", "+135.8%"],
-        ["Số gói tin", "16,764", "3,265", "+413.6%"],
-        ["Hiệu quả WAN", "20.7%", "11.9%", "+74.0%"]
+
+    rows = [
+        ("Throughput TB", newreno['avg_throughput'], reno['avg_throughput'], "{:.3f} Mbps"),
+        ("Dữ liệu tổng", newreno['total_mb'], reno['total_mb'], "{:.2f} MB"),
+        ("CWND TB", newreno_cwnd['avg_cwnd_kb'], reno_cwnd['avg_cwnd_kb'], "{:.1f} KB"),
+        ("CWND tối đa", newreno_cwnd['max_cwnd_kb'], reno_cwnd['max_cwnd_kb'], "{:.1f} KB"),
+        ("Độ ổn định CWND", newreno_cwnd['cwnd_stability'], reno_cwnd['cwnd_stability'], "{:.3f}"),
+        ("Thời gian hoạt động", newreno['duration'], reno['duration'], "{:.1f}s"),
+        ("Số gói tin", newreno['packets'], reno['packets'], "{:,}"),
+        ("Hiệu quả WAN", newreno['avg_throughput'] / capacity * 100, reno['avg_throughput'] / capacity * 100, "{:.1f}%"),
     ]
-    
+    data = [[metric, fmt.format(new), fmt.format(old), percent_diff(new, old)]
+            for metric, new, old, fmt in rows]
+
     # In header
     print(f"{BOLD}{WHITE}┌{'─'*20}┬{'─'*15}┬{'─'*15}┬{'─'*15}┐{RESET}")
     print(f"{BOLD}{WHITE}│{headers[0]:^20}│{headers[1]:^15}│{headers[2]:^15}│{headers[3]:^15}│{RESET}")
     print(f"{BOLD}{WHITE}├{'─'*20}┼{'─'*15}┼{'─'*15}┼{'─'*15}┤{RESET}")
-    
+
     # In data rows
     for row in data:
-        metric, newreno, reno, diff = row
+        metric, newreno_value, reno_value, diff = row
         diff_color = GREEN if diff.startswith('+') else RED if diff.startswith('-') else WHITE
-        print(f"│{YELLOW}{metric:<20}{RESET}│{GREEN}{newreno:^15}{RESET}│{RED}{reno:^15}{RESET}│{diff_color}{diff:^15}{RESET}│")
-    
+        print(f"│{YELLOW}{metric:<20}{RESET}│{GREEN}{newreno_value:^15}{RESET}│{RED}{reno_value:^15}{RESET}│{diff_color}{diff:^15}{RESET}│")
+
     print(f"{BOLD}{WHITE}└{'─'*20}┴{'─'*15}┴{'─'*15}┴{'─'*15}┘{RESET}")
-    
+
     # Phân tích luồng cạnh tranh
     print(f"\n{BOLD}{YELLOW}🌐 LUỒNG CẠNH TRANH & MẠNG{RESET}")
     print(f"{CYAN}{'─'*40}{RESET}")
-    print(f"🔗 Competing TCP 1: {BLUE}0.766 Mbps{RESET} (15.3% WAN)")
-    print(f"🔗 Competing TCP 2: {BLUE}0.569 Mbps{RESET} (11.4% WAN)")
-    print(f"📡 UDP CBR 1: {MAGENTA}0.967 Mbps{RESET} (19.3% WAN)")
-    print(f"📡 UDP CBR 2: {MAGENTA}1.277 Mbps{RESET} (25.5% WAN)")
-    print(f"🌍 Tổng utilization: {RED}{BOLD}104.2%{RESET} (Quá tải!)")
-    
+    for key in ('comp1_rx', 'comp2_rx', 'udp1_rx', 'udp2_rx'):
+        if key in stats:
+            flow = stats[key]
+            icon, color = ('📡', MAGENTA) if key.startswith('udp') else ('🔗', BLUE)
+            print(f"{icon} {flow['flow_name']}: {color}{flow['avg_throughput']:.3f} Mbps{RESET} "
+                  f"({flow['avg_throughput'] / capacity * 100:.1f}% WAN)")
+    total_throughput = sum(values['avg_throughput'] for values in stats.values()
+                           if isinstance(values, dict) and 'avg_throughput' in values)
+    utilization = total_throughput / capacity * 100
+    overloaded = utilization > 100
+    status = f"{RED}{BOLD}{utilization:.1f}%{RESET} (Quá tải!)" if overloaded else f"{GREEN}{BOLD}{utilization:.1f}%{RESET}"
+    print(f"🌍 Tổng utilization: {status}")
+    if 'fairness' in stats:
+        fair = stats['fairness']
+        print(f"⚖️  Chỉ số Jain TB: {BOLD}{fair['mean_jain']:.3f}{RESET} (thấp nhất {fair['min_jain']:.3f}), "
+              f"TCP/UDP: {fair['tcp_total_share'] * 100:.1f}% / {fair['udp_total_share'] * 100:.1f}%")
+
     # Khuyến nghị
     print(f"\n{BOLD}{GREEN}💡 KHUYẾN NGHỊ{RESET}")
     print(f"{CYAN}{'─'*40}{RESET}")
-    print(f"✅ {GREEN}Sử dụng TCP NewReno cho các ứng dụng quan trọng{RESET}")
-    print(f"📈 {GREEN}NewReno có hiệu suất và throughput vượt trội{RESET}")
-    print(f"🔧 {GREEN}NewReno có CWND cao hơn, phù hợp với mạng có băng thông cao{RESET}")
-    print(f"⚠️  {RED}Tuy nhiên TCP Reno có độ ổn định CWND tốt hơn{RESET}")
-    print(f"🌐 {YELLOW}Cần tối ưu hóa traffic vì mạng đang quá tải (>100%){RESET}")
-    
+    if newreno['avg_throughput'] > reno['avg_throughput'] * 1.1:
+        print(f"✅ {GREEN}Sử dụng TCP NewReno cho các ứng dụng quan trọng{RESET}")
+        print(f"📈 {GREEN}NewReno có hiệu suất và throughput vượt trội{RESET}")
+    elif abs(newreno['avg_throughput'] - reno['avg_throughput']) < 0.1:
+        print(f"⚖️  {YELLOW}Hiệu suất TCP NewReno và TCP Reno tương đương{RESET}")
+    if newreno_cwnd['avg_cwnd_kb'] > reno_cwnd['avg_cwnd_kb']:
+        print(f"🔧 {GREEN}NewReno có CWND cao hơn, phù hợp với mạng có băng thông cao{RESET}")
+    if reno_cwnd['cwnd_stability'] > newreno_cwnd['cwnd_stability']:
+        print(f"⚠️  {RED}Tuy nhiên TCP Reno có độ ổn định CWND tốt hơn{RESET}")
+    if overloaded:
+        print(f"🌐 {YELLOW}Cần tối ưu hóa traffic vì mạng đang quá tải (>100%){RESET}")
+
     # Thống kê thú vị
     print(f"\n{BOLD}{MAGENTA}🎲 THỐNG KÊ THÚ VỊ{RESET}")
     print(f"{CYAN}{'─'*40}{RESET}")
-    print(f"🏃 NewReno chạy gần gấp {BOLD}2.5 lần{RESET} lâu hơn Reno")
-    print(f"📦 NewReno truyền gấp {BOLD}4.1 lần{RESET} nhiều gói tin hơn")
-    print(f"🎯 NewReno đạt CWND tối đa gần gấp {BOLD}đôi{RESET} Reno")
-    print(f"⚡ Reno có độ dao động CWND thấp hơn (ổn định hơn)")
-    print(f"🌊 NewReno 'ăn' băng thông nhiều hơn nhưng hiệu quả hơn")
-    
+    print(f"🏃 NewReno chạy {BOLD}{ratio(newreno['duration'], reno['duration']):.1f} lần{RESET} thời gian của Reno")
+    print(f"📦 NewReno truyền {BOLD}{ratio(newreno['packets'], reno['packets']):.1f} lần{RESET} số gói tin của Reno")
+    print(f"🎯 CWND tối đa của NewReno bằng {BOLD}{ratio(newreno_cwnd['max_cwnd_kb'], reno_cwnd['max_cwnd_kb']):.1f} lần{RESET} Reno")
+    if 'loss_events' in newreno_cwnd and 'loss_events' in reno_cwnd:
+        print(f"⚡ Mất gói: NewReno {newreno_cwnd['loss_events']} lần (RTO {newreno_cwnd['rto_events']}) "
+              f"vs Reno {reno_cwnd['loss_events']} lần (RTO {reno_cwnd['rto_events']})")
+
     print(f"\n{BOLD}{CYAN}{'='*80}{RESET}")
     print(f"{BOLD}{WHITE}           📁 CÁC FILE ĐÃ TẠO{RESET}")
     print(f"{CYAN}{'─'*80}{RESET}")
     print(f"📊 {GREEN}tcp_throughput_analysis.png{RESET} - Phân tích throughput chi tiết")
     print(f"🔧 {GREEN}tcp_cwnd_analysis.png{RESET} - Phân tích congestion window")
     print(f"🌐 {GREEN}tcp_network_analysis.png{RESET} - Phân tích mạng tổng thể")
+    print(f"⚖️  {GREEN}tcp_fairness_analysis.png{RESET} - Công bằng & chia sẻ nút cổ chai")
     print(f"📄 {GREEN}tcp_analysis_report.txt{RESET} - Báo cáo chi tiết đầy đủ")
     print(f"📈 {GREEN}tcp_comparison.png{RESET} - So sánh cơ bản")
     print(f"📊 {GREEN}tcp_summary.png{RESET} - Tóm tắt bằng biểu đồ")
+    print(f"🗄️  {GREEN}{path}{RESET} - Kho kết quả các lần chạy")
     print(f"{BOLD}{CYAN}{'='*80}{RESET}\n")
 
 if __name__ == "__main__":
-    print_colorful_summary() 
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description='Tóm tắt kết quả phân tích TCP từ kho kết quả')
+    parser.add_argument('--run-id', type=int, default=None, help='Lần chạy cần hiển thị (mặc định: mới nhất)')
+    parser.add_argument('--db', default=results_store.DEFAULT_DB, help='File SQLite của kho kết quả')
+    args = parser.parse_args()
+    print_colorful_summary(args.run_id, args.db)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sinh trace tổng hợp đúng định dạng enterprise-*.data để benchmark pipeline phân tích
+CWND có dạng răng cưa theo từng RTT (slow start, congestion avoidance, giảm
+một nửa khi mất gói; Reno thỉnh thoảng timeout về 1 MSS), rx được phát theo
+cụm trong mỗi RTT với tốc độ tỉ lệ với CWND. UDP là CBR như OnOffHelper.
+Lịch bắt đầu/kết thúc các luồng giống main() trong enterprise-network-newreno.cc.
+
+Cách dùng:
+    python3 synthetic_traces.py out_dir --rows 1M --competing 2
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+MSS = 1448
+RTT = 0.07  # 2 x 30ms WAN + LAN, giây
+
+# Lịch luồng TCP theo simulationTime = 200s: (key file, biến thể, bắt đầu, kết thúc)
+TCP_SCHEDULE = [
+    ('main-newreno', 'newreno', 1.0, 190.0),
+    ('comp1-newreno', 'newreno', 20.0, 180.0),
+    ('comp2-newreno', 'newreno', 40.0, 160.0),
+    ('reno', 'reno', 60.0, 140.0),
+]
+# Luồng UDP CBR: (key file, tốc độ bit/s, bắt đầu, kết thúc)
+UDP_SCHEDULE = [
+    ('udp1', 1.0e6, 30.0, 90.0),
+    ('udp2', 1.5e6, 100.0, 170.0),
+]
+UDP_PACKET_SIZE = 1024
+
+# (node, application) của PacketSink cho enterprise-all-rx.data, xem all_rx_demux.SINK_CONTEXTS
+SINK_NODES = {
+    'main-newreno': (5, 0), 'comp1-newreno': (6, 0), 'comp2-newreno': (7, 0),
+    'reno': (5, 1), 'udp1': (7, 1), 'udp2': (6, 1),
+}
+
+
+def parse_size(text):
+    """'10M' -> 10_000_000, '500k' -> 500_000"""
+    text = str(text).strip().lower()
+    scale = {'k': 10**3, 'm': 10**6, 'g': 10**9}.get(text[-1], 1)
+    return int(float(text.rstrip('kmg')) * scale)
+
+
+def sawtooth_cwnd(start, stop, variant, rng, loss_rate=0.4, max_cwnd=200 * MSS):
+    """CWND theo từng RTT: trả về (thời điểm mỗi RTT, cwnd đầu mỗi RTT)
+
+    loss_rate: số sự kiện mất gói trung bình mỗi giây
+    """
+    n_rtt = max(2, int((stop - start) / RTT))
+    p_loss = min(1.0, loss_rate * RTT)
+    losses = rng.random(n_rtt) < p_loss
+    # Reno dễ bị timeout hơn khi mất nhiều gói trong một cửa sổ
+    timeouts = losses & (rng.random(n_rtt) < (0.3 if variant == 'reno' else 0.05))
+
+    cwnd = np.empty(n_rtt)
+    cw, ssthresh = 10.0 * MSS, 64 * 1024.0
+    for i in range(n_rtt):
+        cwnd[i] = cw
+        if timeouts[i]:
+            ssthresh, cw = max(cw / 2, 2 * MSS), float(MSS)
+        elif losses[i]:
+            ssthresh = max(cw / 2, 2 * MSS)
+            cw = ssthresh
+        elif cw < ssthresh:
+            cw = min(cw * 2, ssthresh)
+        else:
+            cw = min(cw + MSS, max_cwnd)
+    return start + np.arange(n_rtt) * RTT, cwnd
+
+
+def sample_cwnd(rtt_times, rtt_cwnd, n_rows, rng):
+    """Lấy n_rows mẫu cwnd (mỗi ACK một dòng): tăng tuyến tính trong RTT, giảm đột ngột khi mất gói"""
+    times = np.sort(rng.uniform(rtt_times[0], rtt_times[-1] + RTT, n_rows))
+    k = np.minimum(np.searchsorted(rtt_times, times, side='right') - 1, len(rtt_times) - 1)
+    nxt = np.minimum(k + 1, len(rtt_times) - 1)
+    frac = (times - rtt_times[k]) / RTT
+    grow = rtt_cwnd[nxt] >= rtt_cwnd[k]
+    values = np.where(grow, rtt_cwnd[k] + (rtt_cwnd[nxt] - rtt_cwnd[k]) * frac, rtt_cwnd[k])
+    return times, values.astype(np.int64)
+
+
+def sample_rx(rtt_times, rtt_cwnd, n_rows, rng):
+    """n_rows gói nhận: số gói mỗi RTT tỉ lệ với cwnd, dồn thành cụm ở đầu RTT (bursty)"""
+    weights = rtt_cwnd / rtt_cwnd.sum()
+    per_rtt = rng.multinomial(n_rows, weights)
+    k = np.repeat(np.arange(len(rtt_times)), per_rtt)
+    # Cụm gói chiếm khoảng 1/3 đầu RTT
+    times = rtt_times[k] + rng.beta(1.0, 3.0, n_rows) * RTT
+    times.sort()
+    sizes = np.where(rng.random(n_rows) < 0.9, MSS, rng.integers(64, MSS, n_rows))
+    return times, sizes.astype(np.int64)
+
+
+def write_trace(filename, times, values, block=1_000_000):
+    """Ghi 'time\\tvalue' giống ostream mặc định của ns-3 (6 chữ số có nghĩa)"""
+    with open(filename, 'w') as f:
+        for start in range(0, len(times), block):
+            t = times[start:start + block].tolist()
+            v = values[start:start + block].tolist()
+            f.write(''.join(f'{a:.6g}\t{b}\n' for a, b in zip(t, v)))
+
+
+def bin_rx(times, sizes, bin_width):
+    """Gom gói theo bin như --rxBinWidth: (thời điểm bắt đầu bin, bytes, số gói) của các bin có gói"""
+    index = np.floor(times / bin_width).astype(np.int64)
+    bins, inverse, packets = np.unique(index, return_inverse=True, return_counts=True)
+    nbytes = np.bincount(inverse, weights=sizes).astype(np.int64)
+    return bins * bin_width, nbytes, packets
+
+
+def write_binned_trace(filename, bin_width, starts, nbytes, packets, context=None):
+    """Ghi trace rx đã gom bin giống TraceFile/RxTraceSimple khi chạy với --rxBinWidth"""
+    with open(filename, 'w') as f:
+        f.write(f'# binned bin_width={bin_width:g}\n')
+        if context is None:
+            f.write(''.join(f'{a:.9g}\t{b}\t{c}\n' for a, b, c in
+                            zip(starts.tolist(), nbytes.tolist(), packets.tolist())))
+        else:
+            f.write(''.join(f'{a:.9g}\t{b}\t{ctx}\t{c}\n' for a, b, ctx, c in
+                            zip(starts.tolist(), nbytes.tolist(), context, packets.tolist())))
+
+
+def generate(out_dir, rows=100_000, cwnd_rows=None, competing=2, duration_scale=1.0,
+             all_rx=False, seed=0, bin_width=None):
+    """Sinh đầy đủ bộ trace vào out_dir
+
+    rows: số dòng rx cho mỗi luồng TCP; cwnd_rows: số dòng cwnd (mặc định rows/4)
+    competing: số luồng TCP cạnh tranh (>= 2; luồng thứ 3 trở đi chỉ ảnh hưởng tải)
+    duration_scale: nhân lịch thời gian (1.0 = mô phỏng 200s)
+    all_rx: ghi thêm enterprise-all-rx.data
+    bin_width: ghi trace rx đã gom bin (giây) thay cho mỗi gói một dòng
+    Trả về dict tên file -> số dòng.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    cwnd_rows = cwnd_rows or max(1, rows // 4)
+
+    schedule = list(TCP_SCHEDULE)
+    for i in range(3, competing + 1):
+        schedule.append((f'comp{i}-newreno', 'newreno', 20.0 + 5 * i, 180.0 - 5 * i))
+
+    written = {}
+    rx_series = {}
+    for name, variant, start, stop in schedule:
+        start, stop = start * duration_scale, stop * duration_scale
+        rtt_times, rtt_cwnd = sawtooth_cwnd(start, stop, variant, rng)
+        rx_times, rx_sizes = sample_rx(rtt_times, rtt_cwnd, rows, rng)
+        cw_times, cw_values = sample_cwnd(rtt_times, rtt_cwnd, cwnd_rows, rng)
+
+        filename = os.path.join(out_dir, f'enterprise-{name}-cwnd.data')
+        write_trace(filename, cw_times, cw_values)
+        written[filename] = len(cw_times)
+        filename = os.path.join(out_dir, f'enterprise-{name}-rx.data')
+        written[filename] = write_rx(filename, rx_times, rx_sizes, bin_width)
+        rx_series[name] = (rx_times, rx_sizes)
+
+    for name, rate, start, stop in UDP_SCHEDULE:
+        start, stop = start * duration_scale, stop * duration_scale
+        interval = UDP_PACKET_SIZE * 8 / rate
+        times = start + RTT / 2 + np.arange(0, stop - start, interval)
+        sizes = np.full(len(times), UDP_PACKET_SIZE, dtype=np.int64)
+        filename = os.path.join(out_dir, f'enterprise-{name}-rx.data')
+        written[filename] = write_rx(filename, times, sizes, bin_width)
+        rx_series[name] = (times, sizes)
+
+    if all_rx:
+        filename = os.path.join(out_dir, 'enterprise-all-rx.data')
+        written[filename] = write_all_rx(filename, rx_series, bin_width=bin_width)
+
+    return written
+
+
+def write_rx(filename, times, sizes, bin_width=None):
+    """Ghi một trace rx (mỗi gói một dòng hoặc đã gom bin), trả về số dòng"""
+    if bin_width is None:
+        write_trace(filename, times, sizes)
+        return len(times)
+    starts, nbytes, packets = bin_rx(times, sizes, bin_width)
+    write_binned_trace(filename, bin_width, starts, nbytes, packets)
+    return len(starts)
+
+
+def write_all_rx(filename, rx_series, block=1_000_000, bin_width=None):
+    """Ghi enterprise-all-rx.data (time, size, context) trộn theo thời gian như RxTraceSimple"""
+    names = [n for n in rx_series if n in SINK_NODES]
+    contexts = [f'/NodeList/{SINK_NODES[n][0]}/ApplicationList/{SINK_NODES[n][1]}/$ns3::PacketSink/Rx'
+                for n in names]
+    if bin_width is not None:
+        binned = [bin_rx(*rx_series[n], bin_width) for n in names]
+        starts = np.concatenate([b[0] for b in binned])
+        order = np.argsort(starts, kind='stable')
+        flow = np.concatenate([np.full(len(b[0]), i) for i, b in enumerate(binned)])[order]
+        write_binned_trace(filename, bin_width, starts[order],
+                           np.concatenate([b[1] for b in binned])[order],
+                           np.concatenate([b[2] for b in binned])[order],
+                           context=[contexts[i] for i in flow.tolist()])
+        return len(order)
+
+    times = np.concatenate([rx_series[n][0] for n in names])
+    sizes = np.concatenate([rx_series[n][1] for n in names])
+    flow = np.concatenate([np.full(len(rx_series[n][0]), i) for i, n in enumerate(names)])
+    order = np.argsort(times, kind='stable')
+
+    with open(filename, 'w') as f:
+        for start in range(0, len(order), block):
+            idx = order[start:start + block]
+            f.write(''.join(f'{a:.6g}\t{b}\t{contexts[c]}\n' for a, b, c in
+                            zip(times[idx].tolist(), sizes[idx].tolist(), flow[idx].tolist())))
+    return len(order)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sinh trace tổng hợp enterprise-*.data')
+    parser.add_argument('out_dir', help='Thư mục ghi trace')
+    parser.add_argument('--rows', default='100k', help='Số dòng rx mỗi luồng TCP (ví dụ 1M)')
+    parser.add_argument('--cwnd-rows', default=None, help='Số dòng cwnd mỗi luồng (mặc định rows/4)')
+    parser.add_argument('--competing', type=int, default=2, help='Số luồng TCP cạnh tranh (>= 2)')
+    parser.add_argument('--duration-scale', type=float, default=1.0, help='Hệ số kéo dài lịch mô phỏng 200s')
+    parser.add_argument('--all-rx', action='store_true', help='Ghi thêm enterprise-all-rx.data')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bin-width', type=float, default=None,
+                        help='Gom trace rx theo bin (giây) như --rxBinWidth của mô phỏng')
+    args = parser.parse_args()
+
+    written = generate(args.out_dir, parse_size(args.rows),
+                       parse_size(args.cwnd_rows) if args.cwnd_rows else None,
+                       max(2, args.competing), args.duration_scale, args.all_rx, args.seed,
+                       args.bin_width)
+    for filename, n in written.items():
+        print(f"✅ {filename}: {n:,} dòng")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Cho phép import các module phân tích ở thư mục gốc (repo không đóng gói), fixture dùng chung"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic_traces  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def synthetic_run(tmp_path_factory):
+    """Thư mục trace tổng hợp nhỏ (đủ các file enterprise-*.data), dùng chung cho cả phiên test
+
+    Chỉ đọc: test cần ghi file (cache, kho kết quả) dùng use_cache=False hoặc tmp_path riêng.
+    """
+    out_dir = tmp_path_factory.mktemp('run')
+    synthetic_traces.generate(str(out_dir), rows=4000, duration_scale=0.5, all_rx=True)
+    return str(out_dir)
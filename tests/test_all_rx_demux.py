@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Tách enterprise-all-rx.data phải cho đúng dữ liệu của từng file rx riêng"""
+
+import os
+
+import numpy as np
+
+import all_rx_demux
+import synthetic_traces
+import trace_reader
+
+# Luồng trong all_rx_demux.FLOWS -> tên file rx riêng do synthetic_traces ghi
+FLOW_FILES = {'newreno': 'main-newreno', 'reno': 'reno', 'comp1': 'comp1-newreno',
+              'comp2': 'comp2-newreno', 'udp1': 'udp1', 'udp2': 'udp2'}
+
+
+def test_context_flow():
+    assert all_rx_demux.context_flow('/NodeList/5/ApplicationList/1/$ns3::PacketSink/Rx') == 'reno'
+    assert all_rx_demux.context_flow('/NodeList/6/ApplicationList/1/$ns3::PacketSink/Rx') == 'udp2'
+    assert all_rx_demux.context_flow('/NodeList/1/ApplicationList/0/$ns3::PacketSink/Rx') is None
+    assert all_rx_demux.context_flow('garbage') is None
+
+
+def test_matches_per_flow_files(synthetic_run):
+    flows = all_rx_demux.demux_all_rx(os.path.join(synthetic_run, all_rx_demux.ALL_RX_FILE))
+    assert set(flows) == set(all_rx_demux.FLOWS)
+    for flow, name in FLOW_FILES.items():
+        times, nbytes = trace_reader.read_trace(os.path.join(synthetic_run, f'enterprise-{name}-rx.data'))
+        assert np.array_equal(flows[flow][0], times), flow
+        assert np.array_equal(flows[flow][1], nbytes), flow
+
+
+def test_unknown_contexts_and_missing_flows(tmp_path):
+    path = tmp_path / all_rx_demux.ALL_RX_FILE
+    path.write_text('1.0\t1448\t/NodeList/5/ApplicationList/0/$ns3::PacketSink/Rx\n'
+                    '1.1\t40\t/NodeList/0/ApplicationList/0/$ns3::PacketSink/Rx\n'
+                    '1.2\t536\t/NodeList/5/ApplicationList/0/$ns3::PacketSink/Rx\n'
+                    '1.3\t1024\t/NodeList/7/ApplicationList/1/$ns3::PacketSink/Rx\n')
+    flows = all_rx_demux.demux_all_rx(str(path))
+    assert flows['newreno'][0].tolist() == [1.0, 1.2]
+    assert flows['newreno'][1].tolist() == [1448, 536]
+    assert flows['udp1'][1].tolist() == [1024]
+    assert len(flows['reno'][0]) == 0 and len(flows['comp2'][1]) == 0
+
+
+def test_binned(tmp_path):
+    synthetic_traces.generate(str(tmp_path), rows=2000, duration_scale=0.2, all_rx=True, bin_width=0.01)
+    flows = all_rx_demux.demux_all_rx(str(tmp_path / all_rx_demux.ALL_RX_FILE))
+    for flow, name in FLOW_FILES.items():
+        expected = trace_reader.read_binned_trace(str(tmp_path / f'enterprise-{name}-rx.data'))
+        assert len(flows[flow]) == 3
+        for column, values in zip(flows[flow], expected):
+            assert np.array_equal(column, values), flow
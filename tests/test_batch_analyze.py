@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Tìm thư mục lần chạy theo mọi biến thể file trace"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip('scipy')
+
+import batch_analyze  # noqa: E402
+import synthetic_traces  # noqa: E402
+
+
+def test_discover_runs_variants(tmp_path):
+    for run, name in (('plain', 'enterprise-reno-rx.data'), ('binary', 'enterprise-reno-rx.bin'),
+                      ('archive', 'enterprise-udp1-rx.data.delta.npz'),
+                      ('compressed', 'enterprise-main-newreno-cwnd.data.xz'),
+                      ('other', 'other.data')):
+        (tmp_path / run).mkdir()
+        (tmp_path / run / name).touch()
+    runs = batch_analyze.discover_runs(str(tmp_path))
+    assert runs == [str(tmp_path / run) for run in ('archive', 'binary', 'compressed', 'plain')]
+
+
+def test_confidence_interval():
+    n, mean, std, low, high = batch_analyze.confidence_interval([1.0, 2.0, 3.0, np.nan], 0.95)
+    assert (n, mean, std) == (3, 2.0, 1.0)
+    half_width = 4.302652729911275 / np.sqrt(3)  # t(0.975, 2)
+    assert (low, high) == pytest.approx((2.0 - half_width, 2.0 + half_width))
+    assert batch_analyze.confidence_interval([5.0])[:2] == (1, 5.0)
+    assert np.isnan(batch_analyze.confidence_interval([5.0])[3])
+    assert batch_analyze.confidence_interval([])[0] == 0
+
+
+def test_run_batch_serial_and_parallel(tmp_path):
+    for seed in range(3):
+        synthetic_traces.generate(str(tmp_path / 'runs' / f'seed{seed}'), rows=2000,
+                                  duration_scale=0.3, seed=seed)
+    serial_runs, serial = batch_analyze.run_batch(str(tmp_path / 'runs'), workers=1,
+                                                  output=str(tmp_path / 'serial.csv'))
+    parallel_runs, parallel = batch_analyze.run_batch(str(tmp_path / 'runs'), workers=2,
+                                                      output=str(tmp_path / 'parallel.csv'))
+    assert (tmp_path / 'serial.csv').exists() and (tmp_path / 'serial_runs.csv').exists()
+    assert len(serial_runs) == 3
+    assert list(serial_runs['run']) == list(parallel_runs['run'])
+
+    columns = [c for c in serial_runs.columns if c not in ('run', 'elapsed')]
+    assert np.allclose(serial_runs[columns], parallel_runs[columns], equal_nan=True)
+    assert serial[['flow', 'metric', 'n']].equals(parallel[['flow', 'metric', 'n']])
+
+    row = serial.set_index(['flow', 'metric']).loc[('reno_rx', 'avg_throughput')]
+    values = serial_runs['reno_rx.avg_throughput']
+    assert row['n'] == 3 and row['mean'] == pytest.approx(values.mean())
+    assert row['ci_low'] < row['mean'] < row['ci_high']
+    assert 'newreno_vs_reno.throughput_pct' in serial_runs and 'fairness.mean_jain' in serial_runs
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Trace nhị phân .bin: đọc memmap không sao chép, bản ghi dở dang, header sai"""
+
+import numpy as np
+import pytest
+
+import binary_trace
+import trace_reader
+from analyze_complete import TCPAnalyzer
+
+
+def test_round_trip(tmp_path):
+    times = np.array([0.001, 0.5, 1.25, 200.0])
+    values = np.array([1448, 536, 2**32 - 1, 0])
+    path = str(tmp_path / 'enterprise-reno-cwnd.bin')
+    binary_trace.write_binary_trace(path, times, values)
+    assert len(open(path, 'rb').read()) == binary_trace.HEADER_SIZE + 12 * len(times)
+
+    read_times, read_values = binary_trace.read_binary_trace(path)
+    assert isinstance(read_times, np.memmap)  # view, không sao chép
+    assert np.array_equal(read_times, times)
+    assert read_values.dtype == np.int64 and np.array_equal(read_values, values)
+    assert np.diff(read_values)[2] < 0  # không tràn vòng như uint32
+
+
+def test_partial_record_and_empty(tmp_path):
+    path = str(tmp_path / 'rx.bin')
+    binary_trace.write_binary_trace(path, [1.0, 2.0], [10, 20])
+    with open(path, 'ab') as f:
+        f.write(bytes(7))  # bản ghi cuối chưa ghi xong
+    assert binary_trace.read_binary_trace(path)[1].tolist() == [10, 20]
+
+    binary_trace.write_binary_trace(path, [], [])
+    assert len(binary_trace.open_records(path)) == 0
+
+
+@pytest.mark.parametrize('header', [b'NS3TR', b'BADMAGIC' + bytes(8),
+                                    b'NS3TRACE' + np.array([2, 12], dtype='<u4').tobytes(),
+                                    b'NS3TRACE' + np.array([1, 16], dtype='<u4').tobytes()])
+def test_bad_header(tmp_path, header):
+    path = tmp_path / 'rx.bin'
+    path.write_bytes(header)
+    with pytest.raises(ValueError):
+        binary_trace.read_binary_trace(str(path))
+
+
+def test_convert_and_read_through_analyzer(synthetic_run, tmp_path):
+    name = 'enterprise-reno-rx.data'
+    (tmp_path / name).write_bytes(open(f'{synthetic_run}/{name}', 'rb').read())
+    output = binary_trace.convert_text_trace(str(tmp_path / name))
+    assert output == str(tmp_path / 'enterprise-reno-rx.bin')
+    assert binary_trace.binary_path(name) == 'enterprise-reno-rx.bin'
+
+    text_times, text_values = trace_reader.read_trace(str(tmp_path / name))
+    (tmp_path / name).unlink()
+    analyzer = TCPAnalyzer(data_dir=str(tmp_path))
+    assert analyzer.trace_path('reno_rx') == output
+    _, df, _ = analyzer.read_trace('reno_rx')
+    assert np.array_equal(df['time'].values, text_times)
+    assert np.array_equal(df['bytes'].values, text_values)
+    chunks = list(trace_reader.iter_chunks(output, 1000))
+    assert np.array_equal(np.concatenate([values for _, values in chunks]), text_values)
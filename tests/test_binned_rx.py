@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Trace rx gom bin trong mô phỏng (--rxBinWidth): thống kê như trace mỗi gói một dòng"""
+
+import numpy as np
+import pytest
+
+import synthetic_traces
+from analyze_complete import TCPAnalyzer
+from test_streaming_stats import assert_same
+
+RX_KEYS = [key for key in TCPAnalyzer.TRACE_FILES if key.endswith('_rx')]
+
+
+@pytest.fixture(scope='module')
+def runs(tmp_path_factory):
+    plain = tmp_path_factory.mktemp('plain')
+    binned = tmp_path_factory.mktemp('binned')
+    synthetic_traces.generate(str(plain), rows=3000, duration_scale=0.3, all_rx=True)
+    synthetic_traces.generate(str(binned), rows=3000, duration_scale=0.3, all_rx=True, bin_width=0.01)
+    return str(plain), str(binned)
+
+
+def _stats(data_dir, **load_kwargs):
+    analyzer = TCPAnalyzer(use_cache=False, data_dir=data_dir)
+    analyzer.load_all_data(workers=1, **load_kwargs)
+    analyzer.calculate_statistics()
+    return analyzer
+
+
+def test_binned_frame(runs):
+    analyzer = _stats(runs[1])
+    df = analyzer.data['reno_rx']
+    assert df.attrs['bin_width'] == 0.01
+    assert 'packets' in df
+    assert np.allclose(df['instant_throughput'], df['bytes'].astype(float) * 8 / (1e6 * 0.01))
+
+
+def test_totals_and_windows_match_unbinned(runs):
+    plain, binned = _stats(runs[0]), _stats(runs[1])
+    for key in RX_KEYS:
+        expected, actual = plain.stats[key], binned.stats[key]
+        assert actual['total_bytes'] == expected['total_bytes']
+        assert actual['packets'] == expected['packets']
+        assert_same(expected['windowed_throughput'], actual['windowed_throughput'])
+        # Thời điểm bắt đầu bin làm tròn xuống tối đa một bin
+        assert expected['start_time'] - 0.01 <= actual['start_time'] <= expected['start_time']
+    assert binned.stats['fairness']['mean_jain'] == pytest.approx(plain.stats['fairness']['mean_jain'])
+
+
+def test_binned_streaming_and_combined(runs):
+    in_memory = _stats(runs[1])
+    combined = _stats(runs[1], combined_rx=True)
+    assert_same(in_memory.stats, combined.stats)
+
+    streaming = TCPAnalyzer(use_cache=False, data_dir=runs[1])
+    streaming.calculate_statistics_streaming(chunk_size=500)
+    assert_same(in_memory.stats, streaming.stats)
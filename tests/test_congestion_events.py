@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Phát hiện sự kiện tắc nghẽn; EventAccumulator phải bằng summarize dưới mọi cách chia khối"""
+
+import numpy as np
+import pytest
+
+import congestion_events
+import synthetic_traces
+from congestion_events import MSS
+
+# Slow start, fast recovery có một lần deflation do partial ACK, rồi RTO và phục hồi
+TIMES = [0.0, 0.1, 0.2, 0.3, 0.35, 0.4, 0.5, 2.0, 2.1, 3.0, 3.1]
+CWND = [14480, 28960, 57920, 28960, 27000, 29000, 30448, MSS, 2 * MSS, 30448, 31000]
+
+
+def test_summarize_hand_built_trace():
+    summary = congestion_events.summarize(TIMES, CWND)
+    assert summary['loss_events'] == 2
+    assert summary['fast_recovery_events'] == 1 and summary['rto_events'] == 1
+    assert summary['minor_decreases'] == 0
+    assert summary['partial_ack_deflations'] == 1
+    assert summary['unrecovered_events'] == 1  # đợt đầu không lấy lại 57920 trước RTO
+    assert summary['mean_recovery_time'] == pytest.approx(1.0)
+    assert summary['mean_time_between_losses'] == pytest.approx(1.7)
+    assert summary['slow_start_updates'] == 5 and summary['congestion_avoidance_updates'] == 2
+    assert summary['slow_start_time'] == pytest.approx(1.25)
+    assert summary['congestion_avoidance_time'] == pytest.approx(0.2)
+
+    events = congestion_events.detect_events(TIMES, CWND)
+    assert list(events['episode_kind']) == ['multiplicative', 'rto']
+    assert list(events['floor_cwnd']) == [27000, MSS]
+
+
+def test_minor_decrease_and_flat_trace():
+    summary = congestion_events.summarize([0, 1, 2, 3], [100000, 95000, 96000, 97000])
+    assert summary['minor_decreases'] == 1 and summary['loss_events'] == 0
+    flat = congestion_events.summarize([0.0, 1.0], [MSS, MSS])
+    assert flat['loss_events'] == 0 and flat['slow_start_updates'] == 0
+    assert congestion_events.summarize([], [])['loss_events'] == 0
+
+
+def _traces():
+    rng = np.random.default_rng(0)
+    yield np.array(TIMES), np.array(CWND)
+    for variant in ('newreno', 'reno'):
+        rtt_times, rtt_cwnd = synthetic_traces.sawtooth_cwnd(0.0, 60.0, variant, rng, loss_rate=1.0)
+        yield synthetic_traces.sample_cwnd(rtt_times, rtt_cwnd, 5000, rng)
+    # Giảm dày đặc: nhiều đợt nối nhau qua biên khối
+    times = np.cumsum(rng.exponential(0.2, 3000))
+    yield times, rng.integers(MSS, 60 * MSS, len(times))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_accumulator_matches_summarize(seed):
+    rng = np.random.default_rng(seed)
+    for times, cwnd in _traces():
+        expected = congestion_events.summarize(times, cwnd)
+        n_splits = rng.integers(1, max(2, len(times) // 3))
+        splits = np.sort(rng.choice(np.arange(1, len(times)), min(n_splits, len(times) - 1), replace=False))
+        acc = congestion_events.EventAccumulator()
+        for part_times, part_cwnd in zip(np.split(times, splits), np.split(cwnd, splits)):
+            acc.update(part_times, part_cwnd)
+        assert acc.result() == pytest.approx(expected)
+
+
+def test_accumulator_result_mid_stream():
+    times, cwnd = next(_traces())
+    acc = congestion_events.EventAccumulator()
+    for i in range(len(times)):
+        acc.update(times[i:i + 1], cwnd[i:i + 1])
+        assert acc.result() == pytest.approx(congestion_events.summarize(times[:i + 1], cwnd[:i + 1]))
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Giảm điểm trước khi vẽ: giới hạn số điểm nhưng giữ cực trị (răng cưa CWND)"""
+
+import numpy as np
+
+import decimate
+
+
+def _sawtooth(n=200_000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.sort(rng.uniform(0, 200, n))
+    y = (x % 7.3) * 1000 + rng.normal(0, 5, n)
+    return x, y
+
+
+def test_short_series_unchanged():
+    x, y = np.arange(10.0), np.arange(10.0) ** 2
+    dx, dy = decimate.decimate(x, y, max_points=10)
+    assert np.array_equal(dx, x) and np.array_equal(dy, y)
+    assert decimate.decimate(x, y, max_points=None)[0] is x
+
+
+def test_minmax_keeps_extrema_of_every_bucket():
+    x, y = _sawtooth()
+    max_points = 1000
+    idx = decimate.minmax_indices(x, y, max_points)
+    assert np.all(np.diff(idx) > 0)
+    assert len(idx) <= max_points + 2
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    kept = set(y[idx].tolist())
+
+    edges = np.linspace(x[0], x[-1], max_points // 2 + 1)
+    bucket = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, max_points // 2 - 1)
+    for b in np.unique(bucket)[::25]:
+        segment = y[bucket == b]
+        assert segment.min() in kept and segment.max() in kept
+
+
+def test_minmax_ignores_nan():
+    x, y = _sawtooth(10_000)
+    y[::3] = np.nan
+    idx = decimate.minmax_indices(x, y, 200)
+    inner = idx[1:-1]
+    assert not np.isnan(y[inner]).any()
+    assert np.nanmax(y) in y[idx] and np.nanmin(y) in y[idx]
+    assert list(decimate.minmax_indices(x, np.full(len(x), np.nan), 200)) == [0, len(x) - 1]
+
+
+def test_lttb():
+    x, y = _sawtooth(50_000)
+    idx = decimate.lttb_indices(x, y, 500)
+    assert len(idx) == 500
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    assert np.all(np.diff(idx) > 0)
+    dx, dy = decimate.decimate(x, y, 500, method='lttb')
+    assert np.array_equal(dx, x[idx]) and np.array_equal(dy, y[idx])
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Chỉ số Jain, tỉ lệ nút cổ chai và TCP/UDP theo cửa sổ"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fairness
+from analyze_complete import TCPAnalyzer
+
+
+def test_jain_known_values():
+    active = np.ones((4, 1), dtype=bool)
+    assert fairness.jain_index(np.full((4, 1), 2.5), active)[0] == pytest.approx(1.0)
+    assert fairness.jain_index(np.array([[3.0], [0], [0], [0]]), active)[0] == pytest.approx(0.25)
+    # Chỉ tính luồng hoạt động; không có luồng nào -> NaN; mọi luồng bằng 0 -> 1
+    partial = np.array([[True], [True], [False], [False]])
+    assert fairness.jain_index(np.array([[3.0], [0], [9], [9]]), partial)[0] == pytest.approx(0.5)
+    assert np.isnan(fairness.jain_index(np.zeros((2, 1)), np.zeros((2, 1), dtype=bool))[0])
+    assert fairness.jain_index(np.zeros((2, 1)), np.ones((2, 1), dtype=bool))[0] == 1.0
+
+
+def test_window_matrix_matches_groupby():
+    rng = np.random.default_rng(0)
+    n, n_flows, window = 5000, 7, 0.5
+    times = rng.uniform(0, 30, n)
+    nbytes = rng.integers(1, 1500, n).astype(float)
+    flow_ids = rng.integers(0, n_flows, n)
+    starts, matrix = fairness.window_matrix(times, nbytes, flow_ids, n_flows, window)
+    assert matrix.shape == (n_flows, len(starts))
+    assert np.allclose(starts, np.arange(len(starts)) * window)
+
+    grouped = pd.Series(nbytes).groupby([flow_ids, (times // window).astype(int)]).sum()
+    expected = np.zeros_like(matrix)
+    for (flow, idx), value in grouped.items():
+        expected[flow, idx] = value
+    assert np.allclose(matrix, expected)
+
+    # Mẫu vượt horizon dồn vào cửa sổ cuối
+    _, clipped = fairness.window_matrix([0.1, 9.0], [1.0, 2.0], [0, 0], 1, 1.0, horizon=2.0)
+    assert clipped.tolist() == [[1.0, 0.0, 2.0]]
+
+
+def test_active_mask_counts_starved_windows():
+    window_bytes = np.array([[0, 5, 0, 5, 0], [0, 0, 0, 0, 0], [1, 0, 0, 0, 0]])
+    assert fairness.active_mask(window_bytes).tolist() == [
+        [False, True, True, True, False], [False] * 5, [True] + [False] * 4]
+
+
+def test_analyze_shares():
+    window = 1.0
+    mbit = 1e6 / 8  # bytes cho 1 Mbps trong cửa sổ 1 s
+    window_bytes = np.array([[2 * mbit, 2 * mbit, 0],   # TCP
+                             [2 * mbit, 0, 0],          # TCP, dừng sau cửa sổ đầu
+                             [1 * mbit, 1 * mbit, 1 * mbit]])  # UDP
+    result = fairness.analyze(window_bytes, np.arange(3) * window, window, is_udp=[False, False, True])
+
+    assert np.allclose(result['share'][:, 0], [0.4, 0.4, 0.2])
+    assert list(result['active_flows']) == [3, 2, 1]
+    assert result['jain'][0] == pytest.approx(25 / 27)
+    assert result['jain'][1] == pytest.approx(0.9)
+    assert np.allclose(result['udp_share'], [0.2, 1 / 3, 1.0])
+    assert np.allclose(result['tcp_share'], [0.8, 2 / 3, 0.0])
+    assert result['mean_jain'] == pytest.approx((25 / 27 + 0.9) / 2)  # cửa sổ một luồng bị bỏ qua
+    assert result['min_jain'] == pytest.approx(0.9)
+    assert np.allclose(result['mean_share'], [0.4, 0.4, 0.2])
+    assert result['udp_total_share'] == pytest.approx(3 / 9)
+    assert result['tcp_total_share'] == pytest.approx(6 / 9)
+    assert result['mean_utilization'] == pytest.approx((5 + 3 + 1) / 3 / fairness.BOTTLENECK_MBPS)
+
+
+def test_analyzer_fairness_in_memory_and_streaming(synthetic_run):
+    in_memory = TCPAnalyzer(use_cache=False, data_dir=synthetic_run)
+    in_memory.load_all_data(workers=1)
+    in_memory.calculate_statistics()
+    streaming = TCPAnalyzer(use_cache=False, data_dir=synthetic_run)
+    streaming.calculate_statistics_streaming()
+
+    expected, result = in_memory.stats['fairness'], streaming.stats['fairness']
+    assert result['flow_keys'] == expected['flow_keys']
+    assert any(key.startswith('udp') for key in result['flow_keys'])
+    for name in ('jain', 'share', 'udp_share', 'active_flows'):
+        assert np.allclose(result[name], expected[name], equal_nan=True)
+    for name in ('mean_jain', 'min_jain', 'udp_total_share', 'mean_utilization'):
+        assert result[name] == pytest.approx(expected[name])
+    assert 0 < expected['mean_jain'] <= 1
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Vẽ biểu đồ song song và bỏ qua biểu đồ có dữ liệu, tham số không đổi"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import figure_cache
+from analyze_complete import TCPAnalyzer
+
+matplotlib = pytest.importorskip('matplotlib')
+pytest.importorskip('seaborn')
+matplotlib.use('Agg')
+
+
+def test_content_hash():
+    df = pd.DataFrame({'time': [0.0, 1.0], 'bytes': [1448, 536]})
+    digest = figure_cache.content_hash(df, {'dpi': 100})
+    assert digest == figure_cache.content_hash(df.copy(), {'dpi': 100})
+    assert digest != figure_cache.content_hash(df, {'dpi': 101})
+    changed = df.copy()
+    changed.loc[1, 'bytes'] = 537
+    assert digest != figure_cache.content_hash(changed, {'dpi': 100})
+    assert figure_cache.content_hash(np.arange(3)) != figure_cache.content_hash(np.arange(3.0))
+
+
+def _saved(capsys):
+    return sorted(line.split(': ', 1)[1] for line in capsys.readouterr().out.splitlines()
+                  if line.startswith('✅ Đã lưu: '))
+
+
+def test_renders_once_then_skips(synthetic_run, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    analyzer = TCPAnalyzer(use_cache=False, data_dir=synthetic_run)
+    analyzer.load_all_data(workers=1)
+    analyzer.calculate_statistics()
+    capsys.readouterr()
+
+    outputs = analyzer.create_comprehensive_plots(dpi=20, workers=2)
+    assert _saved(capsys) == sorted(outputs)
+    assert all((tmp_path / output).exists() for output in outputs)
+
+    analyzer.create_comprehensive_plots(dpi=20, workers=1)
+    assert _saved(capsys) == []
+
+    # Chỉ biểu đồ mạng dùng utilization_bin_width
+    analyzer.create_comprehensive_plots(dpi=20, workers=1, utilization_bin_width=2.0)
+    assert _saved(capsys) == ['tcp_network_analysis.png']
+
+    # Ảnh bị xóa thì vẽ lại dù hash không đổi
+    (tmp_path / 'tcp_throughput_analysis.png').unlink()
+    analyzer.create_comprehensive_plots(dpi=20, workers=1, utilization_bin_width=2.0)
+    assert _saved(capsys) == ['tcp_throughput_analysis.png']
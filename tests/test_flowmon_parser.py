@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""flowmon_parser trên file FlowMonitor XML nhỏ đúng định dạng SerializeToXmlFile của ns-3"""
+
+import gzip
+
+import numpy as np
+import pytest
+
+import flowmon_parser
+
+FLOWMON_XML = '''<?xml version="1.0" ?>
+<FlowMonitor>
+  <FlowStats>
+    <Flow flowId="1" timeFirstTxPacket="+1e+09ns" timeFirstRxPacket="+1.03e+09ns"
+          timeLastTxPacket="+1.9e+11ns" timeLastRxPacket="+1.9003e+11ns"
+          delaySum="+3.5e+09ns" jitterSum="+9e+07ns" lastDelay="+3.5e+07ns"
+          txBytes="150000" rxBytes="145000" txPackets="101" rxPackets="100" lostPackets="1"
+          timesForwarded="200">
+      <delayHistogram nBins="2">
+        <bin index="0" start="0.03" width="0.001" count="60" />
+        <bin index="1" start="0.031" width="0.001" count="40" />
+      </delayHistogram>
+      <jitterHistogram nBins="1">
+        <bin index="0" start="0" width="0.001" count="99" />
+      </jitterHistogram>
+      <packetSizeHistogram nBins="0">
+      </packetSizeHistogram>
+      <flowInterruptionsHistogram nBins="0">
+      </flowInterruptionsHistogram>
+    </Flow>
+    <Flow flowId="2" timeFirstTxPacket="+1.03e+09ns" timeLastRxPacket="+1.9006e+11ns"
+          delaySum="+1e+08ns" jitterSum="+0ns" txBytes="5200" rxBytes="5200"
+          txPackets="100" rxPackets="100" lostPackets="0" />
+    <Flow flowId="3" timeFirstTxPacket="+3e+10ns" timeLastRxPacket="+9e+10ns"
+          delaySum="+2e+07ns" jitterSum="+1e+06ns" txBytes="10240" rxBytes="9216"
+          txPackets="10" rxPackets="9" lostPackets="1" />
+  </FlowStats>
+  <Ipv4FlowClassifier>
+    <Flow flowId="1" sourceAddress="10.1.1.1" destinationAddress="10.3.1.1" protocol="6"
+          sourcePort="49153" destinationPort="9000" />
+    <Flow flowId="2" sourceAddress="10.3.1.1" destinationAddress="10.1.1.1" protocol="6"
+          sourcePort="9000" destinationPort="49153" />
+    <Flow flowId="3" sourceAddress="10.1.2.1" destinationAddress="10.3.2.1" protocol="17"
+          sourcePort="49200" destinationPort="10000" />
+  </Ipv4FlowClassifier>
+  <FlowProbes>
+    <FlowProbe index="0">
+      <FlowStats flowId="1" packets="101" bytes="150000" delayFromFirstProbeSum="+0ns" />
+    </FlowProbe>
+  </FlowProbes>
+</FlowMonitor>
+'''
+
+
+@pytest.fixture(params=['plain', 'gz'])
+def flowmon_file(tmp_path, request):
+    if request.param == 'gz':
+        path = tmp_path / 'enterprise-flowmon-results.xml.gz'
+        with gzip.open(path, 'wt') as f:
+            f.write(FLOWMON_XML)
+    else:
+        path = tmp_path / 'enterprise-flowmon-results.xml'
+        path.write_text(FLOWMON_XML)
+    return str(path)
+
+
+def test_parse_time():
+    assert flowmon_parser.parse_time('+1.0342e+09ns') == pytest.approx(1.0342)
+    assert flowmon_parser.parse_time('+250ms') == pytest.approx(0.25)
+    assert flowmon_parser.parse_time('12us') == pytest.approx(12e-6)
+    assert flowmon_parser.parse_time('3') == 3.0
+
+
+def test_parse_flowmon(flowmon_file):
+    flows, classifier, histograms = flowmon_parser.parse_flowmon(flowmon_file)
+    assert list(flows['flow_id']) == [1, 2, 3]
+    assert list(flows['rx_bytes']) == [145000, 5200, 9216]
+    assert flows['delay_sum'][0] == pytest.approx(3.5)
+    assert flows['last_rx'][2] == pytest.approx(90.0)
+    assert classifier[3] == ('10.1.2.1', '10.3.2.1', 17, 49200, 10000)
+    assert np.array_equal(histograms[1]['delayHistogram'], [[0.03, 0.001, 60], [0.031, 0.001, 40]])
+    assert histograms[1]['packetSizeHistogram'].shape == (0, 3)
+    assert 2 not in histograms
+
+
+def test_flow_statistics(flowmon_file):
+    stats = flowmon_parser.flow_statistics(flowmon_file, {'newreno': 'TCP NewReno'})
+    assert set(stats) == {'newreno', 'udp1'}  # luồng ACK ngược chiều bị bỏ qua
+    newreno = stats['newreno']
+    assert newreno['flow_name'] == 'TCP NewReno'
+    assert newreno['loss_rate'] == pytest.approx(100 / 101)
+    assert newreno['avg_delay'] == pytest.approx(0.035)
+    assert newreno['avg_jitter'] == pytest.approx(0.09 / 99)
+    assert newreno['delay_histogram'][:, 2].sum() == 100
+    assert stats['udp1']['flow_name'] == 'udp1'
+    assert stats['udp1']['jitter_histogram'].shape == (0, 3)
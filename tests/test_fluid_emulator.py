@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Mô hình fluid theo vòng RTT: bảo toàn dung lượng WAN, tất định, trace đọc được bằng TCPAnalyzer"""
+
+import numpy as np
+import pytest
+
+import fluid_emulator
+from analyze_complete import TCPAnalyzer
+from synthetic_traces import MSS
+
+SIMULATION_TIME = 80.0
+
+
+@pytest.fixture(scope='module')
+def emulated(tmp_path_factory):
+    out_dir = tmp_path_factory.mktemp('fluid')
+    written = fluid_emulator.emulate(str(out_dir), simulation_time=SIMULATION_TIME, all_rx=True)
+    return str(out_dir), written
+
+
+def test_base_rtt():
+    packet_bits = (MSS + fluid_emulator.PACKET_OVERHEAD) * 8
+    one_way = 0.030 + 4 * 0.002 + packet_bits / 5e6 + 4 * packet_bits / 100e6
+    assert fluid_emulator.base_rtt() == pytest.approx(2 * one_way)
+
+
+def test_schedule_clipped_to_simulation_time():
+    flows = fluid_emulator.flow_schedule(SIMULATION_TIME)
+    assert all(stop <= SIMULATION_TIME for _, _, _, stop, _ in flows)
+    assert dict((name, stop) for name, _, _, stop, _ in flows)['main-newreno'] == SIMULATION_TIME - 10
+
+
+def test_simulate_invariants():
+    flows, rounds = fluid_emulator.simulate(SIMULATION_TIME, seed=1)
+    rate_bytes = fluid_emulator.WAN_RATE / 8
+    queue_bytes = fluid_emulator.WAN_QUEUE_PACKETS * (MSS + fluid_emulator.PACKET_OVERHEAD)
+
+    assert rounds['start'][-1] < SIMULATION_TIME
+    assert np.allclose(np.diff(rounds['start']), rounds['duration'][:-1])
+    assert rounds['duration'].min() == pytest.approx(fluid_emulator.base_rtt())
+    # Phần giao vượt dung lượng của một vòng chỉ là phần hàng đợi tăng thêm
+    capacity = np.cumsum(rate_bytes * rounds['duration']) + queue_bytes
+    assert np.all(np.cumsum(rounds['delivered'].sum(axis=1)) <= capacity + 1e-6)
+    assert rounds['delivered'].min() >= 0
+    assert rounds['lost'].sum() > 0
+
+    is_tcp = np.array([variant != 'udp' for _, variant, _, _, _ in flows])
+    cwnd = rounds['cwnd_after'][:, is_tcp]
+    assert np.nanmin(cwnd) >= MSS and np.all(np.isnan(rounds['cwnd_after'][:, ~is_tcp]))
+
+    _, again = fluid_emulator.simulate(SIMULATION_TIME, seed=1)
+    for key, values in rounds.items():
+        assert np.array_equal(values, again[key], equal_nan=True)
+
+
+def test_flow_traces_keep_delivered_bytes():
+    _, rounds = fluid_emulator.simulate(SIMULATION_TIME)
+    one_way = fluid_emulator.base_rtt() / 2
+    (rx_times, rx_sizes), (cwnd_times, cwnd_values) = fluid_emulator.flow_traces(rounds, 0, MSS, one_way, True)
+    assert np.all(np.diff(rx_times) >= 0) and np.all(np.diff(cwnd_times) >= 0)
+    assert rx_sizes.sum() == pytest.approx(rounds['delivered'][:, 0].sum(), abs=MSS)
+    assert rx_times[0] >= rounds['start'][0] + one_way
+    assert cwnd_values.min() >= MSS
+
+
+def test_emulated_run_is_readable(emulated):
+    out_dir, written = emulated
+    assert all(n >= 0 for n in written.values()) and len(written) == 11
+
+    analyzer = TCPAnalyzer(use_cache=False, data_dir=out_dir)
+    analyzer.load_all_data(workers=1)
+    analyzer.calculate_statistics()
+    rx_keys = [key for key in analyzer.stats if key.endswith('_rx')]
+    assert set(rx_keys) == {'newreno_rx', 'comp1_rx', 'comp2_rx', 'reno_rx', 'udp1_rx'}  # udp2 bắt đầu sau 80 s
+    total_bytes = sum(analyzer.stats[key]['total_bytes'] for key in rx_keys)
+    assert total_bytes * 8 / SIMULATION_TIME <= fluid_emulator.WAN_RATE
+    assert analyzer.stats['udp1_rx']['avg_throughput'] == pytest.approx(1.0, rel=0.1)
+    assert all(analyzer.stats[key]['loss_events'] > 0 for key in analyzer.stats if key.endswith('_cwnd'))
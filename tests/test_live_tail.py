@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Theo dõi trace đang được ghi: dòng/bản ghi dở dang, ghi lại từ đầu, đổi .data <-> .bin"""
+
+import os
+
+import numpy as np
+import pytest
+
+import binary_trace
+import live_tail
+from analyze_complete import TCPAnalyzer
+from test_streaming_stats import assert_same
+
+
+def _append(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def _binary_header():
+    header = np.zeros(1, dtype=binary_trace.HEADER_DTYPE)
+    header['magic'], header['version'] = binary_trace.MAGIC, binary_trace.VERSION
+    header['record_size'] = binary_trace.RECORD_DTYPE.itemsize
+    return header.tobytes()
+
+
+def _binary_records(rows):
+    return np.array(rows, dtype=binary_trace.RECORD_DTYPE).tobytes()
+
+
+def test_text_tail_partial_lines(tmp_path):
+    path = str(tmp_path / 'rx.data')
+    tail = live_tail.TraceTail(path)
+    assert len(tail.read_new()[0]) == 0  # file chưa có
+
+    _append(path, b'1.0\t1448\n2.0\t5')
+    times, values, packets = tail.read_new()
+    assert times.tolist() == [1.0] and values.tolist() == [1448] and packets is None
+    _append(path, b'36\n3.0\t40\n')
+    assert tail.read_new()[1].tolist() == [536, 40]
+    assert len(tail.read_new()[0]) == 0
+
+    # Ghi lại từ đầu (mô phỏng mới): file ngắn hơn offset
+    with open(path, 'wb') as f:
+        f.write(b'0.5\t100\n')
+    assert tail.read_new()[1].tolist() == [100]
+    assert tail.restarted
+
+
+def test_text_tail_binned_header(tmp_path):
+    path = str(tmp_path / 'rx.data')
+    tail = live_tail.TraceTail(path)
+    _append(path, b'# binned bin_')
+    assert len(tail.read_new()[0]) == 0
+    _append(path, b'width=0.01\n0\t2896\t2\n0.01\t14')
+    times, values, packets = tail.read_new()
+    assert tail.bin_width == 0.01
+    assert values.tolist() == [2896] and packets.tolist() == [2]
+    _append(path, b'48\t1\n')
+    assert tail.read_new()[2].tolist() == [1]
+
+
+def test_binary_tail_partial_records(tmp_path):
+    path = str(tmp_path / 'rx.bin')
+    tail = live_tail.open_tail(path)
+    assert isinstance(tail, live_tail.BinaryTraceTail)
+
+    header = _binary_header()
+    records = _binary_records([(1.0, 1448), (1.5, 536), (2.0, 40)])
+    _append(path, header[:10])
+    assert len(tail.read_new()[0]) == 0
+    _append(path, header[10:] + records[:20])
+    times, values, _ = tail.read_new()
+    assert times.tolist() == [1.0] and values.dtype == np.int64
+    _append(path, records[20:])
+    assert tail.read_new()[1].tolist() == [536, 40]
+
+    with open(path, 'wb') as f:
+        f.write(header + _binary_records([(0.1, 7)]))
+    assert tail.read_new()[1].tolist() == [7]
+    assert tail.restarted
+
+    with open(path, 'wb') as f:
+        f.write(b'NOTATRACE' + bytes(20))
+    with pytest.raises(ValueError):
+        live_tail.BinaryTraceTail(path).read_new()
+
+
+def test_open_tail_rejects_compressed(tmp_path):
+    with pytest.raises(ValueError):
+        live_tail.open_tail(str(tmp_path / 'rx.data.gz'))
+    assert isinstance(live_tail.open_tail(str(tmp_path / 'rx.data')), live_tail.TraceTail)
+
+
+def test_live_matches_streaming(synthetic_run, tmp_path):
+    live = live_tail.LiveAnalyzer(TCPAnalyzer.TRACE_FILES, data_dir=str(tmp_path))
+    assert live.poll() == 0
+    contents = {filename: open(os.path.join(synthetic_run, filename), 'rb').read()
+                for filename, _ in TCPAnalyzer.TRACE_FILES.values()}
+    for part in range(4):
+        for filename, data in contents.items():
+            # Cắt tại vị trí byte bất kỳ, kể cả giữa dòng
+            lo, hi = len(data) * part // 4, len(data) * (part + 1) // 4
+            _append(tmp_path / filename, data[lo:hi])
+        live.poll()
+
+    streaming = TCPAnalyzer(use_cache=False, data_dir=synthetic_run)
+    streaming.calculate_statistics_streaming()
+    del streaming.stats['fairness']
+    assert_same(streaming.stats, live.stats())
+    assert live.sim_time >= max(s['end_time'] for key, s in streaming.stats.items() if key.endswith('_rx'))
+
+
+def test_switch_to_binary_resets(tmp_path):
+    trace_files = {'reno_rx': ('enterprise-reno-rx.data', 'TCP Reno')}
+    live = live_tail.LiveAnalyzer(trace_files, data_dir=str(tmp_path))
+    text_path = tmp_path / 'enterprise-reno-rx.data'
+    text_path.write_bytes(b'1.0\t1448\n2.0\t1448\n')
+    assert live.poll() == 2
+
+    bin_path = tmp_path / 'enterprise-reno-rx.bin'
+    bin_path.write_bytes(_binary_header() + _binary_records([(0.5, 100)]))
+    st = os.stat(text_path)
+    os.utime(bin_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert live.poll() == 1
+    stats = live.stats()['reno_rx']
+    assert stats['total_bytes'] == 100 and stats['packets'] == 1
+    assert live.sim_time == 0.5
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""load_all_data song song (luồng hoặc tiến trình) cho cùng dữ liệu với đọc tuần tự"""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from analyze_complete import TCPAnalyzer
+
+
+def _load(data_dir, **kwargs):
+    analyzer = TCPAnalyzer(use_cache=False, data_dir=data_dir)
+    analyzer.load_all_data(**kwargs)
+    return analyzer
+
+
+@pytest.mark.parametrize('kwargs', [{'workers': 4}, {'workers': 2, 'use_processes': True},
+                                    {'combined_rx': True}])
+def test_parallel_matches_sequential(synthetic_run, kwargs):
+    sequential = _load(synthetic_run, workers=1)
+    parallel = _load(synthetic_run, **kwargs)
+    assert list(parallel.data) == list(TCPAnalyzer.TRACE_FILES)
+    for key, df in sequential.data.items():
+        other = parallel.data[key]
+        assert df.attrs.get('flow') == other.attrs.get('flow')
+        for column in df.columns:
+            assert np.array_equal(df[column].values, other[column].values), (key, column)
+
+
+def test_missing_files_load_empty(synthetic_run, tmp_path):
+    for name in ('enterprise-reno-rx.data', 'enterprise-reno-cwnd.data'):
+        shutil.copy(os.path.join(synthetic_run, name), tmp_path / name)
+    analyzer = _load(str(tmp_path), workers=3)
+    assert not analyzer.data['reno_rx'].empty and not analyzer.data['reno_cwnd'].empty
+    assert all(analyzer.data[key].empty for key in TCPAnalyzer.TRACE_FILES
+               if key not in ('reno_rx', 'reno_cwnd'))
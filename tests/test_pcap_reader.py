@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""pcap_reader trên file pcap nhỏ dựng bằng tay"""
+
+import struct
+
+import numpy as np
+import pytest
+
+import pcap_reader
+
+SENDER, RECEIVER = bytes([10, 1, 1, 1]), bytes([10, 3, 1, 1])
+SPORT, DPORT = 49153, 9000  # cổng 9000: luồng 'newreno' (flowmon_parser.FLOW_PORTS)
+ISN = 2**32 - 3000  # số thứ tự tràn vòng 2^32 giữa luồng
+MSS = 1448
+
+
+def tcp_packet(src, dst, sport, dport, seq, ack, flags, payload=0, ts=None):
+    """Gói IPv4 + TCP (option NOP, NOP, timestamp nếu có ts = (TSval, TSecr))"""
+    options = struct.pack('>BBBBII', 1, 1, 8, 10, *ts) if ts else b''
+    header = 20 + len(options)
+    ip = struct.pack('>BBHHHBBH4s4s', 0x45, 0, 20 + header + payload, 0, 0, 64, 6, 0, src, dst)
+    tcp = struct.pack('>HHIIBBHHH', sport, dport, seq % 2**32, ack % 2**32, (header // 4) << 4,
+                      flags, 65535, 0, 0)
+    return ip + tcp + options + bytes(payload)
+
+
+def udp_packet(src, dst, sport, dport, payload):
+    ip = struct.pack('>BBHHHBBH4s4s', 0x45, 0, 28 + payload, 0, 0, 64, 17, 0, src, dst)
+    return ip + struct.pack('>HHHH', sport, dport, 8 + payload, 0) + bytes(payload)
+
+
+def write_pcap(path, packets, linktype=pcap_reader.LINKTYPE_ETHERNET, byteorder='<', truncate=0):
+    """packets: danh sách (thời điểm, gói IP); truncate bỏ bớt byte cuối file"""
+    data = bytearray(struct.pack(byteorder + 'IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, linktype))
+    for time, ip in packets:
+        if linktype == pcap_reader.LINKTYPE_ETHERNET:
+            frame = bytes(12) + struct.pack('>H', pcap_reader.ETHERTYPE_IPV4) + ip
+        elif linktype == pcap_reader.LINKTYPE_PPP:
+            frame = struct.pack('>H', pcap_reader.PPP_IPV4) + ip
+        else:
+            frame = ip
+        sec = int(time)
+        data += struct.pack(byteorder + 'IIII', sec, round((time - sec) * 1e6), len(frame), len(frame)) + frame
+    with open(path, 'wb') as f:
+        f.write(bytes(data[:len(data) - truncate]))
+    return str(path)
+
+
+def data_segment(i, time, tsval=None):
+    seq = ISN + 1 + i * MSS
+    ts = (tsval, 0) if tsval is not None else None
+    return time, tcp_packet(SENDER, RECEIVER, SPORT, DPORT, seq, 1, 0x18, MSS, ts)
+
+
+def ack_segment(segments, time, tsecr=None):
+    ts = (0, tsecr) if tsecr is not None else None
+    return time, tcp_packet(RECEIVER, SENDER, DPORT, SPORT, 1, ISN + 1 + segments * MSS, 0x10, 0, ts)
+
+
+@pytest.mark.parametrize('linktype', [pcap_reader.LINKTYPE_ETHERNET, pcap_reader.LINKTYPE_PPP, 101])
+@pytest.mark.parametrize('byteorder', ['<', '>'])
+def test_parse_headers(tmp_path, linktype, byteorder):
+    packets = [
+        (1.5, tcp_packet(SENDER, RECEIVER, SPORT, DPORT, ISN, 0, 0x02, 0, (7, 0))),
+        (1.25, udp_packet(SENDER, RECEIVER, 49200, 10000, 1024)),
+        data_segment(0, 2.000001, tsval=1000),
+        data_segment(2, 3.0),
+    ]
+    # Bản ghi cuối bị cắt (mô phỏng chưa đóng file) bị bỏ qua
+    path = write_pcap(tmp_path / 'cap.pcap', packets, linktype, byteorder, truncate=10)
+    parsed = pcap_reader.read_pcap(path)
+
+    assert len(parsed) == 3
+    assert np.allclose(parsed['time'], [1.5, 1.25, 2.000001])
+    assert list(parsed['proto']) == [pcap_reader.TCP, pcap_reader.UDP, pcap_reader.TCP]
+    assert list(parsed['dport']) == [DPORT, 10000, DPORT]
+    assert list(parsed['payload']) == [0, 1024, MSS]
+    assert list(parsed['seq']) == [ISN, 0, (ISN + 1) % 2**32]
+    assert parsed['src'][0] == int.from_bytes(SENDER, 'big')
+    assert list(parsed['has_ts']) == [True, False, True]
+    assert list(parsed['tsval']) == [7, 0, 1000]
+
+
+def test_record_offsets_mixed_lengths(tmp_path):
+    rng = np.random.default_rng(0)
+    lengths = [40] * 500 + list(rng.choice([40, 1500], 2000)) + [1500] * 3000
+    packets = [(1.0 + i * 1e-3, udp_packet(SENDER, RECEIVER, 1, 2, length - 28))
+               for i, length in enumerate(lengths)]
+    path = write_pcap(tmp_path / 'cap.pcap', packets, linktype=101)
+    with open(path, 'rb') as f:
+        data = f.read()
+    record = pcap_reader.RECORD_HEADER_SIZE + np.array(lengths)
+    expected = pcap_reader.GLOBAL_HEADER_SIZE + np.concatenate(([0], np.cumsum(record)[:-1]))
+    assert np.array_equal(pcap_reader.record_offsets(data, '<'), expected)
+
+
+def _hole_capture(use_ts):
+    """Đoạn 1 mất sau điểm bắt, truyền lại ở 1.5 s; ACK cộng dồn 1.56 s phủ cả đoạn 4 gửi lúc 1.04 s"""
+    ts = (lambda value: value) if use_ts else (lambda value: None)
+    syn = (0.9, tcp_packet(SENDER, RECEIVER, SPORT, DPORT, ISN, 0, 0x02, 0, (900, 0) if use_ts else None))
+    packets = [syn] + [data_segment(i, 1.0 + i * 0.01, ts(1000 + 10 * i)) for i in range(5)]
+    packets.append(ack_segment(1, 1.06, ts(1000)))
+    packets += [ack_segment(1, 1.07 + k * 0.01, ts(1000)) for k in range(3)]  # dupack
+    packets.append(data_segment(1, 1.5, ts(1500)))
+    packets.append(ack_segment(5, 1.56, ts(1500)))
+    return sorted(packets, key=lambda packet: packet[0])
+
+
+@pytest.mark.parametrize('use_ts', [True, False])
+def test_rtt_ignores_cumulative_ack_after_hole(tmp_path, use_ts):
+    path = write_pcap(tmp_path / 'cap.pcap', _hole_capture(use_ts))
+    stats = pcap_reader.flow_statistics(path, samples=True)['newreno']
+    assert stats['retransmissions'] == 1
+    assert stats['max_rtt'] == pytest.approx(0.06)
+    if use_ts:
+        # ACK cộng dồn lặp lại TSval của lần truyền lại: đo từ 1.5 s
+        assert np.allclose(stats['rtt_times'], [1.0, 1.5])
+    else:
+        assert np.allclose(stats['rtt_times'], [1.0])
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""Kho kết quả SQLite: lưu/nạp lại self.stats, truy vấn theo biến thể và luồng, đọc từ CLI"""
+
+import os
+import shutil
+import sqlite3
+
+import numpy as np
+import pytest
+
+import analyze_complete
+import plot_comparison
+import results_store
+from analyze_complete import TCPAnalyzer
+from stats_export import scalar_rows
+
+
+@pytest.fixture(scope='module')
+def analyzed(synthetic_run):
+    analyzer = TCPAnalyzer(use_cache=False, data_dir=synthetic_run)
+    analyzer.load_all_data(workers=1)
+    analyzer.calculate_statistics()
+    return analyzer
+
+
+def _scalars(stats):
+    return {(key, metric): value for key, metric, value in scalar_rows(stats) if value is not None}
+
+
+def test_schema_and_variants(tmp_path):
+    path = str(tmp_path / 'results.db')
+    results_store.connect(path).close()
+    conn = sqlite3.connect(path)
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    conn.close()
+    assert {'runs', 'metrics', 'series', 'idx_metrics_key', 'idx_metrics_variant', 'idx_series_run'} <= names
+    assert results_store.load_stats(path=path) == (None, {})
+    assert results_store.load_run(path=path) is None
+
+    assert [results_store.flow_variant(key) for key in ('reno_cwnd', 'comp2_rx', 'flowmon.udp1', 'fairness')] \
+        == ['reno', 'newreno', 'udp', None]
+
+
+def test_round_trip(analyzed, tmp_path):
+    path = str(tmp_path / 'results.db')
+    run_id = analyzed.save_results(path, label='base', params={'seed': 3})
+    loaded_id, stats = results_store.load_stats(path=path)
+    assert loaded_id == run_id
+
+    expected = _scalars(analyzed.stats)
+    actual = _scalars(stats)
+    assert set(expected) == set(actual)
+    for name, value in expected.items():
+        assert actual[name] == pytest.approx(value), name
+        assert type(actual[name]) is type(value), name  # bytes, số gói giữ kiểu int
+
+    series = analyzed.stats['reno_rx']['windowed_throughput']
+    assert np.allclose(stats['reno_rx']['windowed_throughput'].index, series.index)
+    assert np.allclose(stats['reno_rx']['windowed_throughput'].values, series.values)
+    fairness, original = stats['fairness'], analyzed.stats['fairness']
+    assert fairness['flow_keys'] == original['flow_keys']
+    assert fairness['flow_names'] == original['flow_names']
+    for name in ('starts', 'jain', 'udp_share', 'active_flows', 'share', 'mean_share'):
+        assert np.allclose(fairness[name], original[name], equal_nan=True), name
+
+    run = results_store.load_run(run_id, path)
+    assert run['label'] == 'base' and run['params']['seed'] == 3
+    assert run['params']['stats_window'] == analyzed.STATS_WINDOW
+
+
+def test_queries_across_runs(analyzed, tmp_path):
+    path = str(tmp_path / 'results.db')
+    first = analyzed.save_results(path, label='a')
+    second = analyzed.save_results(path, label='b')
+    runs = results_store.list_runs(path)
+    assert list(runs['run_id']) == [first, second] and list(runs['label']) == ['a', 'b']
+    assert results_store.load_stats(path=path)[0] == second
+
+    newreno = results_store.query_metric('avg_throughput', variant='newreno', path=path)
+    assert set(newreno['key']) == {'newreno_rx', 'comp1_rx', 'comp2_rx'}
+    assert len(newreno) == 6
+    reno = results_store.query_metric('total_bytes', key='reno_rx', path=path)
+    assert list(reno['run_id']) == [first, second]
+    assert list(reno['value']) == [analyzed.stats['reno_rx']['total_bytes']] * 2
+    shares = results_store.query_metric(results_store.SHARE_METRIC, variant='udp', path=path)
+    assert set(shares['key']) == {'udp1_rx', 'udp2_rx'}
+
+
+def test_cli_store_and_from_store(synthetic_run, tmp_path):
+    run_dir = str(tmp_path / 'run')
+    shutil.copytree(synthetic_run, run_dir)
+    analyze_complete.main(['--stats-only', '--data-dir', run_dir])
+    assert not os.path.exists(os.path.join(run_dir, results_store.DEFAULT_DB))  # không --store: không lưu
+
+    analyze_complete.main(['--stats-only', '--data-dir', run_dir, '--store', '--label', 'cli'])
+    path = os.path.join(run_dir, results_store.DEFAULT_DB)
+    assert results_store.load_run(path=path)['label'] == 'cli'
+
+    cwd = os.getcwd()
+    os.chdir(tmp_path)  # báo cáo ghi vào thư mục hiện tại
+    try:
+        analyze_complete.main(['--from-store', '--data-dir', run_dir, '--stats-csv', 'stats.csv'])
+        summary = plot_comparison.stored_summary(run_dir, path)
+    finally:
+        os.chdir(cwd)
+    assert (tmp_path / 'stats.csv').exists()
+
+    _, stats = results_store.load_stats(path=path)
+    assert summary['reno'] == [stats['reno_rx']['total_mb'], stats['reno_cwnd']['avg_cwnd_kb'],
+                               stats['reno_rx']['avg_throughput']]
+    assert plot_comparison.stored_summary(synthetic_run, path) is None  # thư mục trace khác
+
+
+def test_stored_summary_skips_time_range(analyzed, tmp_path):
+    path = str(tmp_path / 'results.db')
+    analyzed.save_results(path, params={'time_range': [60, 140]})
+    assert plot_comparison.stored_summary(analyzed.data_dir, path) is None
+    analyzed.save_results(path)
+    assert plot_comparison.stored_summary(analyzed.data_dir, path)['newreno'][0] \
+        == pytest.approx(analyzed.stats['newreno_rx']['total_mb'])
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Số đo từng bước: thời gian, RSS của tiến trình, đỉnh tracemalloc lồng nhau"""
+
+import json
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import stage_profiler
+from analyze_complete import TCPAnalyzer
+
+
+def test_stage_records():
+    profiler = stage_profiler.StageProfiler()
+    with profiler.stage('alloc', rows=10) as record:
+        data = np.ones(20_000_000)  # 160 MB, đẩy đỉnh RSS lên
+        record['extra'] = int(data.sum())
+    del data
+    (record,) = profiler.stages
+    assert record['stage'] == 'alloc' and record['rows'] == 10 and record['extra'] == 20_000_000
+    assert record['wall_s'] >= 0 and record['cpu_s'] >= 0
+    # Đỉnh RSS của cả tiến trình: ít nhất bằng mảng vừa cấp phát; phần tăng phụ
+    # thuộc các test chạy trước nên chỉ kiểm tra không âm
+    assert record['max_rss_so_far_mb'] > 160
+    assert record['rss_growth_mb'] >= 0
+
+
+def test_without_resource_module(monkeypatch, capsys):
+    monkeypatch.setattr(stage_profiler, 'resource', None)
+    _, metrics = stage_profiler.measure(sum, [1, 2])
+    assert metrics['max_rss_so_far_mb'] is None and metrics['rss_growth_mb'] is None
+    profiler = stage_profiler.StageProfiler()
+    profiler.record('read', metrics, rows=2)
+    profiler.summary()
+    assert 'read' in capsys.readouterr().out
+
+
+def test_nested_tracemalloc_peaks():
+    assert not tracemalloc.is_tracing()
+    profiler = stage_profiler.StageProfiler(trace_memory=True)
+    with profiler.stage('outer'):
+        big = bytearray(30_000_000)
+        del big
+        result, inner = stage_profiler.measure(lambda: len(bytearray(5_000_000)), trace_memory=True)
+    assert result == 5_000_000
+    outer = profiler.stages[0]
+    assert 4.9 < inner['tracemalloc_peak_mb'] < 29
+    # Phép đo lồng bên trong đã reset_peak(), nhưng đỉnh 30 MB trước đó vẫn được giữ
+    assert outer['tracemalloc_peak_mb'] >= 30
+    assert not tracemalloc.is_tracing()
+
+
+def test_run_full_analysis_profile(synthetic_run, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    analyzer = TCPAnalyzer(use_cache=False, data_dir=synthetic_run)
+    analyzer.run_full_analysis(profile_output='profile.json', stats_only=True)
+    profile = json.loads((tmp_path / 'profile.json').read_text())
+    stages = {record['stage']: record for record in profile['stages']}
+    assert {'load_all_data', 'calculate_statistics', 'load_flowmon_statistics'} <= set(stages)
+    reads = [record for name, record in stages.items() if name.startswith('read:')]
+    assert len(reads) == len(TCPAnalyzer.TRACE_FILES)
+    assert stages['load_all_data']['rows'] == sum(record['rows'] for record in reads)
+    for record in profile['stages']:
+        assert record['rss_growth_mb'] is None or record['rss_growth_mb'] >= 0
+
+
+def test_cprofile_to(tmp_path):
+    with stage_profiler.cprofile_to(None):
+        pass
+    path = tmp_path / 'run.prof'
+    with stage_profiler.cprofile_to(str(path)):
+        sum(range(1000))
+    assert path.stat().st_size > 0
+    pstats = pytest.importorskip('pstats')
+    assert pstats.Stats(str(path)).total_calls > 0
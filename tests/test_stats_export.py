@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Chế độ --stats-only: không import bộ vẽ, ghi self.stats ra JSON/CSV"""
+
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+import stats_export
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_to_jsonable():
+    obj = {1: np.array([1.5, np.nan]), 'n': np.int16(3), 'ok': np.bool_(True),
+           's': pd.Series([2.0], index=[0.5]), 'inf': float('inf'), 't': (np.float32(0.25),)}
+    assert stats_export.to_jsonable(obj) == {
+        '1': [1.5, None], 'n': 3, 'ok': True, 's': {'index': [0.5], 'values': [2.0]},
+        'inf': None, 't': [0.25]}
+    json.dumps(stats_export.to_jsonable(obj), allow_nan=False)
+
+
+def test_scalar_rows_flattens_nested():
+    stats = {'reno_rx': {'mean': 1.0, 'series': np.arange(3), 'events': {'loss_events': 2}},
+             'fairness': {'flow_names': ['a'], 'mean_jain': np.float64(0.5)}}
+    assert stats_export.scalar_rows(stats) == [
+        ('reno_rx', 'mean', 1.0), ('reno_rx.events', 'loss_events', 2), ('fairness', 'mean_jain', 0.5)]
+
+
+def test_stats_only_cli_skips_plotting_stack(synthetic_run, tmp_path):
+    run_dir = tmp_path / 'run'
+    shutil.copytree(synthetic_run, run_dir)
+    json_file, csv_file = tmp_path / 'stats.json', tmp_path / 'stats.csv'
+    code = ("import sys, analyze_complete\n"
+            f"analyze_complete.main(['--stats-only', '--data-dir', {str(run_dir)!r}, "
+            f"'--stats-json', {str(json_file)!r}, '--stats-csv', {str(csv_file)!r}])\n"
+            "loaded = [m for m in ('matplotlib', 'seaborn') if m in sys.modules]\n"
+            "assert not loaded, loaded\n")
+    subprocess.run([sys.executable, '-c', code], cwd=REPO, check=True, capture_output=True)
+
+    assert not list(run_dir.glob('*.png')) and not list(run_dir.glob('*.txt'))
+    stats = json.loads(json_file.read_text(encoding='utf-8'))
+    assert 'newreno_rx' in stats and 'fairness' in stats
+    with open(csv_file, encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    metrics = {(row['key'], row['metric']): row['value'] for row in rows}
+    assert float(metrics[('newreno_rx', 'total_bytes')]) == stats['newreno_rx']['total_bytes']
+    assert ('fairness', 'mean_jain') in metrics
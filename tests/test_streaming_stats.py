@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Thống kê streaming theo chunk phải trùng với calculate_statistics trên cùng trace"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import streaming_stats
+from analyze_complete import TCPAnalyzer
+
+
+def assert_same(expected, actual, path='stats'):
+    """So sánh đệ quy dict/Series/mảng/số (float so gần đúng, NaN bằng NaN)"""
+    if isinstance(expected, dict):
+        assert set(expected) == set(actual), path
+        for key in expected:
+            assert_same(expected[key], actual[key], f'{path}[{key!r}]')
+    elif isinstance(expected, pd.Series):
+        assert np.allclose(expected.index, actual.index), path
+        assert np.allclose(expected.values, actual.values), path
+    elif isinstance(expected, (np.ndarray, list)) and np.asarray(expected).dtype.kind in 'fiub':
+        assert np.allclose(expected, actual, equal_nan=True), path
+    elif isinstance(expected, (float, np.floating)):
+        assert actual == pytest.approx(expected, nan_ok=True), path
+    else:
+        assert np.array_equal(np.asarray(expected), np.asarray(actual)), path
+
+
+@pytest.mark.parametrize('chunk_size', [997, 10**6])
+def test_streaming_matches_in_memory(synthetic_run, chunk_size):
+    in_memory = TCPAnalyzer(use_cache=False, data_dir=synthetic_run)
+    in_memory.load_all_data(workers=1)
+    in_memory.calculate_statistics()
+
+    streaming = TCPAnalyzer(use_cache=False, data_dir=synthetic_run)
+    streaming.calculate_statistics_streaming(chunk_size=chunk_size)
+
+    assert set(in_memory.stats) == set(streaming.stats)
+    assert_same(in_memory.stats, streaming.stats)
+
+
+def test_running_moments_chunked():
+    values = np.random.default_rng(1).integers(1000, 200000, 5000)
+    moments = streaming_stats.RunningMoments()
+    for chunk in np.array_split(values, [1, 2, 700, 701, 3000]):
+        moments.update(chunk)
+    assert moments.count == len(values)
+    assert (moments.min, moments.max) == (values.min(), values.max())
+    assert moments.mean == pytest.approx(values.mean())
+    assert moments.std == pytest.approx(values.std(ddof=1))
+
+
+def test_rx_memory_is_one_bucket_per_window():
+    stats = streaming_stats.RxStreamingStats(window_size=5.0)
+    times = np.sort(np.random.default_rng(2).uniform(0, 100, 50000))
+    for chunk in np.array_split(np.arange(len(times)), 17):
+        stats.update(times[chunk], np.full(len(chunk), 1448))
+    assert stats.index.n_buckets <= 20
+    assert stats.result('x')['total_bytes'] == 1448 * len(times)
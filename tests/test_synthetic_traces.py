@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Trace tổng hợp: đủ file, đúng định dạng, tái lập được theo seed"""
+
+import os
+
+import numpy as np
+import pytest
+
+import synthetic_traces
+import trace_reader
+from analyze_complete import TCPAnalyzer
+
+
+def test_parse_size():
+    assert synthetic_traces.parse_size('10M') == 10_000_000
+    assert synthetic_traces.parse_size('500k') == 500_000
+    assert synthetic_traces.parse_size('1.5m') == 1_500_000
+    assert synthetic_traces.parse_size(1234) == 1234
+
+
+def test_generate(tmp_path):
+    written = synthetic_traces.generate(str(tmp_path), rows=1000, competing=3, duration_scale=0.2,
+                                        all_rx=True)
+    names = {os.path.basename(name) for name in written}
+    assert {name for name, _ in TCPAnalyzer.TRACE_FILES.values()} <= names
+    assert {'enterprise-comp3-newreno-rx.data', 'enterprise-all-rx.data'} <= names
+
+    for filename, rows in written.items():
+        if filename.endswith('all-rx.data'):
+            continue
+        times, values = trace_reader.read_trace(filename)
+        assert len(times) == rows
+        assert np.all(np.diff(times) >= 0)
+        assert np.all(values > 0)
+        if filename.endswith('-rx.data') and 'udp' not in filename:
+            assert rows == 1000
+            assert np.all(values <= synthetic_traces.MSS)
+
+    # Lịch luồng bị co theo duration_scale: Reno chạy 60-140 s * 0.2
+    times, _ = trace_reader.read_trace(str(tmp_path / 'enterprise-reno-rx.data'))
+    assert 12.0 <= times[0] and times[-1] <= 28.0 + synthetic_traces.RTT
+    all_rows = written[str(tmp_path / 'enterprise-all-rx.data')]
+    assert all_rows == sum(rows for name, rows in written.items() if name.endswith('-rx.data')
+                           and 'all-rx' not in name and 'comp3' not in name)
+
+
+def test_seed_is_reproducible(tmp_path):
+    for run in ('a', 'b', 'c'):
+        synthetic_traces.generate(str(tmp_path / run), rows=500, duration_scale=0.1,
+                                  seed=1 if run == 'c' else 0)
+    name = 'enterprise-main-newreno-cwnd.data'
+    a, b, c = ((tmp_path / run / name).read_bytes() for run in ('a', 'b', 'c'))
+    assert a == b and a != c
+
+
+def test_binned_preserves_bytes(tmp_path):
+    plain = synthetic_traces.generate(str(tmp_path / 'plain'), rows=2000, duration_scale=0.1)
+    binned = synthetic_traces.generate(str(tmp_path / 'binned'), rows=2000, duration_scale=0.1,
+                                       bin_width=0.01)
+    assert len(plain) == len(binned)
+    for name in ('enterprise-reno-rx.data', 'enterprise-udp1-rx.data'):
+        _, nbytes = trace_reader.read_trace(str(tmp_path / 'plain' / name))
+        starts, binned_bytes, packets = trace_reader.read_binned_trace(str(tmp_path / 'binned' / name))
+        assert trace_reader.bin_width(str(tmp_path / 'binned' / name)) == pytest.approx(0.01)
+        assert binned_bytes.sum() == nbytes.sum() and packets.sum() == len(nbytes)
+        assert np.all(np.diff(starts) > 0)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Chỉ mục throughput: truy vấn khoảng/cửa sổ khớp cách tính trực tiếp trên mẫu"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from throughput_index import BASE_WIDTH, ThroughputIndex
+
+
+def _samples(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    times = np.sort(rng.uniform(0.0, 120.0, n))
+    return times, rng.choice([40, 536, 1448], n), rng.integers(1, 4, n)
+
+
+def test_range_sum():
+    times, nbytes, _ = _samples()
+    index = ThroughputIndex.from_samples(times, nbytes)
+    rng = np.random.default_rng(1)
+    for t0, t1 in np.sort(rng.integers(0, 130 * 1024, (50, 2)), axis=1) * BASE_WIDTH:
+        mask = (times >= t0) & (times < t1)
+        assert index.range_sum(t0, t1) == (nbytes[mask].sum(), mask.sum())
+    assert index.range_sum(5.0, 5.0) == (0, 0)
+    assert index.range_throughput(0.0, 120.0) == pytest.approx(nbytes.sum() * 8 / 120e6, rel=1e-3)
+
+
+@pytest.mark.parametrize('window', [1.0, 5.0, 0.5])
+def test_windows_match_groupby(window):
+    times, nbytes, _ = _samples()
+    index = ThroughputIndex.from_samples(times, nbytes)
+    expected = pd.Series(nbytes).groupby((times // window) * window).sum()
+    starts, sums = index.active_windows(window)
+    assert np.allclose(starts, expected.index) and np.array_equal(sums, expected.values)
+
+    starts, sums, counts = index.window_sums(window)
+    dense = pd.Series(sums, index=starts)
+    assert np.array_equal(dense[dense.index.isin(expected.index)].values, expected.values)
+    assert sums.sum() == nbytes.sum() and counts.sum() == len(times)
+    _, throughput = index.window_throughput(window, 10.0, 20.0)
+    assert len(throughput) == round(10 / window)
+
+
+def test_chunked_and_out_of_order_updates():
+    times, nbytes, packets = _samples()
+    full = ThroughputIndex.from_samples(times, nbytes, packets)
+    chunked = ThroughputIndex()
+    for chunk in np.array_split(np.arange(len(times)), [1, 2, 5000, 5001, 13000]):
+        chunked.update(times[chunk], nbytes[chunk], packets[chunk])
+    assert np.array_equal(chunked.ids, full.ids)
+    assert np.array_equal(chunked.cum_bytes, full.cum_bytes)
+    assert np.array_equal(chunked.cum_counts, full.cum_counts)
+
+    # Khối đến không theo thứ tự thời gian được trộn vào chỉ mục
+    shuffled = ThroughputIndex()
+    for chunk in np.array_split(np.random.default_rng(2).permutation(len(times)), 7):
+        shuffled.update(times[chunk], nbytes[chunk], packets[chunk])
+    assert np.array_equal(shuffled.ids, full.ids)
+    assert np.array_equal(shuffled.cum_bytes, full.cum_bytes)
+    assert full.cum_counts[-1] == packets.sum()
+
+
+def test_empty_and_end_time():
+    index = ThroughputIndex()
+    assert index.end_time == 0.0 and index.range_sum(0, 10) == (0, 0)
+    assert len(index.active_windows(5.0)[0]) == 0
+    index.update(np.array([7.3]), np.array([1448]))
+    assert index.end_time == pytest.approx(7.3, abs=BASE_WIDTH)
+    assert index.window_sums(5.0)[1].tolist() == [0, 1448]
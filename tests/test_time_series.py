@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""TimeSeries: cắt theo khoảng thời gian và ghép asof giống pandas"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analyze_complete import TCPAnalyzer
+from time_series import TimeSeries
+
+
+def _frame(n, seed, start=0.0, stop=100.0):
+    rng = np.random.default_rng(seed)
+    times = np.sort(rng.uniform(start, stop, n))
+    times[10:13] = times[10]  # thời điểm trùng nhau
+    return pd.DataFrame({'time': times, 'value': rng.integers(0, 10**6, n)})
+
+
+def test_slice_matches_mask():
+    frame = _frame(5000, 0)
+    series = TimeSeries(frame)
+    for t0, t1 in ((None, None), (10.0, 20.0), (frame['time'][10], 50.0), (80.0, 500.0), (30.0, 20.0)):
+        mask = np.ones(len(frame), dtype=bool)
+        if t0 is not None:
+            mask &= frame['time'].values >= t0
+        if t1 is not None:
+            mask &= frame['time'].values < t1
+        part = series.slice(t0, t1)
+        assert np.array_equal(part.values('value'), frame['value'].values[mask])
+    assert series.start_time == frame['time'].iloc[0] and series.end_time == frame['time'].iloc[-1]
+
+
+def test_unsorted_frame_is_sorted():
+    frame = _frame(100, 1).sample(frac=1, random_state=0)
+    series = TimeSeries(frame)
+    assert np.all(np.diff(series.times) >= 0)
+    assert sorted(series.values('value')) == sorted(frame['value'])
+
+
+@pytest.mark.parametrize('direction', ['backward', 'forward', 'nearest'])
+@pytest.mark.parametrize('tolerance', [None, 0.05])
+def test_asof_matches_merge_asof(direction, tolerance):
+    left, right = _frame(3000, 2, 5.0, 95.0), _frame(1000, 3)
+    series = TimeSeries(right)
+    actual = series.asof(left['time'].values, 'value', direction, tolerance)
+    expected = pd.merge_asof(left[['time']], right, on='time', direction=direction,
+                             tolerance=tolerance, allow_exact_matches=True)['value'].values
+    if direction == 'nearest':
+        # Cách phá hòa có thể khác pandas: chỉ so khoảng cách tới mẫu được chọn
+        pos = series.positions(left['time'].values, direction, tolerance)
+        matched = pos >= 0
+        assert np.array_equal(matched, ~np.isnan(expected))
+        gaps = np.abs(series.times[pos[matched]] - left['time'].values[matched])
+        best = np.abs(right['time'].values[None, :] - left['time'].values[matched][:, None]).min(axis=1)
+        assert np.allclose(gaps, best)
+    else:
+        assert np.array_equal(actual, expected, equal_nan=True)
+
+
+def test_join_and_empty():
+    left, right = _frame(200, 4), _frame(50, 5)
+    times, columns = TimeSeries(left).join(TimeSeries(right.rename(columns={'value': 'other'})),
+                                           ['value'], ['other'], tolerance=0.5)
+    assert len(times) == len(columns['value']) == len(columns['other']) <= len(left)
+    empty = TimeSeries(pd.DataFrame({'time': np.zeros(0)}))
+    assert empty.empty and empty.end_time == 0.0
+    assert empty.positions([1.0, 2.0]).tolist() == [-1, -1]
+    with pytest.raises(ValueError):
+        empty.positions([1.0], direction='sideways')
+
+
+def test_restrict_time_range(synthetic_run):
+    full = TCPAnalyzer(use_cache=False, data_dir=synthetic_run)
+    full.load_all_data(workers=1)
+    restricted = TCPAnalyzer(use_cache=False, data_dir=synthetic_run)
+    restricted.load_all_data(workers=1)
+    restricted.restrict_time_range(30.0, 70.0)
+    for key, df in full.data.items():
+        mask = (df['time'].values >= 30.0) & (df['time'].values < 70.0)
+        part = restricted.data[key]
+        assert np.array_equal(part['time'].values, df['time'].values[mask]), key
+        if 'bytes' in df:
+            assert np.array_equal(part['bytes'].values, df['bytes'].values[mask])
+            # cumulative_bytes vẫn tính từ đầu trace gốc
+            assert np.array_equal(part['cumulative_bytes'].values, df['cumulative_bytes'].values[mask])
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Timeline utilization phải khớp vòng lặp mặt nạ theo từng giây trước đây"""
+
+import numpy as np
+import pytest
+
+import timeline
+from throughput_index import ThroughputIndex
+
+
+def _flows(seed=0):
+    rng = np.random.default_rng(seed)
+    flows = {}
+    for name, (start, stop) in {'a': (0.3, 40.0), 'b': (10.0, 25.5), 'c': (31.2, 33.0)}.items():
+        times = np.sort(rng.uniform(start, stop, 3000))
+        flows[name] = (times, rng.choice([536, 1448], len(times)))
+    return flows
+
+
+def _mask_loop(flows, bin_width, horizon):
+    """Cách tính cũ: mỗi bin một mặt nạ boolean trên mẫu của từng luồng"""
+    starts = np.arange(0, horizon + bin_width / 2, bin_width)
+    starts = starts[starts <= horizon]
+    total = np.zeros(len(starts))
+    for times, nbytes in flows.values():
+        for i, t in enumerate(starts):
+            mask = (times >= t) & (times < t + bin_width)
+            total[i] += nbytes[mask].sum() * 8 / (bin_width * 1e6)
+    return starts, total
+
+
+def test_matches_mask_loop():
+    flows = _flows()
+    indexes = {name: ThroughputIndex.from_samples(*samples) for name, samples in flows.items()}
+    horizon = max(times[-1] for times, _ in flows.values())
+    for bin_width in (1.0, 0.5, 2.0):
+        starts, per_flow, total = timeline.utilization_timeline(indexes, bin_width, horizon)
+        expected_starts, expected_total = _mask_loop(flows, bin_width, horizon)
+        assert np.allclose(starts, expected_starts)
+        assert np.allclose(total, expected_total)
+        assert np.allclose(sum(per_flow.values()), total)
+
+
+def test_default_horizon_and_empty_flows():
+    flows = _flows(1)
+    indexes = {name: ThroughputIndex.from_samples(*samples) for name, samples in flows.items()}
+    indexes['empty'] = ThroughputIndex()
+    starts, per_flow, total = timeline.utilization_timeline(indexes)
+    assert 'empty' not in per_flow
+    assert starts[-1] == 39.0  # cuối dữ liệu ~40 s
+    assert total.sum() * 1e6 / 8 == pytest.approx(sum(nbytes.sum() for _, nbytes in flows.values()))
+
+    starts, per_flow, total = timeline.utilization_timeline({'empty': ThroughputIndex()})
+    assert len(starts) == 1 and total.tolist() == [0.0] and per_flow == {}
+
+
+def test_bin_count():
+    assert timeline.bin_count(10.0, 1.0) == 11
+    assert timeline.bin_count(9.99, 1.0) == 10
+    assert timeline.bin_count(5.0, 2.0, t_start=1.0) == 3
+    assert timeline.bin_count(0.5, 1.0, t_start=1.0) == 0
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Định dạng lưu trữ .delta.npz: mã hóa không mất mát và đọc theo khối"""
+
+import json
+
+import numpy as np
+
+import trace_archive
+import trace_reader
+
+
+def _trace(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    times = np.cumsum(rng.integers(1, 1000, n)) * 1e-5
+    values = rng.integers(-5000, 100000, n)  # hiệu âm lẫn dương
+    packets = rng.integers(0, 40, n)
+    return times, values, packets
+
+
+def test_round_trip_blocks(tmp_path):
+    times, values, packets = _trace()
+    path = str(tmp_path / 'rx.data.delta.npz')
+    for block_rows in (7, 1000, trace_archive.BLOCK_ROWS):
+        trace_archive.write_archive(path, times, values, packets, bin_width=0.01,
+                                    codec='zlib', block_rows=block_rows)
+        restored = trace_archive.read_archive(path)
+        assert len(restored) == 3
+        for original, column in zip((times, values, packets), restored):
+            assert np.array_equal(original, column)
+        assert trace_archive.bin_width(path) == 0.01
+
+
+def test_negative_and_wide_deltas(tmp_path):
+    values = np.array([0, -1, 2**40, -2**40, 5, 5, 4], dtype=np.int64)
+    times = np.arange(len(values)) * 0.5
+    path = str(tmp_path / 'cwnd.data.delta.npz')
+    trace_archive.write_archive(path, times, values, block_rows=3)
+    restored_times, restored_values = trace_archive.read_archive(path)
+    assert np.array_equal(restored_times, times)
+    assert np.array_equal(restored_values, values)
+
+
+def test_float64_time_fallback(tmp_path):
+    times, values, _ = _trace()
+    times = times + 1e-12 * np.arange(len(times))  # mịn hơn nano giây
+    path = str(tmp_path / 'cwnd.data.delta.npz')
+    trace_archive.write_archive(path, times, values, block_rows=1000)
+    assert trace_archive.read_meta(path)['columns']['time'] == {'encoding': 'float64'}
+    restored_times, restored_values = trace_archive.read_archive(path)
+    assert np.array_equal(restored_times, times)
+    assert np.array_equal(restored_values, values)
+
+
+def test_empty_trace(tmp_path):
+    path = str(tmp_path / 'empty.data.delta.npz')
+    trace_archive.write_archive(path, [], [])
+    times, values = trace_archive.read_archive(path)
+    assert len(times) == 0 and len(values) == 0
+    assert list(trace_reader.iter_chunks(path, 10)) == []
+
+
+def test_iter_chunks_decodes_blocks(tmp_path):
+    times, values, _ = _trace()
+    path = str(tmp_path / 'rx.data.delta.npz')
+    trace_archive.write_archive(path, times, values, block_rows=1000)
+    chunks = list(trace_reader.iter_chunks(path, 333))
+    assert max(len(chunk_times) for chunk_times, _ in chunks) <= 333
+    assert np.array_equal(np.concatenate([c[0] for c in chunks]), times)
+    assert np.array_equal(np.concatenate([c[1] for c in chunks]), values)
+
+
+def test_reads_version_1(tmp_path):
+    """File phiên bản 1: mỗi cột là một khối, thông tin delta nằm trong cột"""
+    _, values, _ = _trace(100)
+    ticks = np.arange(len(values), dtype=np.int64) * 10_000
+    times = ticks / trace_archive.TIME_RESOLUTION
+    columns, arrays = {}, {}
+    for name, column in (('time', ticks), ('value', values)):
+        first, step, deltas = trace_archive.encode_ints(column)
+        columns[name] = {'encoding': 'delta', 'first': first, 'step': step, 'dtype': deltas.dtype.name}
+        arrays[name] = np.frombuffer(trace_archive.CODECS['zlib'][0](deltas.tobytes()), dtype=np.uint8)
+    meta = {'version': 1, 'rows': len(times), 'codec': 'zlib', 'bin_width': None, 'columns': columns}
+    path = str(tmp_path / 'cwnd.data.delta.npz')
+    with open(path, 'wb') as f:
+        np.savez(f, _meta=np.str_(json.dumps(meta)), **arrays)
+    restored_times, restored_values = trace_archive.read_archive(path)
+    assert np.array_equal(restored_times, times)
+    assert np.array_equal(restored_values, values)
+
+
+def test_trace_name():
+    for name in ('enterprise-reno-rx.data', 'enterprise-reno-rx.data.gz',
+                 'enterprise-reno-rx.data.delta.npz', 'enterprise-reno-rx.bin'):
+        assert trace_reader.trace_name(name) == 'enterprise-reno-rx.data'
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Cache .npz của trace: đọc lại đúng dữ liệu, tự vô hiệu khi file gốc đổi"""
+
+import os
+
+import numpy as np
+
+import trace_cache
+from analyze_complete import TCPAnalyzer
+
+
+def _write(path, rows):
+    with open(path, 'w') as f:
+        f.write(''.join(f'{t}\t{v}\n' for t, v in rows))
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'rx.data')
+    _write(path, [(0.5, 1448)])
+    columns = {'time': np.array([0.5, 1.0]), 'bytes': np.array([1448, 536])}
+    trace_cache.save_cache(path, columns)
+    cached = trace_cache.load_cache(path, ['time', 'bytes'])
+    for name, values in columns.items():
+        assert np.array_equal(cached[name], values)
+    assert trace_cache.load_cache(path, ['time', 'cwnd']) is None  # thiếu cột
+
+
+def test_invalidated_by_rewrite(tmp_path):
+    path = str(tmp_path / 'rx.data')
+    _write(path, [(0.5, 1448)])
+    trace_cache.save_cache(path, {'time': np.array([0.5])})
+    _write(path, [(0.5, 1448), (0.6, 1448)])
+    assert trace_cache.load_cache(path, ['time']) is None
+
+    # Cùng kích thước nhưng mtime khác
+    trace_cache.save_cache(path, {'time': np.array([0.5, 0.6])})
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert trace_cache.load_cache(path, ['time']) is None
+
+
+def test_version_mismatch_and_corrupt_cache(tmp_path, monkeypatch):
+    path = str(tmp_path / 'rx.data')
+    _write(path, [(0.5, 1448)])
+    monkeypatch.setattr(trace_cache, 'CACHE_VERSION', trace_cache.CACHE_VERSION - 1)
+    trace_cache.save_cache(path, {'time': np.array([0.5])})
+    monkeypatch.undo()
+    assert trace_cache.load_cache(path, ['time']) is None
+
+    with open(trace_cache.cache_path(path), 'wb') as f:
+        f.write(b'not a zip file')
+    assert trace_cache.load_cache(path, ['time']) is None
+
+
+def test_analyzer_reads_through_cache(tmp_path):
+    path = str(tmp_path / 'enterprise-reno-rx.data')
+    _write(path, [(1.0, 1448), (1.5, 536), (2.0, 1448)])
+    analyzer = TCPAnalyzer(data_dir=str(tmp_path))
+
+    first = analyzer.read_rx_data(path, 'TCP Reno')
+    assert os.path.exists(trace_cache.cache_path(path))
+    cached = analyzer.read_rx_data(path, 'TCP Reno')
+    for column in ('time', 'bytes', 'cumulative_bytes', 'flow'):
+        assert np.array_equal(first[column].values, cached[column].values)
+
+    _write(path, [(1.0, 1448), (1.5, 536), (2.0, 1448), (2.5, 100)])
+    reread = analyzer.read_rx_data(path, 'TCP Reno')
+    assert list(reread['bytes']) == [1448, 536, 1448, 100]
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""TraceFrame: cột số nguyên thu hẹp, cột dẫn xuất tính khi truy cập, cắt dòng giữ offset"""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import trace_frame
+
+
+@pytest.mark.parametrize('values, dtype', [
+    ([0, 1448, -5], np.int16), ([0, 32768], np.int32), ([-2**31, 2**31 - 1], np.int32),
+    ([0, 2**31], np.int64), ([], np.int64)])
+def test_narrow_int(values, dtype):
+    narrowed = trace_frame.narrow_int(np.array(values, dtype=np.int64))
+    assert narrowed.dtype == dtype
+    assert np.array_equal(narrowed, values)
+
+
+def _rx(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    times = np.cumsum(rng.exponential(0.01, n)) + 0.1
+    nbytes = rng.choice([536, 1448, 30000], n)
+    return times, nbytes, trace_frame.rx_frame(times, nbytes, 'TCP Reno')
+
+
+def test_derived_columns_match_explicit():
+    times, nbytes, df = _rx()
+    cumulative = np.cumsum(nbytes.astype(np.int64))
+    assert df['bytes'].dtype == np.int16 and list(df.columns) == ['time', 'bytes']
+    assert np.array_equal(df['cumulative_bytes'], cumulative)
+    assert np.allclose(df['throughput_mbps'], cumulative * 8 / (times * 1e6))
+    assert np.allclose(df['instant_throughput'], nbytes * 8 / 1e6)
+    assert list(df['flow'].unique()) == ['TCP Reno']
+    assert isinstance(df['cumulative_bytes'], pd.Series) and df['cumulative_bytes'].name == 'cumulative_bytes'
+
+    cwnd = trace_frame.cwnd_frame(times, nbytes * 10, 'TCP Reno')
+    assert cwnd['cwnd'].dtype == np.int32
+    assert np.allclose(cwnd['cwnd_kb'], nbytes * 10 / 1024)
+    assert np.array_equal(cwnd['cwnd'].diff().values[1:], np.diff(nbytes * 10))  # kiểu có dấu: không tràn
+
+    binned = trace_frame.rx_frame(times, nbytes, 'UDP', packets=np.ones(len(times)), bin_width=0.5)
+    assert np.allclose(binned['instant_throughput'], nbytes * 8 / (1e6 * 0.5))
+
+
+def test_contains_and_derivable():
+    _, _, df = _rx(10)
+    assert 'cumulative_bytes' in df and 'flow' in df and 'time' in df
+    assert 'cwnd_kb' not in df and 'nothing' not in df
+    assert not df.derivable('bytes')  # cột đã lưu
+    with pytest.raises(KeyError):
+        df['cwnd_kb']
+
+
+def test_slice_rows_keeps_offset():
+    _, nbytes, df = _rx()
+    cumulative = np.cumsum(nbytes.astype(np.int64))
+    part = trace_frame.slice_rows(df, 300, 700)
+    assert isinstance(part, trace_frame.TraceFrame) and part.attrs['flow'] == 'TCP Reno'
+    assert np.array_equal(part['cumulative_bytes'], cumulative[300:700])
+    nested = trace_frame.slice_rows(part, 100, 200)
+    assert np.array_equal(nested['cumulative_bytes'], cumulative[400:500])
+
+    # Lọc theo thời gian và pickle (worker vẽ) vẫn là TraceFrame
+    restored = pickle.loads(pickle.dumps(df[df['time'] > 1.0]))
+    assert isinstance(restored, trace_frame.TraceFrame)
+    assert 'throughput_mbps' in restored and restored.attrs['flow'] == 'TCP Reno'
+
+
+def test_memory_smaller_than_full_frame():
+    times, nbytes, df = _rx(100_000)
+    full = pd.DataFrame({'time': times, 'bytes': nbytes.astype(np.int64),
+                         'cumulative_bytes': np.cumsum(nbytes), 'throughput_mbps': df['throughput_mbps'].values,
+                         'instant_throughput': df['instant_throughput'].values,
+                         'flow': np.full(len(times), 'TCP Reno', dtype=object)})
+    compact = df.memory_usage(index=False, deep=True).sum()
+    assert compact == len(times) * 10
+    assert compact * 4 < full.memory_usage(index=False, deep=True).sum()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Các backend của trace_reader cho cùng kết quả; đọc file nén; chọn backend 'auto'"""
+
+import gzip
+import lzma
+import os
+
+import numpy as np
+import pytest
+
+import trace_reader
+
+ROWS = [(0.001, 1448), (0.0025, 536), (1.5, 1448), (2.000001, 40)]
+TEXT = ''.join(f'{t}\t{v}\n' for t, v in ROWS)
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / 'enterprise-reno-rx.data'
+    path.write_text(TEXT)
+    return str(path)
+
+
+@pytest.mark.parametrize('backend', ['pandas', 'numpy', 'stdlib'])
+def test_backends_agree(trace_file, backend):
+    times, values = trace_reader.read_trace(trace_file, backend)
+    assert list(times) == [t for t, _ in ROWS]
+    assert list(values) == [v for _, v in ROWS]
+    chunks = list(trace_reader.iter_chunks(trace_file, 3, backend))
+    assert [len(chunk_times) for chunk_times, _ in chunks] == [3, 1]
+    assert [v for _, chunk_values in chunks for v in chunk_values] == [v for _, v in ROWS]
+
+
+@pytest.mark.parametrize('backend', ['pandas', 'numpy', 'stdlib'])
+def test_empty_file(tmp_path, backend):
+    path = tmp_path / 'empty.data'
+    path.touch()
+    times, values = trace_reader.read_trace(str(path), backend)
+    assert len(times) == 0 and len(values) == 0
+    assert list(trace_reader.iter_chunks(str(path), 10, backend)) == []
+
+
+@pytest.mark.parametrize('suffix, opener', [('.gz', gzip.open), ('.xz', lzma.open)])
+def test_compressed(tmp_path, suffix, opener):
+    path = str(tmp_path / 'enterprise-reno-rx.data') + suffix
+    with opener(path, 'wt') as f:
+        f.write(TEXT)
+    for backend in ('pandas', 'numpy', 'stdlib'):
+        assert list(trace_reader.read_trace(path, backend)[1]) == [v for _, v in ROWS]
+    assert not trace_reader.is_empty(path)
+
+
+def test_find_trace_prefers_newest_variant(trace_file):
+    assert trace_reader.find_trace(trace_file) == trace_file
+    with gzip.open(trace_file + '.gz', 'wt') as f:
+        f.write(TEXT)
+    st = os.stat(trace_file)
+    os.utime(trace_file + '.gz', ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert trace_reader.find_trace(trace_file) == trace_file + '.gz'
+    os.remove(trace_file)
+    assert trace_reader.find_trace(trace_file) == trace_file + '.gz'
+    assert trace_reader.find_trace(trace_file + '.gz') == trace_file + '.gz'
+
+
+def test_parse_text():
+    times, values = trace_reader.parse_text(TEXT)
+    assert times.dtype == np.float64 and values.dtype == np.int64
+    assert list(values) == [v for _, v in ROWS]
+    times, values, packets = trace_reader.parse_text(b'0.01\t2896\t2\n0.02\t1448\t1\n', columns=3)
+    assert list(packets) == [2, 1]
+    assert len(trace_reader.parse_text('')[0]) == 0
+    with pytest.raises(ValueError):
+        trace_reader.parse_text('1.0\t1448\n2.0\n')
+    with pytest.raises(ValueError):
+        trace_reader.parse_text('1.0\t1448\t1\n', columns=2)
+
+
+def test_binned_trace(tmp_path):
+    path = tmp_path / 'enterprise-reno-rx.data'
+    path.write_text('# binned bin_width=0.01\n0\t2896\t2\n0.05\t1448\t1\n')
+    assert trace_reader.bin_width(str(path)) == 0.01
+    for backend in ('pandas', 'numpy', 'stdlib'):
+        times, nbytes, packets = trace_reader.read_binned_trace(str(path), backend)
+        assert list(times) == [0.0, 0.05] and list(nbytes) == [2896, 1448] and list(packets) == [2, 1]
+        assert list(trace_reader.read_trace(str(path), backend)[1]) == [2896, 1448]
+
+
+def test_resolve_backend(monkeypatch):
+    monkeypatch.setattr(trace_reader, '_auto_backend', None)
+    calls = []
+    monkeypatch.setattr(trace_reader, 'measure_backends',
+                        lambda backends: calls.append(backends) or {'pandas': 2e-7, 'numpy': 1e-7})
+    assert trace_reader.resolve_backend('auto') == 'numpy'
+    assert trace_reader.resolve_backend('auto') == 'numpy'
+    assert calls == [['pandas', 'numpy']]  # đo một lần, không đo stdlib
+    assert trace_reader.resolve_backend('stdlib') == 'stdlib'
+    with pytest.raises(ValueError):
+        trace_reader.resolve_backend('polars')
+
+
+def test_measure_backends():
+    timings = trace_reader.measure_backends(['numpy', 'stdlib'], n_rows=500, repeat=1)
+    assert set(timings) == {'numpy', 'stdlib'}
+    assert all(value >= 0 for value in timings.values())
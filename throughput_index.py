@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chỉ mục throughput thưa cho một luồng rx
+Trục thời gian được chia thành các bucket rộng BASE_WIDTH = 1/1024 giây (~1 ms),
+nhưng chỉ các bucket có gói được lưu: mã bucket (tăng dần) cùng tổng tích lũy
+bytes và số gói. Bộ nhớ vì vậy tỉ lệ với số bucket có dữ liệu (không quá số
+gói), không phụ thuộc thời lượng trace. Độ rộng bucket là lũy thừa của 2 nên
+phép chia thời gian là chính xác: cửa sổ 5 giây gồm đúng 5120 bucket và khớp
+với cách chia (time // 5) * 5 của pandas.
+
+Tổng bytes/số gói của một khoảng thời gian bất kỳ là hiệu hai tổng tích lũy,
+tìm bằng searchsorted trong O(log n); throughput theo cửa sổ lấy từ các biên
+cửa sổ theo cùng cách. Các khối đến theo thứ tự thời gian (streaming, live
+tail) chỉ được nối thêm vào cuối, không xây lại chỉ mục.
+"""
+
+import numpy as np
+
+BASE_WIDTH = 1.0 / 1024  # giây; lũy thừa của 2 để t / BASE_WIDTH không sai số làm tròn
+
+
+class ThroughputIndex:
+    """Tổng tích lũy bytes và số gói theo các bucket có dữ liệu, cập nhật được theo từng khối"""
+
+    def __init__(self, base_width=BASE_WIDTH):
+        self.base_width = base_width
+        # Có thể dài hơn n_buckets (dự trữ để nối thêm không cấp phát lại mỗi lần)
+        self._ids = np.zeros(0, dtype=np.int64)         # Mã bucket, tăng dần
+        self._cum_bytes = np.zeros(0, dtype=np.int64)   # Tổng bytes tới hết bucket i
+        self._cum_counts = np.zeros(0, dtype=np.int64)
+        self.n_buckets = 0  # Số bucket có dữ liệu
+
+    @classmethod
+    def from_samples(cls, times, nbytes, packets=None, base_width=BASE_WIDTH):
+        """Xây chỉ mục từ toàn bộ mẫu của một luồng"""
+        index = cls(base_width)
+        index.update(times, nbytes, packets)
+        return index
+
+    def bucket(self, t):
+        """Mã bucket chứa thời điểm t"""
+        # floor_divide như phép // của pandas (chính xác cả khi base_width không phải lũy thừa của 2)
+        return np.floor_divide(np.asarray(t, dtype=np.float64), self.base_width).astype(np.int64)
+
+    @property
+    def ids(self):
+        return self._ids[:self.n_buckets]
+
+    @property
+    def cum_bytes(self):
+        return self._cum_bytes[:self.n_buckets]
+
+    @property
+    def cum_counts(self):
+        return self._cum_counts[:self.n_buckets]
+
+    def update(self, times, nbytes, packets=None):
+        """Cộng thêm các mẫu (thời điểm >= 0); packets = số gói mỗi dòng (trace gom bin)"""
+        if len(times) == 0:
+            return
+        ids, inverse = np.unique(self.bucket(times), return_inverse=True)
+        sums = np.bincount(inverse, weights=nbytes).astype(np.int64)
+        counts = (np.bincount(inverse) if packets is None
+                  else np.bincount(inverse, weights=packets).astype(np.int64))
+
+        n = self.n_buckets
+        if n and ids[0] < self._ids[n - 1]:
+            self._merge(ids, sums, counts)
+            return
+        if n and ids[0] == self._ids[n - 1]:
+            # Bucket ở biên hai khối: cộng vào bucket cuối, phần còn lại nối thêm
+            self._cum_bytes[n - 1] += sums[0]
+            self._cum_counts[n - 1] += counts[0]
+            ids, sums, counts = ids[1:], sums[1:], counts[1:]
+        self._append(ids, sums, counts)
+
+    def _append(self, ids, sums, counts):
+        n, m = self.n_buckets, len(ids)
+        if n + m > len(self._ids):
+            # Tăng gấp đôi dung lượng để cập nhật liên tục (live tail) không cấp phát lại mỗi lần
+            capacity = max(n + m, 2 * len(self._ids))
+            self._ids, self._cum_bytes, self._cum_counts = (
+                np.concatenate([arr[:n], np.zeros(capacity - n, np.int64)])
+                for arr in (self._ids, self._cum_bytes, self._cum_counts))
+        last_bytes = self._cum_bytes[n - 1] if n else 0
+        last_counts = self._cum_counts[n - 1] if n else 0
+        self._ids[n:n + m] = ids
+        self._cum_bytes[n:n + m] = last_bytes + np.cumsum(sums)
+        self._cum_counts[n:n + m] = last_counts + np.cumsum(counts)
+        self.n_buckets = n + m
+
+    def _merge(self, ids, sums, counts):
+        """Khối có thời điểm trước bucket cuối (hiếm): gộp lại toàn bộ chỉ mục"""
+        old_sums = np.diff(self.cum_bytes, prepend=0)
+        old_counts = np.diff(self.cum_counts, prepend=0)
+        all_ids, inverse = np.unique(np.concatenate([self.ids, ids]), return_inverse=True)
+        merged_sums = np.bincount(inverse, weights=np.concatenate([old_sums, sums])).astype(np.int64)
+        merged_counts = np.bincount(inverse, weights=np.concatenate([old_counts, counts])).astype(np.int64)
+        self.n_buckets = 0
+        self._append(all_ids, merged_sums, merged_counts)
+
+    @property
+    def end_time(self):
+        """Thời điểm kết thúc bucket cuối cùng có dữ liệu"""
+        return (int(self._ids[self.n_buckets - 1]) + 1) * self.base_width if self.n_buckets else 0.0
+
+    def _prefix(self, bucket_edges):
+        """(bytes, counts) tích lũy trước các biên bucket (mảng mã bucket)"""
+        pos = np.searchsorted(self.ids, bucket_edges, side='left')
+        before = np.maximum(pos - 1, 0)
+        return (np.where(pos > 0, self._cum_bytes[before], 0),
+                np.where(pos > 0, self._cum_counts[before], 0))
+
+    def range_sum(self, t0, t1):
+        """(tổng bytes, số gói) trong [t0, t1), biên làm tròn theo bucket; O(log n)"""
+        lo, hi = int(self.bucket(t0)), int(self.bucket(t1))
+        if hi <= lo or self.n_buckets == 0:
+            return 0, 0
+        cum_bytes, cum_counts = self._prefix(np.array([lo, hi]))
+        return int(cum_bytes[1] - cum_bytes[0]), int(cum_counts[1] - cum_counts[0])
+
+    def range_throughput(self, t0, t1):
+        """Throughput trung bình (Mbps) trong [t0, t1)"""
+        if t1 <= t0:
+            return 0.0
+        return self.range_sum(t0, t1)[0] * 8 / ((t1 - t0) * 1e6)
+
+    def window_sums(self, window, t_start=0.0, t_end=None):
+        """Tổng bytes và số gói theo các cửa sổ liên tiếp rộng window giây
+
+        Trả về (thời điểm bắt đầu các cửa sổ, bytes, counts) phủ [t_start, t_end)
+        (mặc định tới hết dữ liệu). Biên cửa sổ là bội của base_width (ví dụ
+        cửa sổ 1 s, 5 s) thì chính xác; ngược lại được làm tròn về biên bucket gần nhất.
+        """
+        if t_end is None:
+            t_end = self.end_time
+        n_windows = int(np.ceil((t_end - t_start) / window - 1e-9)) if t_end > t_start else 0
+        starts = t_start + np.arange(n_windows) * window
+        edges = np.round((t_start + np.arange(n_windows + 1) * window) / self.base_width).astype(np.int64)
+        cum_bytes, cum_counts = self._prefix(edges)
+        return starts, np.diff(cum_bytes), np.diff(cum_counts)
+
+    def active_windows(self, window):
+        """(thời điểm bắt đầu, tổng bytes) của các cửa sổ có ít nhất một gói
+
+        Giống df['bytes'].groupby((df['time'] // window) * window).sum(). Chỉ duyệt
+        các bucket có dữ liệu, nên không phụ thuộc thời lượng trace.
+        """
+        if self.n_buckets == 0:
+            return np.zeros(0), np.zeros(0, dtype=np.int64)
+        # Mã cửa sổ của từng bucket, cùng cách làm tròn biên cửa sổ với window_sums
+        windows = np.floor((self.ids + 0.5) * self.base_width / window).astype(np.int64)
+        first = np.flatnonzero(np.diff(windows, prepend=windows[0] - 1))
+        last = np.append(first[1:], self.n_buckets) - 1
+        cum_bytes = self.cum_bytes
+        nbytes = cum_bytes[last] - np.where(first > 0, cum_bytes[first - 1], 0)
+        return windows[first] * window, nbytes
+
+    def window_throughput(self, window, t_start=0.0, t_end=None):
+        """(thời điểm bắt đầu cửa sổ, throughput Mbps) theo cửa sổ window giây"""
+        starts, nbytes, _ = self.window_sums(window, t_start, t_end)
+        return starts, nbytes * 8 / (window * 1e6)
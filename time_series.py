@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chuỗi trace có chỉ mục thời gian đã sắp xếp
+Tính đơn điệu của cột thời gian được kiểm tra một lần khi tạo; sau đó cắt theo
+khoảng thời gian (slice) và ghép hai chuỗi theo thời điểm gần nhất (asof)
+chỉ dùng np.searchsorted, O(log n) mỗi truy vấn, không quét lại toàn bộ trace.
+"""
+
+import numpy as np
+
+DIRECTIONS = ('backward', 'forward', 'nearest')
+
+
+class TimeSeries:
+    """Bọc một DataFrame trace (cột 'time' + các cột giá trị) đã sắp theo thời gian"""
+
+    def __init__(self, frame, time_column='time', validated=False):
+        times = frame[time_column].values
+        if not validated and len(times) > 1 and np.any(times[1:] < times[:-1]):
+            # Trace của ns-3 luôn tăng dần; chỉ sắp lại khi dữ liệu bị trộn (ví dụ ghép nhiều file)
+            frame = frame.iloc[np.argsort(times, kind='stable')].reset_index(drop=True)
+            times = frame[time_column].values
+        self.frame = frame
+        self.time_column = time_column
+        self.times = times
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def empty(self):
+        return len(self.times) == 0
+
+    @property
+    def start_time(self):
+        return float(self.times[0]) if len(self.times) else 0.0
+
+    @property
+    def end_time(self):
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    def bounds(self, t0=None, t1=None):
+        """Vị trí [i0, i1) của các mẫu có t0 <= time < t1 (None = không giới hạn)"""
+        i0 = 0 if t0 is None else int(np.searchsorted(self.times, t0, side='left'))
+        i1 = len(self.times) if t1 is None else int(np.searchsorted(self.times, t1, side='left'))
+        return i0, max(i0, i1)
+
+    def slice(self, t0=None, t1=None):
+        """Chuỗi con trong [t0, t1), không kiểm tra lại thứ tự"""
+        i0, i1 = self.bounds(t0, t1)
+        return TimeSeries(self.frame.iloc[i0:i1], self.time_column, validated=True)
+
+    def values(self, column):
+        """Mảng numpy của một cột"""
+        return self.frame[column].values
+
+    def positions(self, times, direction='backward', tolerance=None):
+        """Vị trí mẫu khớp với từng thời điểm trong times (-1 nếu không có mẫu phù hợp)
+
+        backward: mẫu cuối cùng có time <= t (giá trị đang có hiệu lực tại t)
+        forward: mẫu đầu tiên có time >= t
+        nearest: mẫu gần t nhất (bằng nhau thì lấy mẫu trước)
+        tolerance: bỏ các cặp lệch nhau quá tolerance giây
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction phải là một trong {DIRECTIONS}")
+        times = np.asarray(times, dtype=np.float64)
+        n = len(self.times)
+        if n == 0:
+            return np.full(len(times), -1, dtype=np.int64)
+
+        before = np.searchsorted(self.times, times, side='right') - 1
+        after = np.searchsorted(self.times, times, side='left')
+        if direction == 'backward':
+            pos = before
+        elif direction == 'forward':
+            pos = np.where(after < n, after, -1)
+        else:
+            prev_gap = np.where(before >= 0, times - self.times[np.maximum(before, 0)], np.inf)
+            next_gap = np.where(after < n, self.times[np.minimum(after, n - 1)] - times, np.inf)
+            pos = np.where(prev_gap <= next_gap, before, after)
+            pos = np.where(np.isinf(np.minimum(prev_gap, next_gap)), -1, pos)
+
+        if tolerance is not None:
+            matched = pos >= 0
+            gap = np.full(len(times), np.inf)
+            gap[matched] = np.abs(self.times[pos[matched]] - times[matched])
+            pos = np.where(gap <= tolerance, pos, -1)
+        return pos.astype(np.int64)
+
+    def asof(self, times, column, direction='backward', tolerance=None):
+        """Giá trị cột column tại các thời điểm times (NaN nếu không khớp)"""
+        pos = self.positions(times, direction, tolerance)
+        out = np.full(len(pos), np.nan)
+        matched = pos >= 0
+        out[matched] = self.values(column)[pos[matched]]
+        return out
+
+    def join(self, other, columns, other_columns, direction='nearest', tolerance=None):
+        """Ghép với chuỗi other theo thời điểm của chuỗi này
+
+        Trả về (times, dict cột -> mảng) chỉ gồm các mẫu tìm được mẫu khớp
+        trong other; cột của other được lấy theo direction/tolerance.
+        """
+        pos = other.positions(self.times, direction, tolerance)
+        matched = pos >= 0
+        result = {column: self.values(column)[matched] for column in columns}
+        for column in other_columns:
+            result[column] = other.values(column)[pos[matched]]
+        return self.times[matched], result
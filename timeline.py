@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chuỗi utilization theo thời gian cho biểu đồ mạng
+Mỗi bin của một luồng là throughput trung bình (bytes * 8 / độ rộng bin) lấy từ
+chỉ mục throughput của luồng (throughput_index.ThroughputIndex): mỗi biên bin
+là một searchsorted trên tổng tích lũy, không quét lại mẫu và không tạo mặt nạ
+boolean cho từng giây.
+"""
+
+import numpy as np
+
+
+def bin_count(t_end, bin_width, t_start=0.0):
+    """Số bin cần để phủ [t_start, t_end] với độ rộng bin_width"""
+    if t_end < t_start:
+        return 0
+    return int((t_end - t_start) // bin_width) + 1
+
+
+def utilization_timeline(indexes, bin_width=1.0, horizon=None, t_start=0.0):
+    """Tính utilization theo thời gian cho nhiều luồng
+
+    indexes: dict tên luồng -> ThroughputIndex
+    horizon: thời điểm kết thúc; mặc định lấy cuối dữ liệu của các chỉ mục
+
+    Tổng utilization là tổng throughput các luồng trong từng bin.
+    Trả về (thời điểm bắt đầu các bin, dict utilization từng luồng, tổng utilization).
+    """
+    if horizon is None:
+        horizon = max((index.end_time for index in indexes.values() if index.n_buckets), default=t_start)
+
+    n_bins = bin_count(horizon, bin_width, t_start)
+    bin_starts = t_start + np.arange(n_bins) * bin_width
+
+    per_flow = {}
+    total = np.zeros(n_bins)
+    for name, index in indexes.items():
+        if index.n_buckets == 0:
+            continue
+        _, per_flow[name] = index.window_throughput(bin_width, t_start, t_start + n_bins * bin_width)
+        total += per_flow[name]
+
+    return bin_starts, per_flow, total
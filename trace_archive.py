@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Định dạng lưu trữ nén cho file trace (enterprise-*.data -> *.data.delta.npz)
+Mỗi cột được mã hóa delta trước khi nén:
+  - time: đổi sang số nguyên nano giây (độ phân giải của ns-3), chia cho ước
+    chung lớn nhất của các bước (ví dụ 10 µs khi trace in 5 chữ số thập phân)
+  - value (bytes/cwnd), packets: hiệu giữa hai mẫu liên tiếp
+Dãy hiệu được lưu bằng kiểu nguyên nhỏ nhất vừa (int8/int16/int32) rồi nén
+bằng lzma (mặc định) hoặc zlib, nên trace nhỏ đi ~10 lần; khi đọc chỉ cần giải
+nén và np.cumsum, nhanh gần bằng đọc file nhị phân. Mã hóa không mất mát: nếu
+thời gian không biểu diễn đúng bằng nano giây thì cột time được lưu nguyên float64.
+Mỗi cột được chia thành các khối BLOCK_ROWS dòng nén riêng, mỗi khối có giá trị
+đầu của nó, nên iter_blocks (và trace_reader.iter_chunks) chỉ giải nén một khối
+tại một thời điểm. File phiên bản 1 (cả cột là một khối) vẫn đọc được.
+
+File không phải trace số (FlowMonitor XML, pcap, enterprise-all-rx.data có cột context)
+được nén nguyên dạng thành .xz; trace_reader đọc trực tiếp cả hai loại.
+
+Cách dùng:
+    python3 trace_archive.py                       # mọi enterprise-*.data / *.xml / *.pcap trong thư mục
+    python3 trace_archive.py run1/enterprise-reno-cwnd.data --codec zlib --remove
+"""
+
+import argparse
+import glob
+import json
+import lzma
+import os
+import shutil
+import zlib
+
+import numpy as np
+
+ARCHIVE_SUFFIX = '.delta.npz'
+ARCHIVE_VERSION = 2
+BLOCK_ROWS = 1 << 20  # Số dòng mỗi khối nén
+TIME_RESOLUTION = 1e9  # tick mỗi giây (nano giây, như Time của ns-3)
+
+CODECS = {
+    'lzma': (lambda data: lzma.compress(data, preset=9), lzma.decompress),
+    'zlib': (lambda data: zlib.compress(data, 9), zlib.decompress),
+}
+DELTA_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+# Tên cột theo số cột của trace: (time, value) hoặc trace rx gom bin (time, value, packets)
+COLUMN_NAMES = ('time', 'value', 'packets')
+
+
+def archive_path(filename):
+    return filename + ARCHIVE_SUFFIX
+
+
+def is_archive(filename):
+    return filename.endswith(ARCHIVE_SUFFIX)
+
+
+def _narrow(deltas):
+    low, high = deltas.min(initial=0), deltas.max(initial=0)
+    for dtype in DELTA_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return deltas.astype(dtype)
+    return deltas
+
+
+def encode_ints(values):
+    """Mã hóa delta một cột số nguyên: (giá trị đầu, bước chung, dãy hiệu đã chia bước)"""
+    values = np.asarray(values, dtype=np.int64)
+    if len(values) == 0:
+        return 0, 1, np.empty(0, dtype=np.int8)
+    deltas = np.diff(values)
+    step = int(np.gcd.reduce(deltas)) if len(deltas) else 1
+    step = step or 1
+    return int(values[0]), step, _narrow(deltas // step)
+
+
+def decode_ints(first, step, deltas, n):
+    """Ngược lại của encode_ints, trả về mảng int64 dài n"""
+    values = np.empty(n, dtype=np.int64)
+    if n:
+        values[0] = first
+        np.cumsum(deltas, dtype=np.int64, out=values[1:])
+        values[1:] *= step
+        values[1:] += first
+    return values
+
+
+def _member(meta, name, block):
+    """Tên mảng trong file .npz chứa khối block của cột name"""
+    return name if meta['version'] == 1 else f'{name}_{block}'
+
+
+def write_archive(path, times, values, packets=None, bin_width=None, codec='lzma',
+                  block_rows=BLOCK_ROWS):
+    """Ghi một trace (và cột số gói nếu đã gom bin) ra file lưu trữ, trả về kích thước file"""
+    compress = CODECS[codec][0]
+    times = np.asarray(times, dtype=np.float64)
+    ticks = np.round(times * TIME_RESOLUTION).astype(np.int64)
+    # Thời gian có độ phân giải mịn hơn nano giây: lưu nguyên float64 để không mất mát
+    time_in_ticks = bool(np.array_equal(ticks / TIME_RESOLUTION, times))
+
+    columns = {'time': ticks if time_in_ticks else None, 'value': values}
+    if packets is not None:
+        columns['packets'] = packets
+    meta = {'version': ARCHIVE_VERSION, 'rows': len(times), 'codec': codec,
+            'bin_width': bin_width, 'block_rows': block_rows, 'columns': {}}
+    arrays = {}
+    for name, column in columns.items():
+        if column is None:
+            meta['columns'][name] = {'encoding': 'float64'}
+        else:
+            column = np.asarray(column, dtype=np.int64)
+            meta['columns'][name] = {'encoding': 'delta', 'blocks': []}
+        for block, start in enumerate(range(0, len(times), block_rows)):
+            if column is None:
+                data = times[start:start + block_rows].tobytes()
+            else:
+                # Mỗi khối mã hóa độc lập (giá trị đầu, bước riêng) để giải mã được riêng lẻ
+                first, step, deltas = encode_ints(column[start:start + block_rows])
+                meta['columns'][name]['blocks'].append([first, step, deltas.dtype.name])
+                data = deltas.tobytes()
+            arrays[_member(meta, name, block)] = np.frombuffer(compress(data), dtype=np.uint8)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, _meta=np.str_(json.dumps(meta)), **arrays)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def _load_meta(npz, filename):
+    meta = json.loads(str(npz['_meta']))
+    if meta['version'] == 1:
+        # Phiên bản 1: mỗi cột là một khối duy nhất, thông tin delta nằm ngay trong cột
+        meta['block_rows'] = max(meta['rows'], 1)
+        for info in meta['columns'].values():
+            if info['encoding'] == 'delta':
+                info['blocks'] = [[info['first'], info['step'], info['dtype']]]
+    elif meta['version'] != ARCHIVE_VERSION:
+        raise ValueError(f"File {filename}: phiên bản lưu trữ {meta['version']} không hỗ trợ")
+    return meta
+
+
+def read_meta(filename):
+    with np.load(filename, allow_pickle=False) as npz:
+        return _load_meta(npz, filename)
+
+
+def bin_width(filename):
+    """Độ rộng bin (giây) nếu trace được lưu là trace rx đã gom bin, ngược lại None"""
+    return read_meta(filename)['bin_width']
+
+
+def iter_blocks(filename):
+    """Sinh ra từng khối (times, values) hoặc (times, values, packets); chỉ giải nén một khối mỗi lần"""
+    with np.load(filename, allow_pickle=False) as npz:
+        meta = _load_meta(npz, filename)
+        decompress = CODECS[meta['codec']][1]
+        n, block_rows = meta['rows'], meta['block_rows']
+        for block, start in enumerate(range(0, n, block_rows)):
+            rows = min(block_rows, n - start)
+            result = []
+            for name in COLUMN_NAMES:
+                if name not in meta['columns']:
+                    continue
+                info = meta['columns'][name]
+                data = decompress(npz[_member(meta, name, block)].tobytes())
+                if info['encoding'] == 'float64':
+                    result.append(np.frombuffer(data, dtype=np.float64).copy())
+                    continue
+                first, step, dtype = info['blocks'][block]
+                column = decode_ints(first, step, np.frombuffer(data, dtype=dtype), rows)
+                result.append(column / TIME_RESOLUTION if name == 'time' else column)
+            yield tuple(result)
+
+
+def read_archive(filename):
+    """Đọc file lưu trữ, trả về (times, values) hoặc (times, values, packets) với trace gom bin"""
+    meta = read_meta(filename)
+    result = tuple(np.empty(meta['rows'], dtype=np.float64 if name == 'time' else np.int64)
+                   for name in COLUMN_NAMES if name in meta['columns'])
+    start = 0
+    for block in iter_blocks(filename):
+        for column, values in zip(result, block):
+            column[start:start + len(values)] = values
+        start += len(block[0])
+    return result
+
+
+def compress_raw(filename, remove=False):
+    """Nén nguyên dạng một file (XML, all-rx) thành .xz, trả về đường dẫn file mới"""
+    out = filename + '.xz'
+    with open(filename, 'rb') as src, lzma.open(out, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    if remove:
+        os.remove(filename)
+    return out
+
+
+def archive_trace(filename, codec='lzma', remove=False):
+    """Chuyển một trace văn bản sang định dạng lưu trữ, kiểm tra đọc lại khớp trước khi xóa file gốc"""
+    import trace_reader
+
+    width = trace_reader.bin_width(filename)
+    if width is not None:
+        original = trace_reader.read_binned_trace(filename)
+    else:
+        original = trace_reader.read_trace(filename)
+    original = tuple(np.asarray(column) for column in original)
+    out = archive_path(filename)
+    write_archive(out, *original[:2], packets=original[2] if width is not None else None,
+                  bin_width=width, codec=codec)
+    restored = read_archive(out)
+    if not all(np.array_equal(a, b) for a, b in zip(original, restored)):
+        os.remove(out)
+        raise ValueError(f"File {filename}: dữ liệu đọc lại từ {out} không khớp")
+    if remove:
+        os.remove(filename)
+    return out
+
+
+def is_numeric_trace(filename):
+    """Trace 'time\\tvalue[\\tpackets]' (không phải XML, pcap hay enterprise-all-rx.data)"""
+    import all_rx_demux
+
+    return not filename.endswith(('.xml', '.pcap')) and os.path.basename(filename) != all_rx_demux.ALL_RX_FILE
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Nén trace mô phỏng để lưu trữ/sao chép')
+    parser.add_argument('files', nargs='*', help='File trace (mặc định: enterprise-*.data, *.xml và *.pcap)')
+    parser.add_argument('--codec', choices=sorted(CODECS), default='lzma',
+                        help='Thuật toán nén cho trace số (mặc định lzma)')
+    parser.add_argument('--remove', action='store_true', help='Xóa file gốc sau khi kiểm tra')
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob('enterprise-*.data') + glob.glob('enterprise-*.xml') +
+                                 glob.glob('enterprise-*.pcap'))
+    if not files:
+        print("⚠️  Không có file trace nào")
+        return
+    total_in = total_out = 0
+    for filename in files:
+        if not os.path.exists(filename):
+            print(f"⚠️  File {filename} không tồn tại")
+            continue
+        size = os.path.getsize(filename)
+        try:
+            if is_numeric_trace(filename):
+                out = archive_trace(filename, args.codec, args.remove)
+            else:
+                out = compress_raw(filename, args.remove)
+        except Exception as e:
+            print(f"❌ Lỗi nén file {filename}: {e}")
+            continue
+        out_size = os.path.getsize(out)
+        total_in += size
+        total_out += out_size
+        print(f"✅ Đã lưu: {out} ({size / 1e6:.2f} MB -> {out_size / 1e6:.3f} MB, "
+              f"{size / max(out_size, 1):.1f}x)")
+    if total_out:
+        print(f"📦 Tổng: {total_in / 1e6:.2f} MB -> {total_out / 1e6:.3f} MB ({total_in / total_out:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
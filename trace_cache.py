@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache nhị phân dạng cột cho các file trace .data
+Mỗi file trace có một file cache .npz nằm cạnh nó, lưu các cột gốc đã parse.
+Cache được khóa theo đường dẫn, kích thước và mtime của file gốc nên sẽ tự
+động bị vô hiệu khi mô phỏng ghi lại file.
+"""
+
+import os
+import numpy as np
+
+CACHE_SUFFIX = '.cache.npz'
+# Tăng khi nội dung cache đổi (2: chỉ còn cột gốc, cache cho cả biến thể nén của trace)
+CACHE_VERSION = 2
+
+
+def cache_path(filename):
+    """Đường dẫn file cache tương ứng với một file trace"""
+    return filename + CACHE_SUFFIX
+
+
+def source_key(filename):
+    """Khóa nhận dạng phiên bản file gốc: (đường dẫn tuyệt đối, kích thước, mtime)"""
+    st = os.stat(filename)
+    return os.path.abspath(filename), st.st_size, st.st_mtime_ns
+
+
+def load_cache(filename, columns):
+    """Đọc các cột từ cache nếu cache còn hợp lệ, ngược lại trả về None"""
+    path = cache_path(filename)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        source, size, mtime_ns = source_key(filename)
+        with np.load(path, allow_pickle=False) as npz:
+            if (int(npz['_version']) != CACHE_VERSION or
+                    str(npz['_source']) != source or
+                    int(npz['_size']) != size or
+                    int(npz['_mtime_ns']) != mtime_ns):
+                return None
+            return {col: npz[col] for col in columns}
+    except (OSError, KeyError, ValueError):
+        # Cache hỏng hoặc thiếu cột -> coi như không có cache
+        return None
+
+
+def save_cache(filename, columns, key=None):
+    """Ghi các cột (dict tên -> mảng numpy) vào cache của file trace
+
+    key nên được lấy bằng source_key() *trước* khi đọc file gốc, để nếu file
+    bị ghi lại trong lúc đang đọc thì cache sẽ không khớp ở lần chạy sau.
+    """
+    if key is None:
+        key = source_key(filename)
+    source, size, mtime_ns = key
+
+    path = cache_path(filename)
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.savez(f,
+                     _version=np.int64(CACHE_VERSION),
+                     _source=np.str_(source),
+                     _size=np.int64(size),
+                     _mtime_ns=np.int64(mtime_ns),
+                     **{col: np.asarray(values) for col, values in columns.items()})
+        # Ghi nguyên tử để tiến trình khác không đọc phải cache dở dang
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️  Không ghi được cache {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
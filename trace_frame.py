@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Biểu diễn gọn trong bộ nhớ cho trace đã đọc
+Mỗi dòng chỉ lưu cột 'time' (float64) và các cột số nguyên đã thu hẹp kiểu
+(bytes, packets, cwnd: int16/int32 khi vừa). Tên luồng được lưu một lần
+trong attrs['flow']; các cột dẫn xuất (cumulative_bytes, throughput_mbps,
+instant_throughput, cwnd_kb, flow) được tính khi truy cập thay vì lưu, nên một
+dòng rx chiếm 10 byte thay vì ~48 byte và một dòng cwnd 12 byte thay vì ~32 byte.
+
+    df = trace_frame.rx_frame(times, nbytes, 'TCP NewReno')
+    df['instant_throughput']      # tính từ 'bytes', không lưu lại
+    'cwnd_kb' in cwnd_df           # True: cột dẫn xuất có thể tính được
+"""
+
+import numpy as np
+import pandas as pd
+
+# Các kiểu nguyên thử lần lượt khi thu hẹp cột số nguyên. Dùng kiểu có dấu vì
+# phép trừ trên kiểu không dấu (df['cwnd'].diff()) bị tràn vòng khi cwnd giảm.
+NARROW_DTYPES = (np.int16, np.int32)
+
+
+def narrow_int(values):
+    """Mảng số nguyên với kiểu nhỏ nhất chứa được mọi giá trị (mặc định int64)"""
+    values = np.asarray(values)
+    if len(values) == 0:
+        return values.astype(np.int64, copy=False)
+    low, high = values.min(), values.max()
+    for dtype in NARROW_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype, copy=False)
+    return values.astype(np.int64, copy=False)
+
+
+def _cumulative_bytes(df):
+    # bytes_offset: số bytes nhận trước dòng đầu tiên khi frame là một khoảng con của trace
+    return np.cumsum(df['bytes'].values, dtype=np.int64) + df.attrs.get('bytes_offset', 0)
+
+
+def _throughput_mbps(df):
+    return _cumulative_bytes(df) * 8 / (df['time'].values * 1e6)
+
+
+def _instant_throughput(df):
+    # Trace gom bin: throughput trung bình của bin thay vì của một gói
+    return df['bytes'].values.astype(np.float64) * 8 / (1e6 * df.attrs.get('bin_width', 1.0))
+
+
+def _cwnd_kb(df):
+    return df['cwnd'].values / 1024
+
+
+def _flow(df):
+    return pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), [df.attrs.get('flow', '')])
+
+
+# Cột dẫn xuất -> (cột gốc cần có, hàm tính)
+DERIVED = {
+    'cumulative_bytes': (('bytes',), _cumulative_bytes),
+    'throughput_mbps': (('time', 'bytes'), _throughput_mbps),
+    'instant_throughput': (('bytes',), _instant_throughput),
+    'cwnd_kb': (('cwnd',), _cwnd_kb),
+    'flow': ((), _flow),
+}
+
+
+class TraceFrame(pd.DataFrame):
+    """DataFrame trace chỉ lưu cột gốc; cột dẫn xuất được tính khi truy cập df[tên]
+
+    Cắt dòng (iloc, slice thời gian), sao chép và pickle (worker vẽ song song)
+    đều giữ kiểu TraceFrame và attrs.
+    """
+
+    @property
+    def _constructor(self):
+        return TraceFrame
+
+    def derivable(self, key):
+        """key là cột dẫn xuất chưa được lưu và có đủ cột gốc để tính"""
+        return (isinstance(key, str) and key in DERIVED and key not in self.columns and
+                all(col in self.columns for col in DERIVED[key][0]))
+
+    def __getitem__(self, key):
+        if self.derivable(key):
+            return pd.Series(DERIVED[key][1](self), index=self.index, name=key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        return super().__contains__(key) or self.derivable(key)
+
+
+def rx_frame(times, nbytes, flow_name, packets=None, bin_width=None):
+    """TraceFrame rx từ mảng thời gian và bytes (packets/bin_width cho trace đã gom bin)"""
+    columns = {'time': np.asarray(times, dtype=np.float64), 'bytes': narrow_int(nbytes)}
+    if packets is not None:
+        columns['packets'] = narrow_int(packets)
+    df = TraceFrame(columns)
+    df.attrs['flow'] = flow_name
+    if packets is not None:
+        df.attrs['bin_width'] = bin_width
+    return df
+
+
+def cwnd_frame(times, cwnd, flow_name):
+    """TraceFrame cwnd từ mảng thời gian và cwnd (bytes)"""
+    df = TraceFrame({'time': np.asarray(times, dtype=np.float64), 'cwnd': narrow_int(cwnd)})
+    df.attrs['flow'] = flow_name
+    return df
+
+
+def slice_rows(df, i0, i1):
+    """Các dòng [i0, i1) của trace, giữ cumulative_bytes tính từ đầu trace gốc"""
+    part = df.iloc[i0:i1]
+    if 'bytes' in df.columns and i0 > 0:
+        part.attrs['bytes_offset'] = int(df.attrs.get('bytes_offset', 0) +
+                                         df['bytes'].values[:i0].sum(dtype=np.int64))
+    return part
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Thư viện đọc file trace dạng 'time\\tvalue' dùng chung cho các script phân tích
+Có nhiều backend:
+  - 'pandas': pandas.read_csv (C engine)
+  - 'numpy':  đọc cả file rồi phân tích hàng loạt bằng np.loadtxt
+  - 'stdlib': Python thuần (split từng dòng), dùng khi không có numpy/pandas
+Mặc định ('auto') chọn backend nhanh nhất đang có: lần đầu cần đến, pandas và
+numpy được đo thời gian mỗi dòng trên trace mẫu trong bộ nhớ (measure_backends)
+và kết quả được giữ cho cả tiến trình (bench_trace_reader.py đo trên file thật).
+File nhị phân .bin (xem binary_trace.py) luôn được memmap, không qua backend.
+Trace rx đã gom bin trong mô phỏng (--rxBinWidth, header BINNED_HEADER) có thêm
+cột số gói; read_trace vẫn trả về (thời điểm bắt đầu bin, bytes) như file thường.
+File nén .gz/.xz/.zst được giải nén dạng stream khi đọc (mọi backend), file lưu
+trữ mã hóa delta .delta.npz (xem trace_archive.py) được giải mã trực tiếp;
+find_trace tự tìm các biến thể này cạnh file .data.
+"""
+
+import gzip
+import io
+import lzma
+import os
+import threading
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import binary_trace
+except ImportError:  # binary_trace cần numpy
+    binary_trace = None
+
+try:
+    import trace_archive
+except ImportError:  # trace_archive cần numpy
+    trace_archive = None
+
+try:
+    import zstandard
+except ImportError:  # Chỉ cần khi đọc file .zst
+    zstandard = None
+
+# Thứ tự liệt kê backend; khi đo bằng nhau thì backend đứng trước được chọn
+BACKEND_PRIORITY = ['pandas', 'numpy', 'stdlib']
+
+# Số dòng của trace mẫu dùng để đo backend cho 'auto', số lần đo (lấy lần nhanh nhất)
+MEASURE_ROWS = 20_000
+MEASURE_REPEAT = 3
+
+# Backend 'auto' đã đo (None = chưa đo); khóa để các luồng đọc song song chỉ đo một lần
+_auto_backend = None
+_auto_lock = threading.Lock()
+
+# Dòng đầu của trace rx đã gom bin: '# binned bin_width=0.01'
+BINNED_HEADER = b'# binned'
+
+# Đuôi file nén được giải nén dạng stream khi đọc
+COMPRESSED_SUFFIXES = ('.gz', '.xz', '.zst')
+
+
+def available_backends():
+    """Các backend dùng được trong môi trường hiện tại, theo thứ tự ưu tiên"""
+    available = {'pandas': pd is not None, 'numpy': np is not None, 'stdlib': True}
+    return [name for name in BACKEND_PRIORITY if available[name]]
+
+
+def _sample_lines(n_rows):
+    """Các dòng 'time\\tbytes' (bytes) của trace mẫu, giống trace rx của mô phỏng"""
+    return [b'%.6f\t%d\n' % (i * 1e-4, 536 if i % 3 else 1448) for i in range(n_rows)]
+
+
+def _best_time(parser, text, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser(io.BytesIO(text), '<mẫu>')
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure_backends(backends=None, n_rows=MEASURE_ROWS, repeat=MEASURE_REPEAT):
+    """Thời gian phân tích mỗi dòng (giây) của từng backend, đo trên trace mẫu trong bộ nhớ
+
+    Lấy hiệu thời gian giữa mẫu 2 * n_rows và n_rows dòng (lần nhanh nhất sau
+    repeat lần), nên chi phí cố định mỗi lần gọi (đáng kể với pandas) bị loại:
+    kết quả phản ánh tốc độ trên trace lớn chứ không phải trên mẫu nhỏ.
+    """
+    lines = _sample_lines(2 * n_rows)
+    half, text = b''.join(lines[:n_rows]), b''.join(lines)
+    timings = {}
+    for name in backends or available_backends():
+        _PARSERS[name](io.BytesIO(lines[0]), '<mẫu>')  # khởi động, không tính
+        small, large = _best_time(_PARSERS[name], half, repeat), _best_time(_PARSERS[name], text, repeat)
+        timings[name] = max(large - small, 0.0) / n_rows
+    return timings
+
+
+def resolve_backend(backend='auto'):
+    """Chuyển 'auto' thành tên backend cụ thể, kiểm tra backend có dùng được không
+
+    'auto' là backend nhanh nhất theo measure_backends(), đo lần đầu cần đến rồi
+    giữ lại cho cả tiến trình. stdlib chỉ được chọn khi không có numpy/pandas.
+    """
+    global _auto_backend
+    backends = available_backends()
+    if backend == 'auto':
+        with _auto_lock:
+            if _auto_backend is None:
+                candidates = [name for name in backends if name != 'stdlib'] or backends
+                timings = measure_backends(candidates) if len(candidates) > 1 else {candidates[0]: 0.0}
+                _auto_backend = min(candidates, key=lambda name: timings[name])
+        return _auto_backend
+    if backend not in backends:
+        raise ValueError(f"Backend '{backend}' không dùng được (có: {', '.join(backends)})")
+    return backend
+
+
+def compression(filename):
+    """Đuôi nén của file ('.gz', '.xz', '.zst') hoặc None"""
+    for suffix in COMPRESSED_SUFFIXES:
+        if filename.endswith(suffix):
+            return suffix
+    return None
+
+
+def open_trace(filename, mode='rb'):
+    """Mở file để đọc ('rb' hoặc 'r'), giải nén dạng stream nếu là .gz/.xz/.zst"""
+    suffix = compression(filename)
+    if suffix is None:
+        return open(filename, mode)
+    if suffix == '.gz':
+        raw = gzip.open(filename, 'rb')
+    elif suffix == '.xz':
+        raw = lzma.open(filename, 'rb')
+    else:
+        if zstandard is None:
+            raise ValueError(f"File {filename}: cần cài gói zstandard để đọc file .zst")
+        raw = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(filename, 'rb'),
+                                                                            closefd=True))
+    return raw if mode == 'rb' else io.TextIOWrapper(raw)
+
+
+def is_empty(filename):
+    """File không có dữ liệu (với file nén: nội dung sau giải nén rỗng)"""
+    if compression(filename) is None:
+        return os.path.getsize(filename) == 0
+    with open_trace(filename) as f:
+        return not f.read(1)
+
+
+def is_archive(filename):
+    return trace_archive is not None and trace_archive.is_archive(filename)
+
+
+def find_trace(filename):
+    """Đường dẫn trace thực sự cần đọc cho một file .data (hoặc file kết quả khác)
+
+    Các biến thể cùng tên được xét: file nhị phân .bin (mô phỏng chạy với
+    --binaryTraces=true), file lưu trữ .delta.npz, file gốc và bản nén
+    .gz/.xz/.zst. Dùng biến thể mới nhất; khi bằng nhau thì ưu tiên theo thứ tự trên.
+    """
+    if (compression(filename) or is_archive(filename) or
+            (binary_trace is not None and binary_trace.is_binary(filename))):
+        return filename
+    candidates = [filename] + [filename + suffix for suffix in COMPRESSED_SUFFIXES]
+    if trace_archive is not None:
+        candidates.insert(0, trace_archive.archive_path(filename))
+    if binary_trace is not None:
+        candidates.insert(0, binary_trace.binary_path(filename))
+    existing = [path for path in candidates if os.path.exists(path)]
+    if not existing:
+        return filename
+    return max(existing, key=os.path.getmtime)
+
+
+def trace_name(filename):
+    """Tên file .data gốc của một biến thể trace (ngược với find_trace)
+
+    'x.data.gz', 'x.data.delta.npz', 'x.bin' -> 'x.data'; tên khác giữ nguyên.
+    """
+    suffix = compression(filename)
+    if suffix is not None:
+        filename = filename[:-len(suffix)]
+    if is_archive(filename):
+        return filename[:-len(trace_archive.ARCHIVE_SUFFIX)]
+    if binary_trace is not None and binary_trace.is_binary(filename):
+        return filename[:-len(binary_trace.BINARY_SUFFIX)] + '.data'
+    return filename
+
+
+def bin_width(filename):
+    """Độ rộng bin (giây) nếu file là trace rx đã gom bin, ngược lại None"""
+    if binary_trace is not None and binary_trace.is_binary(filename):
+        return None
+    if is_archive(filename):
+        return trace_archive.bin_width(filename)
+    try:
+        with open_trace(filename) as f:
+            first = f.readline(256)
+    except OSError:
+        return None
+    if not first.startswith(BINNED_HEADER):
+        return None
+    for field in first.split()[2:]:
+        if field.startswith(b'bin_width='):
+            return float(field[len(b'bin_width='):])
+    raise ValueError(f"File {filename}: header gom bin thiếu bin_width")
+
+
+def _parse_pandas(f, filename):
+    df = pd.read_csv(f, sep='\t', header=None, names=['time', 'value'],
+                     usecols=[0, 1], dtype={'time': np.float64, 'value': np.int64})
+    return df['time'].values, df['value'].values
+
+
+def parse_text(text, filename='<text>', columns=2):
+    """Phân tích các dòng 'time\\tvalue[\\t...]' hoàn chỉnh (str hoặc bytes) thành các mảng numpy
+
+    Cột đầu là float64, các cột sau là int64.
+    """
+    if isinstance(text, str):
+        text = text.encode()
+    if not text.strip():
+        return (np.empty(0, dtype=np.float64),) + tuple(np.empty(0, dtype=np.int64)
+                                                        for _ in range(1, columns))
+    try:
+        rows = np.loadtxt(io.BytesIO(text), dtype=np.float64, ndmin=2)
+    except ValueError as e:
+        raise ValueError(f"File {filename} không đúng định dạng {columns} cột") from e
+    if rows.shape[1] != columns:
+        raise ValueError(f"File {filename} không đúng định dạng {columns} cột")
+    return (rows[:, 0].copy(),) + tuple(rows[:, i].astype(np.int64) for i in range(1, columns))
+
+
+def _parse_numpy(f, filename):
+    return parse_text(f.read(), filename)
+
+
+def _parse_stdlib(f, filename):
+    times, values = array('d'), array('q')
+    for line in io.TextIOWrapper(f):
+        parts = line.split('\t')
+        if len(parts) >= 2:
+            times.append(float(parts[0]))
+            values.append(int(parts[1]))
+    return times, values
+
+
+# Phân tích trace 2 cột từ file nhị phân đã mở (dùng cả khi đọc file lẫn khi đo backend)
+_PARSERS = {'pandas': _parse_pandas, 'numpy': _parse_numpy, 'stdlib': _parse_stdlib}
+
+
+def read_binned_trace(filename, backend='auto'):
+    """Đọc trace rx đã gom bin, trả về (thời điểm bắt đầu bin, bytes, số gói)"""
+    if is_archive(filename):
+        return trace_archive.read_archive(filename)
+    backend = resolve_backend(backend)
+    if backend == 'pandas':
+        with open_trace(filename) as f:
+            df = pd.read_csv(f, sep='\t', header=None, comment='#',
+                             names=['time', 'value', 'packets'], usecols=[0, 1, 2],
+                             dtype={'time': np.float64, 'value': np.int64, 'packets': np.int64})
+        return df['time'].values, df['value'].values, df['packets'].values
+    if backend == 'numpy':
+        with open_trace(filename) as f:
+            f.readline()  # Bỏ header
+            return parse_text(f.read(), filename, columns=3)
+
+    times, values, packets = array('d'), array('q'), array('q')
+    with open_trace(filename, 'r') as f:
+        for line in f:
+            parts = line.split('\t')
+            if len(parts) >= 3 and not line.startswith('#'):
+                times.append(float(parts[0]))
+                values.append(int(parts[1]))
+                packets.append(int(parts[2]))
+    return times, values, packets
+
+
+def read_trace(filename, backend='auto'):
+    """Đọc file trace, trả về (times, values)
+
+    Với backend pandas/numpy là hai mảng numpy (float64, int64); với stdlib là
+    hai array.array ('d', 'q'). File rỗng cho hai cột rỗng. File .bin trả về
+    (view memmap float64, int64) bất kể backend; file .delta.npz trả về
+    hai mảng numpy (float64, int64).
+    """
+    if binary_trace is not None and binary_trace.is_binary(filename):
+        return binary_trace.read_binary_trace(filename)
+    if is_archive(filename):
+        return trace_archive.read_archive(filename)[:2]
+    if bin_width(filename) is not None:
+        return read_binned_trace(filename, backend)[:2]
+    backend = resolve_backend(backend)
+    if is_empty(filename):
+        if backend == 'stdlib':
+            return array('d'), array('q')
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+    with open_trace(filename) as f:
+        return _PARSERS[backend](f, filename)
+
+
+def iter_chunks(filename, chunk_size, backend='auto'):
+    """Đọc file trace theo từng khối chunk_size dòng, sinh ra (times, values)
+
+    Kiểu cột giống read_trace: mảng numpy, hoặc array.array ('d', 'q') với backend stdlib.
+    """
+    if binary_trace is not None and binary_trace.is_binary(filename):
+        records = binary_trace.open_records(filename)
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            yield chunk['time'], chunk['value'].astype(np.int64)
+        return
+    if is_archive(filename):
+        # Giải mã từng khối nén một, bộ nhớ không phụ thuộc độ dài trace
+        for block in trace_archive.iter_blocks(filename):
+            times, values = block[:2]
+            for start in range(0, len(times), chunk_size):
+                yield times[start:start + chunk_size], values[start:start + chunk_size]
+        return
+    if bin_width(filename) is not None:
+        # Trace đã gom bin nhỏ theo thiết kế (số bin, không phải số gói): đọc một lần
+        times, values, _ = read_binned_trace(filename, backend)
+        yield times, values
+        return
+    backend = resolve_backend(backend)
+    if is_empty(filename):
+        return
+    if backend == 'pandas':
+        with open_trace(filename) as f:
+            reader = pd.read_csv(f, sep='\t', header=None, names=['time', 'value'],
+                                 usecols=[0, 1], dtype={'time': np.float64, 'value': np.int64},
+                                 chunksize=chunk_size)
+            for chunk in reader:
+                yield chunk['time'].values, chunk['value'].values
+        return
+
+    with open_trace(filename, 'r') as f:
+        while True:
+            lines = [line for _, line in zip(range(chunk_size), f)]
+            if not lines:
+                return
+            if backend == 'numpy':
+                yield parse_text(''.join(lines), filename)
+            else:
+                parts = [line.split('\t') for line in lines]
+                yield (array('d', [float(p[0]) for p in parts if len(p) >= 2]),
+                       array('q', [int(p[1]) for p in parts if len(p) >= 2]))